@@ -0,0 +1,248 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+from __future__ import print_function
+
+__title__ = "FEM CalculiX batch solver"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemBatchCcx
+#  \ingroup FEM
+#  \brief runs CalculiX for a list of parameter variants of one analysis
+#
+#  usage in the FreeCAD Python console:
+#  import FemBatchCcx
+#  batch = FemBatchCcx.FemBatchCcx()
+#  variants = [{'FemConstraintForce': {'Force': f}} for f in (100.0, 200.0, 400.0)]
+#  summary = batch.run(variants)
+#
+#  Each variant is a dict {object name: {property name: value}}. The input file of each
+#  variant is written into its own working directory, the properties are restored afterwards.
+#  The ccx runs are started concurrently, the cores are split between the concurrent jobs
+#  and OMP_NUM_THREADS of each job. Only the Stats of the last result set of each frd file
+#  are read, no result object is made.
+
+import FreeCAD
+import FemCcxRunner
+import FemTools
+import FemToolsCcx
+import multiprocessing
+import os
+import threading
+import time
+try:
+    import Queue as queue  # Python 2
+except ImportError:
+    import queue
+
+
+default_result_types = ("U1", "U2", "U3", "Uabs", "Sabs")
+
+
+## splits the cores between the number of concurrent jobs and the threads of each job
+#  without num_jobs there is one job for each core, a batch has more variants than cores
+#  and ccx uses one core more efficiently than a share of many cores
+#  @return (num_jobs, threads_per_job)
+def get_job_split(num_variants, cores, num_jobs=None):
+    cores = max(1, cores)
+    if not num_jobs:
+        num_jobs = cores
+    num_jobs = max(1, min(num_jobs, num_variants, cores))
+    return num_jobs, max(1, cores // num_jobs)
+
+
+class FemBatchCcx(object):
+
+    ## The constructor
+    #  @param analysis - analysis object, the active analysis if not given
+    #  @param solver - CalculiX solver object of the analysis, the first one if not given
+    #  @param base_dir - directory of the variant working directories, <working dir>/batch if not given
+    def __init__(self, analysis=None, solver=None, base_dir=None):
+        if analysis is None:
+            import FemGui
+            analysis = FemGui.getActiveAnalysis()
+        if analysis is None:
+            raise Exception('FEM: No active analysis found!')
+        if solver is None:
+            for m in analysis.Member:
+                if m.isDerivedFrom("Fem::FemSolverObjectPython") and m.SolverType == "FemSolverCalculix":
+                    solver = m
+                    break
+        self.analysis = analysis
+        self.fea = FemToolsCcx.FemToolsCcx(analysis, solver)
+        if base_dir is None:
+            base_dir = os.path.join(self.fea.working_dir, 'batch')
+        self.base_dir = base_dir
+        self.ccx_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Ccx")
+        self.jobs = []
+        self.runners = []
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    ## Sets the overrides of a variant, returns the overridden values
+    def apply_overrides(self, overrides):
+        doc = self.analysis.Document
+        old_values = {}
+        for obj_name, properties in overrides.items():
+            obj = doc.getObject(obj_name)
+            if obj is None:
+                raise Exception('FEM: Batch override object {} not found in the document!'.format(obj_name))
+            old_values[obj_name] = {}
+            for prop, value in properties.items():
+                if prop not in obj.PropertiesList:
+                    raise Exception('FEM: Batch override object {} has no property {}!'.format(obj_name, prop))
+                old_values[obj_name][prop] = getattr(obj, prop)
+                setattr(obj, prop, value)
+        doc.recompute()
+        return old_values
+
+    def restore_overrides(self, old_values):
+        doc = self.analysis.Document
+        for obj_name, properties in old_values.items():
+            obj = doc.getObject(obj_name)
+            for prop, value in properties.items():
+                setattr(obj, prop, value)
+        doc.recompute()
+
+    ## Writes the input file of each variant into its own working directory
+    #  the document is changed only while an input file is written
+    #  @return list of job dicts {'name', 'overrides', 'inp_file_name'}
+    def write_variants(self, variants, names=None):
+        if names is None:
+            names = ['variant_{:03d}'.format(i) for i in range(len(variants))]
+        self.fea.update_objects()
+        message = self.fea.check_prerequisites()
+        if message:
+            raise Exception('FEM: Batch prerequisites failed: {}'.format(message))
+        jobs = []
+        for name, overrides in zip(names, variants):
+            old_values = self.apply_overrides(overrides)
+            try:
+                self.fea.setup_working_dir(os.path.join(self.base_dir, name))
+                self.fea.set_analysis_type()
+                self.fea.update_objects()
+                self.fea.write_inp_file()
+            finally:
+                self.restore_overrides(old_values)
+            if not self.fea.inp_file_name:
+                raise Exception('FEM: Writing the input file of variant {} failed!'.format(name))
+            jobs.append({'name': name, 'overrides': overrides, 'inp_file_name': self.fea.inp_file_name,
+                         'analysis_type': self.fea.analysis_type})
+        return jobs
+
+    ## Runs ccx for the jobs, num_jobs at a time
+    #  @return summary list, one dict for each job with 'name', 'overrides', 'status', 'returncode',
+    #  'elapsed' and (min, avg, max) of each result type
+    def solve(self, jobs, num_jobs=None, result_types=default_result_types):
+        num_cpu_pref = self.ccx_prefs.GetInt("AnalysisNumCPUs", 1)
+        cores = num_cpu_pref if num_cpu_pref > 1 else multiprocessing.cpu_count()
+        num_jobs, threads_per_job = get_job_split(len(jobs), cores, num_jobs)
+        time_limit = self.ccx_prefs.GetInt("AnalysisTimeLimit", 0)
+        print('FEM batch: {} variants, {} concurrent ccx jobs with {} threads each'.format(len(jobs), num_jobs, threads_per_job))
+        self.cancelled = False
+        self.runners = []
+        pending = queue.Queue()
+        for i in range(len(jobs)):
+            pending.put(i)
+        summary = [None] * len(jobs)
+
+        def worker():
+            while not self.cancelled:
+                try:
+                    i = pending.get_nowait()
+                except queue.Empty:
+                    return
+                summary[i] = self.solve_job(jobs[i], threads_per_job, time_limit, result_types)
+
+        start = time.time()
+        workers = [threading.Thread(target=worker) for n in range(num_jobs)]
+        for w in workers:
+            w.daemon = True
+            w.start()
+        for w in workers:
+            w.join()
+        print('FEM batch: {} variants solved in {:.1f} s'.format(len([s for s in summary if s]), time.time() - start))
+        return [s for s in summary if s]
+
+    def solve_job(self, job, num_threads, time_limit, result_types):
+        runner = FemCcxRunner.CcxRunner(self.fea.ccx_binary, job['inp_file_name'], num_threads, time_limit)
+        with self.lock:
+            if self.cancelled:
+                return None
+            self.runners.append(runner)
+        returncode = runner.run()
+        row = {'name': job['name'], 'overrides': job['overrides'], 'status': runner.status,
+               'returncode': returncode, 'elapsed': runner.elapsed}
+        stats = None
+        if returncode == 0 and runner.status == 'finished':
+            stats = get_frd_stats(os.path.splitext(job['inp_file_name'])[0] + '.frd')
+        if stats is None:
+            row['status'] = 'no results' if runner.status == 'finished' else runner.status
+            if runner.stderr:
+                FreeCAD.Console.PrintError('FEM batch: {}: {}\n'.format(job['name'], runner.stderr))
+            stats = [0] * 30
+        for result_type in result_types:
+            row[result_type] = FemTools.get_stats_of_type(stats, result_type)
+        return row
+
+    ## Cancels a running batch, the running ccx are stopped and the pending jobs are not started
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            runners = list(self.runners)
+        for runner in runners:
+            runner.cancel()
+
+    ## Writes and solves all variants, prints and returns the summary
+    def run(self, variants, names=None, num_jobs=None, result_types=default_result_types):
+        self.jobs = self.write_variants(variants, names)
+        summary = self.solve(self.jobs, num_jobs, result_types)
+        print(format_summary_table(summary, result_types))
+        return summary
+
+
+## Stats of the last result set of a frd file, it is the result get_stats() uses after loading the results
+#  @return None if the frd file has no result set
+def get_frd_stats(frd_file_name):
+    import importCcxFrdResults
+    import importToolsFem
+    if not os.path.isfile(frd_file_name):
+        return None
+    index = importCcxFrdResults.FrdResultIndex(frd_file_name)
+    if not index.result_sets:
+        return None
+    result_set = index.read_result_set(len(index.result_sets) - 1)
+    return importToolsFem.calculate_femresult_stats(result_set, index.get_span())
+
+
+## summary table with the max value of each result type, min and avg are in the summary dicts
+def format_summary_table(summary, result_types=default_result_types):
+    header = ['variant', 'status', 'time'] + ['max ' + t for t in result_types]
+    rows = [header]
+    for row in summary:
+        rows.append([row['name'], row['status'], '{:.1f}'.format(row['elapsed'])] +
+                    ['{:.6g}'.format(row[t][2]) for t in result_types])
+    widths = [max(len(r[i]) for r in rows) for i in range(len(header))]
+    lines = ['  '.join(c.ljust(w) for c, w in zip(r, widths)).rstrip() for r in rows]
+    lines.insert(1, '-' * len(lines[0]))
+    return '\n'.join(lines)
@@ -0,0 +1,509 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+from __future__ import print_function
+
+__title__ = "FEM performance benchmarks"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemBenchmarks
+#  \ingroup FEM
+#  \brief timing of FEM readers and writers
+#
+#  usage in the FreeCAD Python console:
+#  import FemBenchmarks
+#  FemBenchmarks.benchmark_frd_readers()
+#  FemBenchmarks.benchmark_inp_mesh_reader()
+#  FemBenchmarks.benchmark_z88_round_trip()
+#  FemBenchmarks.run_benchmark_suite(sizes=(10000, 100000))
+
+import FreeCAD
+import os
+from timeit import default_timer as timer
+
+
+test_file_dir = FreeCAD.getHomePath() + 'Mod/Fem/test_files/ccx'
+
+
+def time_function(function, args=(), repeat=3):
+    '''returns the best time of repeat calls of function(*args) and the return value of the last call
+    '''
+    best = None
+    ret = None
+    for i in range(repeat):
+        start = timer()
+        ret = function(*args)
+        elapsed = timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, ret
+
+
+def benchmark_frd_readers(frd_files=None, repeat=3):
+    '''compares the dict based readResult() with the array based readResultArrays() of importCcxFrdResults
+    returns a list of {'file', 'nodes', 'readResult', 'readResultArrays', 'speedup'} dicts
+    '''
+    import importCcxFrdResults
+    if frd_files is None:
+        frd_files = sorted([os.path.join(test_file_dir, f) for f in os.listdir(test_file_dir) if f.endswith('.frd')])
+    benchmarks = []
+    for frd_file in frd_files:
+        t_dict, m_dict = time_function(importCcxFrdResults.readResult, (frd_file,), repeat)
+        t_array, m_array = time_function(importCcxFrdResults.readResultArrays, (frd_file,), repeat)
+        if len(m_dict['Nodes']) != len(m_array['Nodes'][0]):
+            FreeCAD.Console.PrintError('FEM: frd readers return different node counts for {}\n'.format(frd_file))
+        benchmark = {
+            'file': os.path.basename(frd_file),
+            'nodes': len(m_array['Nodes'][0]),
+            'readResult': t_dict,
+            'readResultArrays': t_array,
+            'speedup': t_dict / t_array if t_array else 0.0}
+        print('{file}: {nodes} nodes, readResult {readResult:.4f} s, readResultArrays {readResultArrays:.4f} s, speedup {speedup:.1f}'.format(**benchmark))
+        benchmarks.append(benchmark)
+    return benchmarks
+
+
+def make_hexa8_grid(n):
+    '''hexa8 grid mesh of n x n x n elements with unit edge length
+    returns node_ids, node_coords, element_ids, element_nodes
+    '''
+    import numpy as np
+    grid = np.arange((n + 1) ** 3, dtype=np.int64).reshape(n + 1, n + 1, n + 1) + 1
+    coords = np.indices((n + 1, n + 1, n + 1)).reshape(3, -1).T.astype(np.float64)
+    corners = [grid[:-1, :-1, :-1], grid[1:, :-1, :-1], grid[1:, 1:, :-1], grid[:-1, 1:, :-1],
+               grid[:-1, :-1, 1:], grid[1:, :-1, 1:], grid[1:, 1:, 1:], grid[:-1, 1:, 1:]]
+    return grid.ravel(), coords, np.arange(1, n ** 3 + 1), np.column_stack([c.ravel() for c in corners])
+
+
+def write_inp_test_deck(file_name, lines=5000000):
+    '''writes a hexa8 grid mesh with about the given number of node and element lines into an .inp file
+    returns the number of written lines
+    '''
+    import numpy as np
+    n = max(1, int(round((lines / 2.0) ** (1.0 / 3.0))) - 1)  # (n + 1)^3 nodes and n^3 elements
+    node_ids, coords, element_ids, element_nodes = make_hexa8_grid(n)
+    elements = np.column_stack((element_ids, element_nodes))
+    f = open(file_name, 'w')
+    f.write('*Node, NSET=Nall\n')
+    np.savetxt(f, np.column_stack((node_ids, coords)), fmt=['%d', '%.6f', '%.6f', '%.6f'], delimiter=', ')
+    f.write('*Element, TYPE=C3D8, ELSET=Eall\n')
+    np.savetxt(f, elements, fmt='%d', delimiter=', ')
+    f.write('*NSET,NSET=Bottom,GENERATE\n1,{},1\n'.format((n + 1) ** 2))
+    f.close()
+    return len(node_ids) + len(elements) + 4
+
+
+def benchmark_inp_mesh_reader(file_name=None, lines=5000000, compare=False, make_mesh=False):
+    '''reads a generated .inp deck with read_inp_arrays() of importInpMesh and reports the throughput
+    with compare the line based read_inp() is timed too, with make_mesh the FemMesh is made too
+    returns {'file', 'lines', 'MB', 'read_inp_arrays', 'lines_per_s', 'MB_per_s', ...}
+    '''
+    import importInpMesh
+    import importToolsFem
+    import tempfile
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), 'FEM_benchmark_{}_lines.inp'.format(lines))
+    if not os.path.isfile(file_name):
+        print('writing {}'.format(file_name))
+        write_inp_test_deck(file_name, lines)
+    size = os.path.getsize(file_name) / 1e6
+    line_count = sum(1 for l in open(file_name, 'rb'))
+    t_array, m = time_function(importInpMesh.read_inp_arrays, (file_name,), 1)
+    benchmark = {
+        'file': file_name,
+        'lines': line_count,
+        'MB': size,
+        'nodes': len(m['Nodes'][0]),
+        'read_inp_arrays': t_array,
+        'lines_per_s': line_count / t_array,
+        'MB_per_s': size / t_array}
+    print('{file}: {lines} lines, {MB:.1f} MB, {nodes} nodes, read_inp_arrays {read_inp_arrays:.2f} s, '
+          '{lines_per_s:.0f} lines/s, {MB_per_s:.1f} MB/s'.format(**benchmark))
+    if compare:
+        benchmark['read_inp'] = time_function(importInpMesh.read_inp, (file_name,), 1)[0]
+        print('read_inp {:.2f} s, speedup {:.1f}'.format(benchmark['read_inp'], benchmark['read_inp'] / t_array))
+    if make_mesh:
+        node_ids, node_coords = m['Nodes']
+        benchmark['make_femmesh_from_arrays'] = time_function(importToolsFem.make_femmesh_from_arrays, (node_ids, node_coords, m['Elements']), 1)[0]
+        print('make_femmesh_from_arrays {:.2f} s'.format(benchmark['make_femmesh_from_arrays']))
+    return benchmark
+
+
+def benchmark_z88_round_trip(elements=1000000, file_name=None):
+    '''writes a hexa8 grid mesh with about the given number of elements into a z88i1.txt file,
+    reads it back with read_z88_mesh_arrays() of importZ88Mesh and checks the mesh is unchanged,
+    a z88o2.txt displacement file of the grid nodes is written and read by read_z88_disp_arrays() too
+    returns {'file', 'nodes', 'elements', 'MB', 'write', 'read', 'disp_write', 'disp_read', 'round_trip'}
+    '''
+    import importZ88Mesh
+    import importZ88O2Results
+    import numpy as np
+    import tempfile
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), 'FEM_benchmark_z88i1.txt')
+    n = max(1, int(round(elements ** (1.0 / 3.0))))
+    node_ids, node_coords, element_ids, element_nodes = make_hexa8_grid(n)
+
+    def write_mesh():
+        f = open(file_name, 'w')
+        importZ88Mesh.write_z88_mesh_arrays(f, node_ids, node_coords, element_ids, element_nodes, 1)
+        f.close()
+    t_write = time_function(write_mesh, (), 1)[0]
+    t_read, m = time_function(importZ88Mesh.read_z88_mesh_arrays, (file_name,), 1)
+    read_ids, read_nodes = m['Elements']['Hexa8Elem']
+    round_trip = (np.array_equal(m['Nodes'][0], node_ids) and np.array_equal(m['Nodes'][1], node_coords) and
+                  np.array_equal(read_ids, element_ids) and np.array_equal(read_nodes, element_nodes))
+
+    disp_file_name = os.path.join(os.path.dirname(file_name), 'FEM_benchmark_z88o2.txt')
+    disp = node_coords * 1e-3
+
+    def write_disp():
+        f = open(disp_file_name, 'w')
+        f.write('\n' * 5)  # the header lines of z88o2.txt
+        importZ88Mesh.write_array_lines(f, '%d %+.7e %+.7e %+.7e\n', np.column_stack((node_ids, disp)))
+        f.close()
+    t_disp_write = time_function(write_disp, (), 1)[0]
+    t_disp_read, r = time_function(importZ88O2Results.read_z88_disp_arrays, (disp_file_name,), 1)
+    round_trip = round_trip and np.allclose(r['Results'][0]['disp'][1], disp, rtol=1e-7, atol=0.0)
+    benchmark = {
+        'file': file_name,
+        'nodes': len(node_ids),
+        'elements': len(element_ids),
+        'MB': os.path.getsize(file_name) / 1e6,
+        'write': t_write,
+        'read': t_read,
+        'disp_write': t_disp_write,
+        'disp_read': t_disp_read,
+        'round_trip': bool(round_trip)}
+    print('{file}: {nodes} nodes, {elements} elements, {MB:.1f} MB, write {write:.2f} s, read {read:.2f} s, '
+          'z88o2 write {disp_write:.2f} s, read {disp_read:.2f} s, round trip {round_trip}'.format(**benchmark))
+    if not round_trip:
+        FreeCAD.Console.PrintError('FEM: z88 mesh or displacements changed in the round trip\n')
+    return benchmark
+
+
+# structured meshes of a cube for the benchmark suite, made without gmsh
+# the nodes are made on a lattice with doubled coordinates, thus the midside nodes are lattice points too
+# element type --> ccx element type, elements per lattice cell, FreeCAD element key
+structured_element_types = {
+    'tetra4': ('C3D4', 6, 'Tetra4Elem'),
+    'tetra10': ('C3D10', 6, 'Tetra10Elem'),
+    'hexa8': ('C3D8', 1, 'Hexa8Elem'),
+    'hexa20': ('C3D20', 1, 'Hexa20Elem')}
+# the corners of a cell in ccx hexa node order
+cell_corners = ((0, 0, 0), (2, 0, 0), (2, 2, 0), (0, 2, 0), (0, 0, 2), (2, 0, 2), (2, 2, 2), (0, 2, 2))
+# the six tetras of a cell around the diagonal from corner 0 to corner 6
+cell_tetras = ((0, 1, 2, 6), (0, 2, 3, 6), (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6), (0, 5, 1, 6))
+# the corner nodes of the midside nodes in ccx node order
+c3d10_edges = ((0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3))
+c3d20_edges = ((0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7))
+
+
+def make_structured_mesh(element_type, elements):
+    '''structured mesh of a cube of about the given number of tetra4, tetra10, hexa8 or hexa20 elements
+    the cells of the lattice have unit edge length, a cell is one hexa or six tetras
+    returns node_ids, node_coords, element_ids, element_nodes, the element_nodes are in ccx node order
+    '''
+    import numpy as np
+    ccx_type, cell_elements, key = structured_element_types[element_type]
+    n = max(1, int(round((elements / float(cell_elements)) ** (1.0 / 3.0))))
+    cells = np.indices((n, n, n), dtype=np.int32).reshape(3, -1).T * 2
+    points = cells[:, np.newaxis, :] + np.array(cell_corners, dtype=np.int32)[np.newaxis, :, :]
+    if element_type.startswith('tetra'):
+        points = points[:, np.array(cell_tetras)].reshape(-1, 4, 3)
+        # ccx tetras have a positive volume, swap the first two nodes of the others
+        edges = points[:, 1:] - points[:, :1]
+        flip = np.einsum('ij,ij->i', edges[:, 0], np.cross(edges[:, 1], edges[:, 2])) < 0
+        points[flip, :2] = points[flip, 1::-1]
+        midside_edges = c3d10_edges if element_type == 'tetra10' else ()
+    else:
+        midside_edges = c3d20_edges if element_type == 'hexa20' else ()
+    if midside_edges:
+        first, second = np.array(midside_edges).T
+        points = np.concatenate((points, (points[:, first] + points[:, second]) // 2), axis=1)
+    size = 2 * n + 1
+    lattice_ids = (points[:, :, 0] * size + points[:, :, 1]) * size + points[:, :, 2]
+    used, element_nodes = np.unique(lattice_ids, return_inverse=True)
+    node_coords = np.column_stack((used // (size * size), used // size % size, used % size)) / 2.0
+    return (np.arange(1, len(used) + 1), node_coords, np.arange(1, len(lattice_ids) + 1),
+            element_nodes.reshape(lattice_ids.shape) + 1)
+
+
+def get_freecad_element_nodes(element_nodes):
+    '''returns the element nodes of ccx ordered element_nodes in FreeCAD node order, see importCcxFrdResults
+    '''
+    import importCcxFrdResults
+    for key, node_count, node_order in importCcxFrdResults.frd_element_types.values():
+        if key.startswith(('Tetra', 'Hexa')) and node_count == element_nodes.shape[1]:
+            return element_nodes[:, node_order]
+
+
+def write_inp_mesh(file_name, element_type, node_ids, node_coords, element_ids, element_nodes):
+    '''writes a structured mesh into an .inp file, an element line has at most 16 entries like in FemMesh.writeABAQUS()
+    '''
+    import importZ88Mesh
+    import numpy as np
+    node_count = element_nodes.shape[1]
+    line_format = '%d' + ', %d' * min(node_count, 15)
+    if node_count > 15:
+        line_format += ',\n' + ', '.join(['%d'] * (node_count - 15))
+    f = open(file_name, 'w')
+    f.write('*Node, NSET=Nall\n')
+    importZ88Mesh.write_array_lines(f, '%d, %.6f, %.6f, %.6f\n', np.column_stack((node_ids, node_coords)))
+    f.write('*Element, TYPE={}, ELSET=Eall\n'.format(structured_element_types[element_type][0]))
+    importZ88Mesh.write_array_lines(f, line_format + '\n', np.column_stack((element_ids, element_nodes)))
+    f.close()
+
+
+def write_frd_result(file_name, node_ids, node_coords, element_ids, element_nodes):
+    '''writes a structured mesh and one result set with displacements and stresses into an .frd file
+    the element_nodes are in ccx node order, the element type is known by the node count
+    returns the displacements and stresses
+    '''
+    import importCcxFrdResults
+    import importZ88Mesh
+    import numpy as np
+    node_count = element_nodes.shape[1]
+    frd_type = [t for t in importCcxFrdResults.frd_element_types
+                if importCcxFrdResults.frd_element_types[t][1] == node_count and t in (1, 3, 4, 6)][0]
+    disp = node_coords * 1e-3
+    stress = np.column_stack((node_coords * 10.0, node_coords[:, :3] * 2.0))
+    f = open(file_name, 'w')
+    f.write('    1C\n')
+    f.write('    2C{:>30d}{:>37d}\n'.format(len(node_ids), 1))
+    importZ88Mesh.write_array_lines(f, ' -1%10d%12.5E%12.5E%12.5E\n', np.column_stack((node_ids, node_coords)))
+    f.write(' -3\n')
+    f.write('    3C{:>30d}{:>37d}\n'.format(len(element_ids), 1))
+    element_format = ' -1%10d' + '{:5d}    0    1\n'.format(frd_type) + ' -2' + '%10d' * node_count + '\n'
+    importZ88Mesh.write_array_lines(f, element_format, np.column_stack((element_ids, element_nodes)))
+    f.write(' -3\n')
+    f.write('  100CL  101 1.000000000{:>12d}                     0    1           1\n'.format(len(node_ids)))
+    f.write(' -4  DISP        4    1\n')
+    importZ88Mesh.write_array_lines(f, ' -1%10d%12.5E%12.5E%12.5E\n', np.column_stack((node_ids, disp)))
+    f.write(' -3\n')
+    f.write('  100CL  101 1.000000000{:>12d}                     0    1           1\n'.format(len(node_ids)))
+    f.write(' -4  STRESS      6    1\n')
+    importZ88Mesh.write_array_lines(f, ' -1%10d' + '%12.5E' * 6 + '\n', np.column_stack((node_ids, stress)))
+    f.write(' -3\n')
+    f.write(' 9999\n')
+    f.close()
+    return disp, stress
+
+
+suite_benchmarks = ('make_structured_mesh', 'read_inp_arrays', 'readResultArrays', 'FrdResultIndex',
+                    'make_femmesh_from_arrays', 'femmesh_2_mesh_arrays', 'get_femelement_table',
+                    'get_femnodes_ele_table', 'get_femvolumeelements_by_femfacenodes', 'get_femelements_by_femnodes_std',
+                    'calculate_femresult_stats', 'fill_femresult_mechanical', 'write_calculix_input_file')
+
+
+def run_benchmark_suite(element_types=('tetra4', 'tetra10', 'hexa8', 'hexa20'), sizes=(10000, 100000, 1000000, 2000000),
+                        json_file=None, benchmarks=None, repeat=1):
+    '''times the FEM readers, writers and mesh searches on structured meshes of every element type and size
+    benchmarks is a list of names of suite_benchmarks, None runs all of them
+    a benchmark which fails is reported with its error, the ones which need its result are not run
+    the results are written into json_file, default FEM_benchmarks.json in the temp directory
+    returns the dict written into json_file
+    '''
+    import json
+    import numpy as np
+    import platform
+    import shutil
+    import tempfile
+    import time
+    if json_file is None:
+        json_file = os.path.join(tempfile.gettempdir(), 'FEM_benchmarks.json')
+    if benchmarks is None:
+        benchmarks = suite_benchmarks
+    work_dir = tempfile.mkdtemp(prefix='FEM_benchmarks_')
+    results = []
+    for element_type in element_types:
+        for size in sizes:
+            data = {}
+
+            def run(name, function, args=()):
+                # times function if the benchmark is selected, the return value is kept in data
+                if name not in benchmarks:
+                    return
+                if any(a is None for a in args):
+                    result = {'error': 'input not available'}
+                else:
+                    try:
+                        seconds, data[name] = time_function(function, args, repeat)
+                        result = {'seconds': seconds}
+                    except Exception as e:
+                        result = {'error': '{}: {}'.format(type(e).__name__, e)}
+                result.update({'benchmark': name, 'element_type': element_type, 'elements': size})
+                if 'make_structured_mesh' in data:
+                    mesh = data['make_structured_mesh']
+                    result.update({'elements': len(mesh[2]), 'nodes': len(mesh[0])})
+                print('{benchmark} {element_type} {elements}: '.format(**result) +
+                      ('{:.3f} s'.format(result['seconds']) if 'seconds' in result else result['error']))
+                results.append(result)
+
+            run('make_structured_mesh', make_structured_mesh, (element_type, size))
+            if 'make_structured_mesh' not in data:
+                data['make_structured_mesh'] = make_structured_mesh(element_type, size)
+            node_ids, node_coords, element_ids, element_nodes = data['make_structured_mesh']
+            key = structured_element_types[element_type][2]
+            fc_elements = {key: (element_ids, get_freecad_element_nodes(element_nodes))}
+            base_name = os.path.join(work_dir, '{}_{}'.format(element_type, size))
+            write_inp_mesh(base_name + '.inp', element_type, node_ids, node_coords, element_ids, element_nodes)
+            write_frd_result(base_name + '.frd', node_ids, node_coords, element_ids, element_nodes)
+            run('read_inp_arrays', _read_inp_arrays, (base_name + '.inp',))
+            run('readResultArrays', _read_frd_arrays, (base_name + '.frd',))
+            run('FrdResultIndex', _index_frd, (base_name + '.frd',))
+            run('make_femmesh_from_arrays', _make_femmesh, (node_ids, node_coords, fc_elements))
+            femmesh = data.get('make_femmesh_from_arrays')
+            run('femmesh_2_mesh_arrays', _femmesh_2_mesh_arrays, (femmesh,))
+            run('get_femelement_table', _get_femelement_table, (femmesh,))
+            table = data.get('get_femelement_table')
+            if table is None:
+                # the searches do not need the FemMesh
+                table = dict(zip(element_ids.tolist(), (tuple(e) for e in fc_elements[key][1].tolist())))
+            run('get_femnodes_ele_table', _get_femnodes_ele_table, (table,))
+            bottom_nodes = node_ids[node_coords[:, 2] == 0.0].tolist()
+            run('get_femvolumeelements_by_femfacenodes', _get_femvolumeelements_by_femfacenodes,
+                (table, bottom_nodes, data.get('get_femnodes_ele_table')))
+            run('get_femelements_by_femnodes_std', _get_femelements_by_femnodes_std, (table, bottom_nodes))
+            result_set = data['readResultArrays']['Results'][0] if 'readResultArrays' in data else None
+            run('calculate_femresult_stats', _calculate_femresult_stats, (result_set,))
+            run('fill_femresult_mechanical', _fill_femresult_mechanical, (result_set,))
+            run('write_calculix_input_file', _write_calculix_input_file, (femmesh, base_name))
+            # the solver of write_calculix_input_file may leave a sub directory like _ccx
+            for f in os.listdir(work_dir):
+                path = os.path.join(work_dir, f)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    report = {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'freecad_version': FreeCAD.Version()[:3],
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results}
+    f = open(json_file, 'w')
+    json.dump(report, f, indent=1, sort_keys=True)
+    f.close()
+    print('benchmark results written to {}'.format(json_file))
+    return report
+
+
+# the functions timed by run_benchmark_suite()
+def _read_inp_arrays(file_name):
+    import importInpMesh
+    return importInpMesh.read_inp_arrays(file_name)
+
+
+def _read_frd_arrays(file_name):
+    import importCcxFrdResults
+    return importCcxFrdResults.readResultArrays(file_name)
+
+
+def _index_frd(file_name):
+    import importCcxFrdResults
+    return importCcxFrdResults.FrdResultIndex(file_name)
+
+
+def _make_femmesh(node_ids, node_coords, elements):
+    import importToolsFem
+    return importToolsFem.make_femmesh_from_arrays(node_ids, node_coords, elements)
+
+
+def _femmesh_2_mesh_arrays(femmesh):
+    import FemMesh2Mesh
+    return FemMesh2Mesh.femmesh_2_mesh_arrays(femmesh)
+
+
+def _get_femelement_table(femmesh):
+    import FemMeshTools
+    return FemMeshTools.get_femelement_table(femmesh)
+
+
+def _get_femnodes_ele_table(femelement_table):
+    import FemMeshTools
+    return FemMeshTools.get_femnodes_ele_table(None, femelement_table)
+
+
+def _get_femvolumeelements_by_femfacenodes(femelement_table, node_list, femnodes_ele_table):
+    import FemMeshTools
+    return FemMeshTools.get_femvolumeelements_by_femfacenodes(femelement_table, node_list, femnodes_ele_table)
+
+
+def _get_femelements_by_femnodes_std(femelement_table, node_list):
+    import FemMeshTools
+    return FemMeshTools.get_femelements_by_femnodes_std(femelement_table, node_list)
+
+
+def _calculate_femresult_stats(result_set):
+    import importToolsFem
+    return importToolsFem.calculate_femresult_stats(result_set, 1.0)
+
+
+def _fill_femresult_mechanical(result_set):
+    import ObjectsFem
+    import importToolsFem
+    doc = FreeCAD.newDocument('FemBenchmark')
+    try:
+        results = ObjectsFem.makeResultMechanical('Results', compact=False)
+        importToolsFem.fill_femresult_mechanical(results, result_set, 1.0)
+    finally:
+        FreeCAD.closeDocument(doc.Name)
+
+
+def _write_calculix_input_file(femmesh, base_name):
+    # a static analysis of the mesh with a material, without constraints
+    import FemInputWriterCcx
+    import ObjectsFem
+    doc = FreeCAD.newDocument('FemBenchmark')
+    try:
+        analysis = ObjectsFem.makeAnalysis('Analysis')
+        solver = ObjectsFem.makeSolverCalculix('CalculiX')
+        mesh_obj = doc.addObject('Fem::FemMeshObject', 'Mesh')
+        mesh_obj.FemMesh = femmesh
+        material = ObjectsFem.makeMaterialSolid('MechanicalMaterial')
+        mat = material.Material
+        mat['Name'] = "Steel-Generic"
+        mat['YoungsModulus'] = "200000 MPa"
+        mat['PoissonRatio'] = "0.30"
+        mat['Density'] = "7900 kg/m^3"
+        material.Material = mat
+        analysis.Member = [solver, mesh_obj, material]
+        dir_name = base_name + '_ccx'
+        os.mkdir(dir_name)
+        inp_writer = FemInputWriterCcx.FemInputWriterCcx(
+            analysis, solver,
+            mesh_obj, [{'Object': material}], [],
+            [], [],
+            [], [], [],
+            [], [], [],
+            [], [], [],
+            [], [], [],
+            'static', dir_name)
+        inp_file = inp_writer.write_calculix_input_file()
+        os.remove(inp_file)
+        os.rmdir(dir_name)
+    finally:
+        FreeCAD.closeDocument(doc.Name)
@@ -0,0 +1,327 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "CalculiX ccx runner"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemCcxRunner
+#  \ingroup FEM
+#  \brief runs CalculiX ccx in the background and parses its output while it runs
+#
+#  The stdout of ccx is read line by line in a thread. Step, increment, iteration and
+#  convergence messages are parsed into a progress dict which is passed to a callback.
+#  The run can be cancelled and has an optional wall clock limit. ccx runs in its own process
+#  group, cancel and time limit end the whole group, thus a wrapper script or an MPI launcher
+#  does not leave children behind. Only the last lines of stdout are kept. There is no Qt in
+#  here, thus it can be used without the GUI.
+
+import collections
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+
+
+default_log_lines = 10000
+cancel_grace_time = 5.0  # seconds between terminate and kill
+reader_join_time = 5.0  # seconds to wait for the output of children which outlive ccx
+
+re_step = re.compile(r'^\s*STEP\s+(\d+)')
+re_increment = re.compile(r'^\s*increment\s+(\d+)\s+attempt\s+(\d+)')
+re_iteration = re.compile(r'^\s*iteration\s+(\d+)')
+re_step_time = re.compile(r'^\s*actual step time\s*=\s*(\S+)')
+re_total_time = re.compile(r'^\s*actual total time\s*=\s*(\S+)')
+re_nonpositive_jacobian = re.compile(r'determinant in element\s+(\d+)')
+
+
+def new_progress():
+    return {
+        'step': 0,
+        'increment': 0,
+        'attempt': 0,
+        'iteration': 0,
+        'step_time': 0.0,
+        'total_time': 0.0,
+        'fraction': None,
+        'converged_increments': 0,
+        'not_converged_increments': 0,
+        'errors': [],
+        'warnings': 0,
+        'nonpositive_jacobian_elements': [],
+        'job_finished': False,
+        'message': ''
+    }
+
+
+def parse_ccx_line(line, progress, time_period=None):
+    '''updates the progress dict with one line of the ccx stdout
+    returns True if the progress has changed
+    '''
+    l = line.strip()
+    if not l:
+        return False
+    m = re_increment.match(l)
+    if m:
+        progress['increment'] = int(m.group(1))
+        progress['attempt'] = int(m.group(2))
+        progress['iteration'] = 0
+        progress['message'] = l
+        return True
+    m = re_iteration.match(l)
+    if m:
+        progress['iteration'] = int(m.group(1))
+        progress['message'] = l
+        return True
+    if l == 'convergence':
+        progress['converged_increments'] += 1
+        progress['message'] = l
+        return True
+    if l.startswith('no convergence'):
+        progress['not_converged_increments'] += 1
+        progress['message'] = l
+        return True
+    m = re_step_time.match(l)
+    if m:
+        try:
+            progress['step_time'] = float(m.group(1))
+        except ValueError:
+            return False
+        if time_period:
+            progress['fraction'] = min(1.0, progress['step_time'] / time_period)
+        return True
+    m = re_total_time.match(l)
+    if m:
+        try:
+            progress['total_time'] = float(m.group(1))
+        except ValueError:
+            return False
+        return True
+    m = re_step.match(l)
+    if m:
+        progress['step'] = int(m.group(1))
+        progress['increment'] = 0
+        progress['iteration'] = 0
+        progress['message'] = l
+        return True
+    if l.startswith('*ERROR'):
+        progress['errors'].append(l)
+        progress['message'] = l
+        return True
+    if l.startswith('*WARNING'):
+        progress['warnings'] += 1
+        return False
+    m = re_nonpositive_jacobian.search(l)
+    if m:
+        ele = int(m.group(1))
+        if ele not in progress['nonpositive_jacobian_elements']:
+            progress['nonpositive_jacobian_elements'].append(ele)
+        return False
+    if l == 'Job finished':
+        progress['job_finished'] = True
+        if time_period:
+            progress['fraction'] = 1.0
+        progress['message'] = l
+        return True
+    return False
+
+
+class CcxRunner(object):
+    '''runs ccx -i <inp file base name> in the directory of the input file
+
+    ccx_binary is the path of the ccx binary or a list of the command and its arguments
+    num_threads sets OMP_NUM_THREADS, time_limit is the wall clock limit in seconds (0 --> none)
+    time_period is the step time period of the input file, it is used for progress['fraction']
+    progress_callback is called with a copy of the progress dict from the reader thread
+    '''
+
+    def __init__(self, ccx_binary, inp_file_name, num_threads=None, time_limit=0,
+                 log_lines=default_log_lines, progress_callback=None, time_period=None):
+        self.ccx_binary = ccx_binary
+        self.inp_file_name = inp_file_name
+        self.num_threads = num_threads
+        self.time_limit = time_limit
+        self.progress_callback = progress_callback
+        self.time_period = time_period
+        self.stdout_lines = collections.deque(maxlen=log_lines)
+        self.stderr_lines = collections.deque(maxlen=log_lines)
+        self.progress = new_progress()
+        self.status = 'not started'  # running, finished, cancelled, timeout, failed
+        self.returncode = None
+        self.process = None
+        self.start_time = None
+        self.elapsed = 0.0
+        self.lock = threading.Lock()
+        self.threads = []
+        self.timer = None
+
+    def get_command(self):
+        if isinstance(self.ccx_binary, (list, tuple)):
+            command = list(self.ccx_binary)
+        else:
+            command = [self.ccx_binary]
+        return command + ['-i', os.path.splitext(os.path.basename(self.inp_file_name))[0]]
+
+    def get_environment(self):
+        env = os.environ.copy()
+        if self.num_threads:
+            env['OMP_NUM_THREADS'] = str(self.num_threads)
+        return env
+
+    def start(self):
+        startup_info = None
+        group_options = {}
+        if os.name == 'nt':
+            # Windows workaround to avoid blinking terminal window
+            startup_info = subprocess.STARTUPINFO()
+            startup_info.dwFlags = subprocess.STARTF_USESHOWWINDOW
+            group_options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            group_options['preexec_fn'] = os.setsid  # the children of ccx are in the process group of ccx
+        # ccx may crash if directory has no write permission
+        # there is also a limit of the length of file names so run ccx in the directory of the input file
+        self.start_time = time.time()
+        try:
+            self.process = subprocess.Popen(self.get_command(), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            shell=False, cwd=os.path.dirname(os.path.abspath(self.inp_file_name)),
+                                            env=self.get_environment(), startupinfo=startup_info, **group_options)
+        except OSError as e:
+            self.status = 'failed'
+            self.returncode = -1
+            self.stderr_lines.append('Starting ccx failed: {}'.format(e))
+            return False
+        self.status = 'running'
+        self.threads = [threading.Thread(target=self.read_stdout), threading.Thread(target=self.read_stderr)]
+        for t in self.threads:
+            t.daemon = True
+            t.start()
+        if self.time_limit > 0:
+            self.timer = threading.Timer(self.time_limit, self.time_limit_reached)
+            self.timer.daemon = True
+            self.timer.start()
+        return True
+
+    def read_stdout(self):
+        for line in iter(self.process.stdout.readline, b''):
+            line = decode_line(line)
+            with self.lock:
+                self.stdout_lines.append(line)
+                changed = parse_ccx_line(line, self.progress, self.time_period)
+                progress = copy_progress(self.progress) if changed else None
+            if progress and self.progress_callback:
+                self.progress_callback(progress)
+        self.process.stdout.close()
+
+    def read_stderr(self):
+        for line in iter(self.process.stderr.readline, b''):
+            with self.lock:
+                self.stderr_lines.append(decode_line(line))
+        self.process.stderr.close()
+
+    def time_limit_reached(self):
+        if self.is_running():
+            self.stop('timeout')
+
+    def cancel(self):
+        '''terminates ccx, it is killed if it does not end within cancel_grace_time
+        '''
+        if self.is_running():
+            self.stop('cancelled')
+
+    def stop(self, status):
+        with self.lock:
+            if self.status != 'running':
+                return
+            self.status = status
+        self.signal_process_group(False)
+        end_time = time.time() + cancel_grace_time
+        while self.process.poll() is None and time.time() < end_time:
+            time.sleep(0.05)
+        # children which ignore the terminate signal are killed even if ccx itself has ended
+        self.signal_process_group(True)
+
+    def signal_process_group(self, kill):
+        '''terminates or kills ccx and all processes it has started
+        '''
+        try:
+            if os.name == 'nt':
+                if kill:
+                    subprocess.call(['taskkill', '/F', '/T', '/PID', str(self.process.pid)],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                else:
+                    self.process.terminate()
+            else:
+                os.killpg(self.process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+        except OSError:
+            pass  # the processes have ended meanwhile
+
+    def is_running(self):
+        return self.process is not None and self.status == 'running' and self.process.poll() is None
+
+    def wait(self):
+        '''waits until ccx has ended, returns the return code of ccx
+        '''
+        if self.process is None:
+            return self.returncode
+        self.returncode = self.process.wait()
+        # a child which outlives ccx keeps the pipes open, its output is not waited for
+        for t in self.threads:
+            t.join(reader_join_time)
+        if self.timer:
+            self.timer.cancel()
+        with self.lock:
+            if self.status == 'running':
+                self.status = 'finished'
+        self.elapsed = time.time() - self.start_time
+        return self.returncode
+
+    def run(self):
+        '''starts ccx and waits until it has ended, returns the return code of ccx
+        '''
+        if not self.start():
+            return self.returncode
+        return self.wait()
+
+    @property
+    def stdout(self):
+        with self.lock:
+            return '\n'.join(self.stdout_lines)
+
+    @property
+    def stderr(self):
+        with self.lock:
+            return '\n'.join(self.stderr_lines)
+
+
+def decode_line(line):
+    if not isinstance(line, str):
+        line = line.decode('utf-8', 'replace')  # Python 3 bytes
+    return line.rstrip('\r\n')
+
+
+def copy_progress(progress):
+    progress = dict(progress)
+    progress['errors'] = list(progress['errors'])
+    progress['nonpositive_jacobian_elements'] = list(progress['nonpositive_jacobian_elements'])
+    return progress
@@ -0,0 +1,145 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+
+__title__ = "FEM gmsh mesh cache"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemGmshMeshCache
+#  \ingroup FEM
+#  \brief content addressed cache of the mesh files made by gmsh
+#
+#  The key of a mesh is the hash of the BREP file of the part, of the geo file and of the gmsh
+#  command. The geo file has the mesh groups, the mesh regions and all mesh parameters like
+#  element order and dimension, the file paths in it are not hashed. The mesh files are kept
+#  in the cache directory as <key>.unv, the least recently used ones are removed if the
+#  directory gets bigger than MeshCacheSize MB. A mesh only has to be made again if the
+#  geometry or a mesh parameter has changed, changed loads or materials do not need a new mesh.
+
+import FreeCAD
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+def get_cache_prefs():
+    return FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Gmsh")
+
+
+def use_mesh_cache():
+    return get_cache_prefs().GetBool("UseMeshCache", True)
+
+
+def get_cache_dir():
+    cache_dir = get_cache_prefs().GetString("MeshCacheDir", "")
+    if not cache_dir:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'FreeCAD_gmsh_mesh_cache')
+    return cache_dir
+
+
+def get_mesh_key(geometry_file, geo_file, command, paths=()):
+    '''hash of the BREP file, the geo file and the gmsh command
+    paths are the file paths written in the geo file, they are not hashed
+    '''
+    sha = hashlib.sha1()
+    f = open(geometry_file, 'rb')
+    for chunk in iter(lambda: f.read(1 << 20), b''):
+        sha.update(chunk)
+    f.close()
+    f = open(geo_file, 'rb')
+    geo = f.read()
+    f.close()
+    for path in paths:
+        geo = geo.replace(path.encode('utf-8'), b'')
+    sha.update(geo)
+    sha.update(repr(list(command)).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def get_mesh_file(key, cache_dir=None):
+    '''returns the cached mesh file of the key, None if there is none
+    '''
+    if cache_dir is None:
+        cache_dir = get_cache_dir()
+    mesh_file = os.path.join(cache_dir, key + '.unv')
+    if not os.path.isfile(mesh_file):
+        return None
+    os.utime(mesh_file, None)  # the modification time is the last use
+    return mesh_file
+
+
+def add_mesh_file(key, mesh_file, cache_dir=None, max_size=None):
+    '''copies the mesh file into the cache, returns the cached file
+    '''
+    if cache_dir is None:
+        cache_dir = get_cache_dir()
+    if max_size is None:
+        max_size = get_cache_prefs().GetInt("MeshCacheSize", 500) * 1024 * 1024
+    cached_file = os.path.join(cache_dir, key + '.unv')
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        # copy and rename, an other FreeCAD never reads a half written mesh file
+        tmp_file = cached_file + '.' + str(os.getpid()) + '.tmp'
+        shutil.copyfile(mesh_file, tmp_file)
+        if os.path.isfile(cached_file):
+            os.remove(cached_file)
+        os.rename(tmp_file, cached_file)
+    except (IOError, OSError) as e:
+        FreeCAD.Console.PrintWarning('FEM: mesh could not be added to the gmsh mesh cache: {}\n'.format(e))
+        return None
+    evict(cache_dir, max_size, keep=cached_file)
+    return cached_file
+
+
+def evict(cache_dir, max_size, keep=None):
+    '''removes the least recently used mesh files until the cache is not bigger than max_size bytes
+    keep is not removed, even if it is bigger than max_size
+    '''
+    mesh_files = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.unv'):
+            file_name = os.path.join(cache_dir, name)
+            mesh_files.append((os.path.getmtime(file_name), os.path.getsize(file_name), file_name))
+    mesh_files.sort()
+    cache_size = sum(f[1] for f in mesh_files)
+    for mtime, size, file_name in mesh_files:
+        if cache_size <= max_size:
+            break
+        if file_name == keep:
+            continue
+        try:
+            os.remove(file_name)
+            cache_size -= size
+        except OSError:
+            pass  # removed by an other FreeCAD meanwhile
+
+
+def clear_cache(cache_dir=None):
+    if cache_dir is None:
+        cache_dir = get_cache_dir()
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith('.unv'):
+                os.remove(os.path.join(cache_dir, name))
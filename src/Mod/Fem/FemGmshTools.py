@@ -29,8 +29,10 @@ __url__ = "http://www.freecadweb.org"
 
 import FreeCAD
 import Fem
+import FemGmshMeshCache
 import FemMeshTools
 import Units
+import os
 import subprocess
 import tempfile
 from platform import system
@@ -122,7 +124,10 @@ class FemGmshTools():
         self.get_group_data()
         self.write_part_file()
         self.write_geo()
-        error = self.run_gmsh_with_geo()
+        error = ''
+        if not self.get_cached_mesh():
+            error = self.run_gmsh_with_geo()
+            self.add_mesh_to_cache()
         self.read_and_set_new_mesh()
         return error
 
@@ -398,11 +403,35 @@ class FemGmshTools():
         geo.write("//\n")
         geo.write("// to run GMSH and keep file in GMSH GUI (with log), run in bash:\n")
         geo.write("// " + self.gmsh_bin + " " + self.temp_file_geo + "\n")
-        geo.close
+        geo.close()
+
+    def get_cached_mesh(self):
+        # a mesh of the same geometry, groups and mesh parameters is read from the gmsh mesh cache
+        self.mesh_cache_key = None
+        if not FemGmshMeshCache.use_mesh_cache():
+            return False
+        self.mesh_cache_key = FemGmshMeshCache.get_mesh_key(self.temp_file_geometry, self.temp_file_geo, self.get_gmsh_command_list(),
+                                                            (self.temp_file_geometry, self.temp_file_mesh))
+        cached_mesh = FemGmshMeshCache.get_mesh_file(self.mesh_cache_key)
+        if not cached_mesh:
+            if os.path.isfile(self.temp_file_mesh):
+                os.remove(self.temp_file_mesh)  # the mesh of the last run is not cached if gmsh fails
+            return False
+        print('  Mesh found in the gmsh mesh cache, GMSH does not need to run: ' + cached_mesh)
+        self.error = False
+        self.temp_file_mesh = cached_mesh
+        return True
+
+    def add_mesh_to_cache(self):
+        if self.mesh_cache_key and not self.error and os.path.isfile(self.temp_file_mesh):
+            FemGmshMeshCache.add_mesh_file(self.mesh_cache_key, self.temp_file_mesh)
+
+    def get_gmsh_command_list(self):
+        return [self.gmsh_bin, '-', self.temp_file_geo]
 
     def run_gmsh_with_geo(self):
         self.error = False
-        comandlist = [self.gmsh_bin, '-', self.temp_file_geo]
+        comandlist = self.get_gmsh_command_list()
         # print(comandlist)
         try:
             p = subprocess.Popen(comandlist, shell=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -29,7 +29,26 @@ __url__ = "http://www.freecadweb.org"
 
 import FreeCAD
 import FemMeshTools
+import FemMeshTopologyCache
 import os
+import sys
+import time
+
+
+# snapshot of the mesh, the spatial node index and the reference shape elements for the worker processes of
+# FemInputWriter.resolve_references(), it is set before the workers are forked and only read by them
+resolve_worker_data = None  # only set in the worker processes of the constraint resolution pool
+
+
+def init_resolve_worker(femmesh, femnodes_index, tasks):
+    # the initargs of a fork pool are not pickled, every worker gets its own reference of the parents data
+    global resolve_worker_data
+    resolve_worker_data = (femmesh, femnodes_index, tasks)
+
+
+def get_femnodes_of_resolve_task(task_index):
+    femmesh, femnodes_index, tasks = resolve_worker_data
+    return FemMeshTools.get_femnodes_by_refshape_element(femmesh, tasks[task_index][2], femnodes_index)
 
 
 class FemInputWriter():
@@ -77,11 +96,112 @@ class FemInputWriter():
         self.femelement_table = {}
         self.constraint_conflict_nodes = []
         self.femnodes_ele_table = {}
+        self.topology_cache = None
+        self.ref_nodes_cache = {}
+        self.femnodes_index = None
+        self.femobj_timings = {}  # femobj name --> seconds used to find its femnodes or femelement faces
+        fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+        self.use_femnodes_index = fem_prefs.GetBool("UseFemNodesIndex", True)
+        self.resolve_workers = fem_prefs.GetInt("ConstraintResolutionWorkers", 1)  # 1 --> no pool, 0 --> number of cpus
+        if fem_prefs.GetBool("UseMeshTopologyCache", True):
+            self.load_topology_cache()
+
+    def load_topology_cache(self):
+        # the femelement_table and femnodes_ele_table are only build if they are not in the cache
+        self.topology_cache = FemMeshTopologyCache.get_topology_cache(self.mesh_object)
+        self.femelement_table = self.topology_cache['femelement_table']
+        self.femnodes_ele_table = self.topology_cache['femnodes_ele_table']
+        self.ref_nodes_cache = self.topology_cache['ref_nodes']
+
+    def save_topology_cache(self):
+        if self.topology_cache is None:
+            return
+        self.topology_cache['femelement_table'] = self.femelement_table
+        self.topology_cache['femnodes_ele_table'] = self.femnodes_ele_table
+        FemMeshTopologyCache.save_topology_cache(self.mesh_object, self.topology_cache)
+
+    def get_femnodes_index(self):
+        # the spatial index is only build if a constraint needs it, None if it is not used
+        if self.use_femnodes_index and self.femnodes_index is None:
+            if not self.femnodes_mesh:
+                self.femnodes_mesh = self.femmesh.Nodes
+            self.femnodes_index = FemMeshTools.get_femnodes_index(self.femnodes_mesh)
+        return self.femnodes_index
+
+    def get_femnodes_by_femobj(self, femobj):
+        timestart = time.time()
+        nodes = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj, self.ref_nodes_cache, self.get_femnodes_index())
+        self.add_femobj_timing(femobj, timestart)
+        return nodes
+
+    def add_femobj_timing(self, femobj, timestart):
+        name = femobj['Object'].Name
+        self.femobj_timings[name] = time.time() - timestart
+        print('  ' + name + ' --> femnodes and femelements found in {0:.3f} seconds'.format(self.femobj_timings[name]))
+
+    def resolve_references(self):
+        '''finds the femnodes of the reference shape elements of all constraints in a process pool
+        the femnodes go into the ref_nodes_cache, the get_constraints methods take them from there in
+        the known order one after another, thus the input file is the same as without the pool
+        the pool is opt-in by the preference ConstraintResolutionWorkers, because it forks the running FreeCAD
+        '''
+        workers = self.resolve_workers
+        if workers == 0:
+            import multiprocessing
+            workers = multiprocessing.cpu_count()
+        if workers < 2 or not sys.platform.startswith('linux'):
+            return  # the workers need fork to share the mesh and the shapes
+        if self.femmesh.GroupCount:
+            return  # the femnodes are taken from the mesh group data
+        is_solid_femmesh = FemMeshTools.is_solid_femmesh(self.femmesh)
+        ref_facenodes_needed = FemMeshTools.ref_facenodes_needed(self.femmesh)
+        tasks = []  # [(ref_key, shape hash, shape element), ...]
+        task_keys = set()
+        node_objects = self.fixed_objects + self.displacement_objects + self.planerotation_objects + self.transform_objects + self.temperature_objects
+        if is_solid_femmesh:
+            node_objects = node_objects + self.pressure_objects
+        for femobj in node_objects + self.force_objects:
+            for ref_obj, refelements in femobj['Object'].References:
+                for refelement in refelements:
+                    r = FemMeshTools.get_element(ref_obj, refelement)
+                    if r.ShapeType not in ('Vertex', 'Edge', 'Face', 'Solid'):
+                        continue
+                    if femobj in self.force_objects and r.ShapeType == 'Face' and not ref_facenodes_needed:
+                        continue
+                    ref_key = FemMeshTools.get_ref_element_key(ref_obj, refelement)
+                    if ref_key in task_keys:
+                        continue
+                    shape_hash = FemMeshTools.get_ref_element_shape_hash(r)
+                    cached = self.ref_nodes_cache.get(ref_key)
+                    if cached is None or cached[0] != shape_hash:
+                        task_keys.add(ref_key)
+                        tasks.append((ref_key, shape_hash, r))
+        if len(tasks) < 2:
+            return
+        timestart = time.time()
+        initargs = (self.femmesh, self.get_femnodes_index(), tasks)
+        try:
+            import multiprocessing
+            if hasattr(multiprocessing, 'get_context'):
+                pool = multiprocessing.get_context('fork').Pool(min(workers, len(tasks)), init_resolve_worker, initargs)
+            else:
+                pool = multiprocessing.Pool(min(workers, len(tasks)), init_resolve_worker, initargs)
+            try:
+                results = pool.map(get_femnodes_of_resolve_task, range(len(tasks)))
+            finally:
+                pool.close()
+                pool.join()
+        except Exception as e:
+            FreeCAD.Console.PrintWarning('FEM: parallel search of the constraint femnodes failed, they are searched one after another: {}\n'.format(e))
+            return
+        for (ref_key, shape_hash, r), nodes in zip(tasks, results):
+            self.ref_nodes_cache[ref_key] = (shape_hash, list(nodes))
+        print('Femnodes of {0} reference shapes found by {1} processes in {2:.3f} seconds'.format(len(tasks), min(workers, len(tasks)), time.time() - timestart))
 
     def get_constraints_fixed_nodes(self):
         # get nodes
         for femobj in self.fixed_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = self.get_femnodes_by_femobj(femobj)
             # add nodes to constraint_conflict_nodes, needed by constraint plane rotation
             for node in femobj['Nodes']:
                 self.constraint_conflict_nodes.append(node)
@@ -89,7 +209,7 @@ class FemInputWriter():
     def get_constraints_displacement_nodes(self):
         # get nodes
         for femobj in self.displacement_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = self.get_femnodes_by_femobj(femobj)
             # add nodes to constraint_conflict_nodes, needed by constraint plane rotation
             for node in femobj['Nodes']:
                 self.constraint_conflict_nodes.append(node)
@@ -97,22 +217,22 @@ class FemInputWriter():
     def get_constraints_planerotation_nodes(self):
         # get nodes
         for femobj in self.planerotation_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = self.get_femnodes_by_femobj(femobj)
 
     def get_constraints_transform_nodes(self):
         # get nodes
         for femobj in self.transform_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = self.get_femnodes_by_femobj(femobj)
 
     def get_constraints_temperature_nodes(self):
         # get nodes
         for femobj in self.temperature_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = self.get_femnodes_by_femobj(femobj)
 
     def get_constraints_fluidsection_nodes(self):
         # get nodes
         for femobj in self.fluidsection_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            femobj['Nodes'] = FemMeshTools.get_femnodes_by_femobj_with_references(self.femmesh, femobj)
+            femobj['Nodes'] = self.get_femnodes_by_femobj(femobj)
 
     def get_constraints_force_nodeloads(self):
         # check shape type of reference shape
@@ -144,14 +264,16 @@ class FemInputWriter():
         # get node loads
         for femobj in self.force_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
             frc_obj = femobj['Object']
+            timestart = time.time()
             if frc_obj.Force == 0:
                 print('  Warning --> Force = 0')
             if femobj['RefShapeType'] == 'Vertex':  # point load on vertieces
-                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_vertex_nodeload_table(self.femmesh, frc_obj)
+                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_vertex_nodeload_table(self.femmesh, frc_obj, self.get_femnodes_index(), self.ref_nodes_cache)
             elif femobj['RefShapeType'] == 'Edge':  # line load on edges
-                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_edge_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj)
+                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_edge_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj, self.get_femnodes_index(), self.ref_nodes_cache)
             elif femobj['RefShapeType'] == 'Face':  # area load on faces
-                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_face_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj)
+                femobj['NodeLoadTable'] = FemMeshTools.get_force_obj_face_nodeload_table(self.femmesh, self.femelement_table, self.femnodes_mesh, frc_obj, self.get_femnodes_index(), self.ref_nodes_cache)
+            self.add_femobj_timing(femobj, timestart)
 
     def get_constraints_pressure_faces(self):
         # TODO see comments in get_constraints_force_nodeloads(), it applies here too. Mhh it applies to all constraints ...
@@ -172,7 +294,9 @@ class FemInputWriter():
             self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_table(self.femnodes_mesh, self.femelement_table)
 
         for femobj in self.pressure_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
-            pressure_faces = FemMeshTools.get_pressure_obj_faces(self.femmesh, self.femelement_table, self.femnodes_ele_table, femobj)
+            timestart = time.time()
+            pressure_faces = FemMeshTools.get_pressure_obj_faces(self.femmesh, self.femelement_table, self.femnodes_ele_table, femobj, self.ref_nodes_cache, self.get_femnodes_index())
+            self.add_femobj_timing(femobj, timestart)
             # print(len(pressure_faces))
             femobj['PressureFaces'] = [(femobj['Object'].Name + ': face load', pressure_faces)]
             print(femobj['PressureFaces'])
@@ -29,9 +29,11 @@ __url__ = "http://www.freecadweb.org"
 #  @{
 
 import FreeCAD
+import itertools
 import os
 import sys
 import time
+import numpy as np
 import FemMeshTools
 import FemInputWriter
 
@@ -66,10 +68,12 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         print('FemInputWriterCcx --> self.file_name  -->  ' + self.file_name)
 
     def write_calculix_input_file(self):
+        self.resolve_references()
         if self.solver_obj.SplitInputWriter is True:
             self.write_calculix_splitted_input_file()
         else:
             self.write_calculix_one_input_file()
+        self.save_topology_cache()
         return self.file_name
 
     def write_calculix_one_input_file(self):
@@ -201,20 +205,28 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         inpfileMain.write('*INCLUDE,INPUT=' + include_name + "_Node_Elem_sets.inp \n")
 
         # create separate inputfiles for each node set or constraint
+        include_files = []
         if self.fixed_objects or self.displacement_objects or self.planerotation_objects:
             inpfileNodes = open(name + "_Node_sets.inp", 'w')
+            include_files.append(inpfileNodes)
         if self.analysis_type == "thermomech" and self.temperature_objects:
             inpfileNodeTemp = open(name + "_Node_Temp.inp", 'w')
+            include_files.append(inpfileNodeTemp)
         if self.force_objects:
             inpfileForce = open(name + "_Node_Force.inp", 'w')
+            include_files.append(inpfileForce)
         if self.pressure_objects:
             inpfilePressure = open(name + "_Pressure.inp", 'w')
+            include_files.append(inpfilePressure)
         if self.analysis_type == "thermomech" and self.heatflux_objects:
             inpfileHeatflux = open(name + "_Node_Heatlfux.inp", 'w')
+            include_files.append(inpfileHeatflux)
         if self.contact_objects:
             inpfileContact = open(name + "_Surface_Contact.inp", 'w')
+            include_files.append(inpfileContact)
         if self.transform_objects:
             inpfileTransform = open(name + "_Node_Transform.inp", 'w')
+            include_files.append(inpfileTransform)
 
         # node and element sets
         self.write_element_sets_material_and_femelement_type(inpfileMain)
@@ -348,6 +360,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         # footer
         self.write_footer(inpfileMain)
         inpfileMain.close()
+        for include_file in include_files:
+            include_file.close()
         print("Writing time input file: " + str(time.clock() - timestart) + ' \n')
 
     def write_element_sets_material_and_femelement_type(self, f):
@@ -385,7 +399,6 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             else:                                                                       # multiple mats, solid
                 self.get_ccx_elsets_multiple_mat_solid()
         for ccx_elset in self.ccx_elsets:
-            f.write('*ELSET,ELSET=' + ccx_elset['ccx_elset_name'] + '\n')
             collect_ele = False
             if ccx_elset['ccx_elset']:
                 if 'fluidsection_obj'in ccx_elset:
@@ -395,19 +408,24 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                             collect_ele = True
             if ccx_elset['ccx_elset']:
                 if ccx_elset['ccx_elset'] == self.ccx_eall:
+                    f.write('*ELSET,ELSET=' + ccx_elset['ccx_elset_name'] + '\n')
                     f.write(self.ccx_eall + '\n')
-                else:
+                elif 'fluidsection_obj' in ccx_elset:
+                    # the fluid element order is used for the inlet and outlet elements, thus it is kept
+                    write_id_set(f, 'ELSET', ccx_elset['ccx_elset_name'], ccx_elset['ccx_elset'], generate=False)
                     elsetchanged = 0
                     counter = 0
                     for elid in ccx_elset['ccx_elset']:
-                        f.write(str(elid) + ',\n')
                         counter = counter + 1
                         if collect_ele is True and elsetchanged == 0 and fluidsec_obj.LiquidSectionType == "PIPE INLET":
                             self.FluidInletoutlet_ele.append([str(elid), fluidsec_obj.LiquidSectionType, 0])  # 3rd index is to track which line number the element is defined
                             elsetchanged = 1
                         elif collect_ele is True and fluidsec_obj.LiquidSectionType == "PIPE OUTLET" and counter == len(ccx_elset['ccx_elset']):
                             self.FluidInletoutlet_ele.append([str(elid), fluidsec_obj.LiquidSectionType, 0])  # 3rd index is to track which line number the element is defined
+                else:
+                    write_id_set(f, 'ELSET', ccx_elset['ccx_elset_name'], ccx_elset['ccx_elset'])
             else:
+                f.write('*ELSET,ELSET=' + ccx_elset['ccx_elset_name'] + '\n')
                 f.write('**No elements found for these objects\n')
 
     def write_node_sets_constraints_fixed(self, f):
@@ -420,9 +438,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         for femobj in self.fixed_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
             fix_obj = femobj['Object']
             f.write('** ' + fix_obj.Label + '\n')
-            f.write('*NSET,NSET=' + fix_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_set(f, 'NSET', fix_obj.Name, femobj['Nodes'])
 
     def write_node_sets_constraints_displacement(self, f):
         # get nodes
@@ -434,9 +450,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         for femobj in self.displacement_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
             disp_obj = femobj['Object']
             f.write('** ' + disp_obj.Label + '\n')
-            f.write('*NSET,NSET=' + disp_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_set(f, 'NSET', disp_obj.Name, femobj['Nodes'])
 
     def write_node_sets_constraints_planerotation(self, f):
         # get nodes
@@ -455,7 +469,6 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             l_nodes = femobj['Nodes']
             fric_obj = femobj['Object']
             f.write('** ' + fric_obj.Label + '\n')
-            f.write('*NSET,NSET=' + fric_obj.Name + '\n')
             # Code to extract nodes and coordinates on the PlaneRotation support face
             nodes_coords = []
             for node in l_nodes:
@@ -473,8 +486,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 if cnt == 0:
                     MPC = node_planerotation[i]
                     MPC_nodes.append(MPC)
-            for i in range(len(MPC_nodes)):
-                f.write(str(MPC_nodes[i]) + ',\n')
+            # the first three nodes define the plane, thus the order of the nodes is kept
+            write_id_set(f, 'NSET', fric_obj.Name, MPC_nodes, generate=False)
 
     def write_surfaces_contraints_contact(self, f):
         # get surface nodes and write them to file
@@ -498,8 +511,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                             name = "IND" + str(obj)
                         f.write('*SURFACE, NAME =' + name + '\n')
                         v = self.mesh_object.FemMesh.getccxVolumesByFace(ref_shape)
-                        for i in v:
-                            f.write("{},S{}\n".format(i[0], i[1]))
+                        write_lines_in_chunks(f, ("{},S{}\n".format(i[0], i[1]) for i in v))
 
     def write_node_sets_constraints_transform(self, f):
         # get nodes
@@ -512,11 +524,9 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             trans_obj = femobj['Object']
             f.write('** ' + trans_obj.Label + '\n')
             if trans_obj.TransformType == "Rectangular":
-                f.write('*NSET,NSET=Rect' + trans_obj.Name + '\n')
+                write_id_set(f, 'NSET', 'Rect' + trans_obj.Name, femobj['Nodes'])
             elif trans_obj.TransformType == "Cylindrical":
-                f.write('*NSET,NSET=Cylin' + trans_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+                write_id_set(f, 'NSET', 'Cylin' + trans_obj.Name, femobj['Nodes'])
 
     def write_node_sets_constraints_temperature(self, f):
         # get nodes
@@ -528,9 +538,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         for femobj in self.temperature_objects:  # femobj --> dict, FreeCAD document object is femobj['Object']
             temp_obj = femobj['Object']
             f.write('** ' + temp_obj.Label + '\n')
-            f.write('*NSET,NSET=' + temp_obj.Name + '\n')
-            for n in femobj['Nodes']:
-                f.write(str(n) + ',\n')
+            write_id_set(f, 'NSET', temp_obj.Name, femobj['Nodes'])
 
     def write_materials(self, f):
         f.write('\n***********************************************************\n')
@@ -868,17 +876,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             direction_vec = femobj['Object'].DirectionVector
             for ref_shape in femobj['NodeLoadTable']:
                 f.write('** ' + ref_shape[0] + '\n')
-                for n in sorted(ref_shape[1]):
-                    node_load = ref_shape[1][n]
-                    if (direction_vec.x != 0.0):
-                        v1 = "{:.13E}".format(direction_vec.x * node_load)
-                        f.write(str(n) + ',1,' + v1 + '\n')
-                    if (direction_vec.y != 0.0):
-                        v2 = "{:.13E}".format(direction_vec.y * node_load)
-                        f.write(str(n) + ',2,' + v2 + '\n')
-                    if (direction_vec.z != 0.0):
-                        v3 = "{:.13E}".format(direction_vec.z * node_load)
-                        f.write(str(n) + ',3,' + v3 + '\n')
+                write_node_load_lines(f, ref_shape[1], direction_vec)
                 f.write('\n')
             f.write('\n')
 
@@ -893,16 +891,12 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
             prs_obj = femobj['Object']
             f.write('** ' + prs_obj.Label + '\n')
             rev = -1 if prs_obj.Reversed else 1
+            pressure = "{}".format(rev * prs_obj.Pressure)
+            pressure_opposite = "{}".format(-1 * rev * prs_obj.Pressure)
             f.write('*DLOAD\n')
             for ref_shape in femobj['PressureFaces']:
                 f.write('** ' + ref_shape[0] + '\n')
-                for face, fno in ref_shape[1]:
-                    if fno > 0:  # solid mesh face
-                        f.write("{},P{},{}\n".format(face, fno, rev * prs_obj.Pressure))
-                    elif fno == 0:  # on shell mesh face: fno == 0 --> normal of element face == face normal
-                        f.write("{},P,{}\n".format(face, rev * prs_obj.Pressure))
-                    elif fno == -1:  # on shell mesh face: fno == -1 --> normal of element face oposite direction face normal
-                        f.write("{},P,{}\n".format(face, -1 * rev * prs_obj.Pressure))
+                write_lines_in_chunks(f, (get_pressure_line(face, fno, pressure, pressure_opposite) for face, fno in ref_shape[1]))
 
     def write_constraints_temperature(self, f):
         f.write('\n***********************************************************\n')
@@ -936,8 +930,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                         if ho.ShapeType == 'Face':
                             v = self.mesh_object.FemMesh.getccxVolumesByFace(ho)
                             f.write("** Heat flux on face {}\n".format(elem))
-                            for i in v:
-                                f.write("{},F{},{},{}\n".format(i[0], i[1], heatflux_obj.AmbientTemp, heatflux_obj.FilmCoef * 0.001))  # SvdW add factor to force heatflux to units system of t/mm/s/K # OvG: Only write out the VolumeIDs linked to a particular face
+                            film = "{},{}".format(heatflux_obj.AmbientTemp, heatflux_obj.FilmCoef * 0.001)
+                            write_lines_in_chunks(f, ("{},F{},{}\n".format(i[0], i[1], film) for i in v))  # SvdW add factor to force heatflux to units system of t/mm/s/K # OvG: Only write out the VolumeIDs linked to a particular face
             elif heatflux_obj.ConstraintType == "DFlux":
                 f.write('*DFLUX\n')
                 for o, elem_tup in heatflux_obj.References:
@@ -946,8 +940,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                         if ho.ShapeType == 'Face':
                             v = self.mesh_object.FemMesh.getccxVolumesByFace(ho)
                             f.write("** Heat flux on face {}\n".format(elem))
-                            for i in v:
-                                f.write("{},S{},{}\n".format(i[0], i[1], heatflux_obj.DFlux * 0.001))
+                            dflux = "{}".format(heatflux_obj.DFlux * 0.001)
+                            write_lines_in_chunks(f, ("{},S{},{}\n".format(i[0], i[1], dflux) for i in v))
 
     def write_constraints_fluidsection(self, f):
         f.write('\n***********************************************************\n')
@@ -1101,7 +1095,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
         mat_obj = self.material_objects[0]['Object']
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.beamsection_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.beamsection_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for beamsec_data in self.beamsection_objects:
             beamsec_obj = beamsec_data['Object']
             ccx_elset = {}
@@ -1116,7 +1110,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
         mat_obj = self.material_objects[0]['Object']
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.fluidsection_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.fluidsection_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for fluidsec_data in self.fluidsection_objects:
             fluidsec_obj = fluidsec_data['Object']
             ccx_elset = {}
@@ -1131,7 +1125,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
         mat_obj = self.material_objects[0]['Object']
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.shellthickness_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.shellthickness_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for shellth_data in self.shellthickness_objects:
             shellth_obj = shellth_data['Object']
             ccx_elset = {}
@@ -1146,7 +1140,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
         beamsec_obj = self.beamsection_objects[0]['Object']
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for mat_data in self.material_objects:
             mat_obj = mat_data['Object']
             ccx_elset = {}
@@ -1161,7 +1155,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
         fluidsec_obj = self.fluidsection_objects[0]['Object']
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for mat_data in self.material_objects:
             mat_obj = mat_data['Object']
             ccx_elset = {}
@@ -1176,7 +1170,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
         shellth_obj = self.shellthickness_objects[0]['Object']
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for mat_data in self.material_objects:
             mat_obj = mat_data['Object']
             ccx_elset = {}
@@ -1200,7 +1194,7 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
                 self.femnodes_mesh = self.femmesh.Nodes
             if not self.femnodes_ele_table:
                 self.femnodes_ele_table = FemMeshTools.get_femnodes_ele_table(self.femnodes_mesh, self.femelement_table)
-            FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_table)
+            FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, self.femnodes_ele_table, self.ref_nodes_cache, self.get_femnodes_index())
         for mat_data in self.material_objects:
             mat_obj = mat_data['Object']
             ccx_elset = {}
@@ -1213,8 +1207,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
     def get_ccx_elsets_multiple_mat_multiple_beam(self):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.beamsection_objects)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.beamsection_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for beamsec_data in self.beamsection_objects:
             beamsec_obj = beamsec_data['Object']
             for mat_data in self.material_objects:
@@ -1234,8 +1228,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
     def get_ccx_elsets_multiple_mat_multiple_fluid(self):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.fluidsection_objects)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.fluidsection_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for fluidsec_data in self.fluidsection_objects:
             fluidsec_obj = fluidsec_data['Object']
             for mat_data in self.material_objects:
@@ -1255,8 +1249,8 @@ class FemInputWriterCcx(FemInputWriter.FemInputWriter):
     def get_ccx_elsets_multiple_mat_multiple_shell(self):
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.shellthickness_objects)
-        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects)
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.shellthickness_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
+        FemMeshTools.get_femelement_sets(self.femmesh, self.femelement_table, self.material_objects, None, self.ref_nodes_cache, self.get_femnodes_index())
         for shellth_data in self.shellthickness_objects:
             shellth_obj = shellth_data['Object']
             for mat_data in self.material_objects:
@@ -1375,4 +1369,94 @@ def liquid_section_def(obj, section_type):
         return section_geo
     else:
         return ''
+
+
+# bulk writing of id lists and load tables, used for all sets and loads of the input file
+# the lines are joined in chunks, one f.write for write_chunk_size lines
+write_chunk_size = 10000
+min_generate_run = 3  # consecutive ids of shorter runs are written id by id
+
+
+def write_lines_in_chunks(f, lines):
+    '''writes an iterable of lines, each line ends with a newline
+    '''
+    lines = iter(lines)
+    while True:
+        chunk = ''.join(itertools.islice(lines, write_chunk_size))
+        if not chunk:
+            break
+        f.write(chunk)
+
+
+def write_id_lines(f, ids):
+    '''writes one id per line followed by a comma
+    '''
+    if isinstance(ids, np.ndarray):
+        ids = ids.tolist()
+    for i in range(0, len(ids), write_chunk_size):
+        f.write(',\n'.join(map(str, ids[i:i + write_chunk_size])) + ',\n')
+
+
+def get_id_runs(ids, min_run=None):
+    '''returns the sorted unique ids which are not part of a run and a (n, 2) array of
+    the first and last id of each run of at least min_run consecutive ids
+    '''
+    if min_run is None:
+        min_run = min_generate_run
+    ids = np.unique(np.asarray(ids, dtype=np.int64))
+    if not len(ids):
+        return ids, np.empty((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(ids) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(ids)]))
+    lengths = ends - starts
+    is_run = lengths >= min_run
+    singles = ids[np.repeat(~is_run, lengths)]
+    runs = np.column_stack((ids[starts[is_run]], ids[ends[is_run] - 1]))
+    return singles, runs
+
+
+def write_id_set(f, keyword, set_name, ids, generate=True):
+    '''writes a *NSET or *ELSET (keyword 'NSET' or 'ELSET') with the ids
+    with generate the runs of consecutive ids are written in a second card of the same set with
+    the GENERATE parameter, CalculiX adds the ids of both cards to the set, the order of the ids
+    is not kept, thus a set where the order matters has to be written with generate=False
+    '''
+    card = '*{0},{0}={1}'.format(keyword, set_name)
+    if not generate:
+        f.write(card + '\n')
+        write_id_lines(f, ids)
+        return
+    singles, runs = get_id_runs(ids)
+    if len(singles) or not len(runs):
+        f.write(card + '\n')
+        write_id_lines(f, singles)
+    if len(runs):
+        f.write(card + ',GENERATE\n')
+        write_lines_in_chunks(f, ('{},{},1\n'.format(first, last) for first, last in runs.tolist()))
+
+
+def get_pressure_line(face, fno, pressure, pressure_opposite):
+    if fno > 0:  # solid mesh face
+        return "{},P{},{}\n".format(face, fno, pressure)
+    elif fno == 0:  # on shell mesh face: fno == 0 --> normal of element face == face normal
+        return "{},P,{}\n".format(face, pressure)
+    elif fno == -1:  # on shell mesh face: fno == -1 --> normal of element face oposite direction face normal
+        return "{},P,{}\n".format(face, pressure_opposite)
+    return ''
+
+
+def write_node_load_lines(f, node_loads, direction_vec):
+    '''writes the *CLOAD lines of a node load dict {node: load}, sorted by node
+    one line for each none zero component of the direction vector
+    '''
+    components = [(dof, d) for dof, d in ((1, direction_vec.x), (2, direction_vec.y), (3, direction_vec.z)) if d != 0.0]
+    if not components or not node_loads:
+        return
+    line_format = ''.join(['{0},' + str(dof) + ',{' + str(i + 1) + ':.13E}\n' for i, (dof, d) in enumerate(components)])
+    nodes = sorted(node_loads)
+    loads = np.array([node_loads[n] for n in nodes], dtype=np.float64)
+    component_loads = np.outer(loads, [d for dof, d in components]).tolist()
+    write_lines_in_chunks(f, (line_format.format(n, *l) for n, l in zip(nodes, component_loads)))
+
 ##  @}
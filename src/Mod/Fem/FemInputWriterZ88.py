@@ -60,11 +60,12 @@ class FemInputWriterZ88(FemInputWriter.FemInputWriter):
         print('FemInputWriterZ88 --> self.file_name  -->  ' + self.file_name)
 
     def write_z88_input(self):
+        self.resolve_references()
         if not self.femnodes_mesh:
             self.femnodes_mesh = self.femmesh.Nodes
         if not self.femelement_table:
             self.femelement_table = FemMeshTools.get_femelement_table(self.femmesh)
-            self.element_count = len(self.femelement_table)
+        self.element_count = len(self.femelement_table)
         self.set_z88_elparam()
         self.write_z88_mesh()
         self.write_z88_contraints()
@@ -74,6 +75,7 @@ class FemInputWriterZ88(FemInputWriter.FemInputWriter):
         self.write_z88_integration_properties()
         self.write_z88_memory_parameter()
         self.write_z88_solver_parameter()
+        self.save_topology_cache()
         return self.dir_name
 
     def set_z88_elparam(self):
@@ -29,6 +29,8 @@ __url__ = "http://www.freecadweb.org"
 ## @package FwmMesh2Mesh
 #  \ingroup FEM
 
+import FreeCAD
+import numpy as np
 import time
 # import Mesh
 
@@ -86,93 +88,97 @@ face_dicts = {
     20: hexaFaces}
 
 
-def femmesh_2_mesh(myFemMesh, myResults=None):
-    shiftBits = 20  # allows a million nodes, needs to be higher for more nodes in a FemMesh
-
-    # This code generates a dict and a faceCode for each face of all elements
-    # All faceCodes are than sorted.
-
+def femmesh_2_mesh(myFemMesh, myResults=None, scale=1.0):
+    # returns the surface triangles of the volume elements as a list of points, three for each triangle
+    # with result object the node coordinates are displaced by scale times the displacements
     start_time = time.clock()
-    faceCodeList = []
-    faceCodeDict = {}
+    triangles = femmesh_2_mesh_arrays(myFemMesh, myResults, scale)
+    output_mesh = [FreeCAD.Vector(p[0], p[1], p[2]) for p in triangles.reshape(-1, 3).tolist()]
+    end_time = time.clock()
+    print('Mesh by surface search method: ', end_time - start_time)
+    return output_mesh
 
-    for ele in myFemMesh.Volumes:
-        element_nodes = myFemMesh.getElementNodes(ele)
-        # print 'element_node: ', element_nodes
-        faceDef = face_dicts[len(element_nodes)]
-
-        for key in faceDef:
-            nodeList = []
-            codeList = []
-            faceCode = 0
-            shifter = 0
-            for nodeIdx in faceDef[key]:
-                nodeList.append(element_nodes[nodeIdx])
-                codeList.append(element_nodes[nodeIdx])
-            codeList.sort()
-            for node in codeList:
-                faceCode += (node << shifter)
-                # x << n: x shifted left by n bits = Multiplication
-                shifter += shiftBits
-            # print 'codeList: ', codeList
-            faceCodeDict[faceCode] = nodeList
-            faceCodeList.append(faceCode)
-
-    faceCodeList.sort()
-    allFaces = len(faceCodeList)
-    actFaceIdx = 0
-    singleFaces = []
-    # Here we search for faces, which do not have a counterpart.
-    # These are the faces on the surface of the mesh.
-    while actFaceIdx < allFaces:
-        if actFaceIdx < (allFaces - 1):
-            if faceCodeList[actFaceIdx] == faceCodeList[actFaceIdx + 1]:
-                actFaceIdx += 2
-            else:
-                # print 'found a single Face: ', faceCodeList[actFaceIdx]
-                singleFaces.append(faceCodeList[actFaceIdx])
-                actFaceIdx += 1
-        else:
-            print('found a last Face: ', faceCodeList[actFaceIdx])
-            singleFaces.append(faceCodeList[actFaceIdx])
-            actFaceIdx += 1
 
-    output_mesh = []
+def femmesh_2_mesh_arrays(myFemMesh, myResults=None, scale=1.0):
+    # returns a (n, 3, 3) array of the surface triangle corner coordinates
+    surface_faces = get_surface_faces(myFemMesh)
+    node_ids, coords = get_femmesh_node_arrays(myFemMesh)
     if myResults:
-        print(myResults.Name)
-        for myFace in singleFaces:
-            face_nodes = faceCodeDict[myFace]
-            dispVec0 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[0])]
-            dispVec1 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[1])]
-            dispVec2 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[2])]
-            triangle = [myFemMesh.getNodeById(face_nodes[0]) + dispVec0,
-                        myFemMesh.getNodeById(face_nodes[1]) + dispVec1,
-                        myFemMesh.getNodeById(face_nodes[2]) + dispVec2]
-            output_mesh.extend(triangle)
-            # print 'my triangle: ', triangle
-            if len(face_nodes) == 4:
-                dispVec3 = myResults.DisplacementVectors[myResults.NodeNumbers.index(face_nodes[3])]
-                triangle = [myFemMesh.getNodeById(face_nodes[2]) + dispVec2,
-                            myFemMesh.getNodeById(face_nodes[3]) + dispVec3,
-                            myFemMesh.getNodeById(face_nodes[0]) + dispVec0]
-                output_mesh.extend(triangle)
-                # print 'my 2. triangle: ', triangle
-
+        coords = coords + scale * get_displacement_array(myResults, node_ids)
+    triangles = []
+    for faces in surface_faces:
+        face_coords = coords[np.searchsorted(node_ids, faces)]
+        triangles.append(face_coords[:, [0, 1, 2]])
+        if faces.shape[1] == 4:
+            triangles.append(face_coords[:, [2, 3, 0]])
+    if not triangles:
+        return np.zeros((0, 3, 3))
+    return np.concatenate(triangles)
+
+
+def get_surface_faces(myFemMesh):
+    # This code collects the faces of all volume elements of a kind into one array for each face size.
+    # Faces with the same sorted nodes are shared by two elements, the faces which are found only once
+    # are the faces on the surface of the mesh.
+    # returns a list with one (n, 3) and one (n, 4) array of the node ids of the surface faces
+    faces_by_size = {3: [], 4: []}
+    for node_count, element_nodes in get_femmesh_volume_arrays(myFemMesh).items():
+        faceDef = face_dicts[node_count]
+        for key in sorted(faceDef):
+            faces_by_size[len(faceDef[key])].append(element_nodes[:, faceDef[key]])
+    surface_faces = []
+    for size in (3, 4):
+        if faces_by_size[size]:
+            faces = np.concatenate(faces_by_size[size])
+            surface_faces.append(faces[get_single_faces(faces)])
+    return surface_faces
+
+
+def get_single_faces(faces):
+    # indices of the faces whose sorted node ids are found only once
+    sorted_faces = np.sort(faces, axis=1)
+    order = np.lexsort(sorted_faces.T[::-1])
+    sorted_faces = sorted_faces[order]
+    is_new = np.ones(len(faces), dtype=bool)
+    is_new[1:] = np.any(sorted_faces[1:] != sorted_faces[:-1], axis=1)
+    starts = np.flatnonzero(is_new)
+    counts = np.diff(np.append(starts, len(faces)))
+    return np.sort(order[starts[counts == 1]])
+
+
+def get_femmesh_volume_arrays(myFemMesh):
+    # {nodes per element: (n, nodes per element) array of element nodes}
+    element_nodes = {}
+    for ele in myFemMesh.Volumes:
+        nodes = myFemMesh.getElementNodes(ele)
+        element_nodes.setdefault(len(nodes), []).append(nodes)
+    return dict((count, np.array(nodes, dtype=np.int64)) for count, nodes in element_nodes.items())
+
+
+def get_femmesh_node_arrays(myFemMesh):
+    # sorted node ids and their coordinates
+    nodes = myFemMesh.Nodes
+    node_ids = np.array(sorted(nodes), dtype=np.int64)
+    coords = np.array([(nodes[n].x, nodes[n].y, nodes[n].z) for n in node_ids.tolist()], dtype=np.float64).reshape(-1, 3)
+    return node_ids, coords
+
+
+def get_displacement_array(myResults, node_ids):
+    # displacements of the nodes of node_ids, nodes without result are not displaced
+    # the proxy of a mechanical result reads lazy and compact results without filling their list properties
+    displacements = np.zeros((len(node_ids), 3))
+    proxy = getattr(myResults, 'Proxy', None)
+    if hasattr(proxy, 'get_array'):
+        result_nodes = proxy.get_array(myResults, 'NodeNumbers').astype(np.int64)
     else:
-        for myFace in singleFaces:
-            face_nodes = faceCodeDict[myFace]
-            triangle = [myFemMesh.getNodeById(face_nodes[0]),
-                        myFemMesh.getNodeById(face_nodes[1]),
-                        myFemMesh.getNodeById(face_nodes[2])]
-            output_mesh.extend(triangle)
-            # print 'my triangle: ', triangle
-            if len(face_nodes) == 4:
-                triangle = [myFemMesh.getNodeById(face_nodes[2]),
-                            myFemMesh.getNodeById(face_nodes[3]),
-                            myFemMesh.getNodeById(face_nodes[0])]
-                output_mesh.extend(triangle)
-                # print 'my 2. triangle: ', triangle
-
-    end_time = time.clock()
-    print('Mesh by surface search method: ', end_time - start_time)
-    return output_mesh
+        result_nodes = np.array(myResults.NodeNumbers, dtype=np.int64)
+    if len(result_nodes):
+        if hasattr(proxy, 'get_array'):
+            vectors = proxy.get_array(myResults, 'DisplacementVectors')
+        else:
+            vectors = np.array([(v.x, v.y, v.z) for v in myResults.DisplacementVectors], dtype=np.float64)
+        positions = np.searchsorted(node_ids, result_nodes)
+        found = positions < len(node_ids)
+        found[found] = node_ids[positions[found]] == result_nodes[found]
+        displacements[positions[found]] = vectors[found]
+    return displacements
@@ -28,25 +28,27 @@ __url__ = "http://www.freecadweb.org"
 #  @{
 
 import FreeCAD
+import hashlib
+import numpy as np
 
 
-def get_femnodes_by_femobj_with_references(femmesh, femobj):
+def get_femnodes_by_femobj_with_references(femmesh, femobj, ref_nodes_cache=None, femnodes_index=None):
     node_set = []
     if femmesh.GroupCount:
         node_set = get_femnode_set_from_group_data(femmesh, femobj)
         # print('node_set_group: ', node_set)
     if not node_set:
-        node_set = get_femnodes_by_references(femmesh, femobj['Object'].References)
+        node_set = get_femnodes_by_references(femmesh, femobj['Object'].References, ref_nodes_cache, femnodes_index)
         # print('node_set_nogroup: ', node_set)
     return node_set
 
 
-def get_femelements_by_references(femmesh, femelement_table, references, femnodes_ele_table=None):
+def get_femelements_by_references(femmesh, femelement_table, references, femnodes_ele_table=None, ref_nodes_cache=None, femnodes_index=None):
     '''get the femelements for a list of references
     '''
     references_femelements = []
     for ref in references:
-        ref_femnodes = get_femnodes_by_refshape(femmesh, ref)  # femnodes for the current ref
+        ref_femnodes = get_femnodes_by_refshape(femmesh, ref, ref_nodes_cache, femnodes_index)  # femnodes for the current ref
         if femnodes_ele_table:
             # blind fast binary search, works for volumes only
             references_femelements += get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, ref_femnodes)  # femelements for all references
@@ -56,12 +58,12 @@ def get_femelements_by_references(femmesh, femelement_table, references, femnode
     return references_femelements
 
 
-def get_femnodes_by_references(femmesh, references):
+def get_femnodes_by_references(femmesh, references, ref_nodes_cache=None, femnodes_index=None):
     '''get the femnodes for a list of references
     '''
     references_femnodes = []
     for ref in references:
-        references_femnodes += get_femnodes_by_refshape(femmesh, ref)
+        references_femnodes += get_femnodes_by_refshape(femmesh, ref, ref_nodes_cache, femnodes_index)
 
     # return references_femnodes  # keeps duplicate nodes, keeps node order
 
@@ -69,22 +71,128 @@ def get_femnodes_by_references(femmesh, references):
     return list(set(references_femnodes))  # removes duplicate nodes, sortes node order
 
 
-def get_femnodes_by_refshape(femmesh, ref):
+def get_femnodes_by_refshape(femmesh, ref, ref_nodes_cache=None, femnodes_index=None):
+    '''ref_nodes_cache is a dict of a mesh topology cache, see FemMeshTopologyCache
+    the nodes of a reference shape element are only searched, if they are not in it
+    with a femnodes_index the search uses the spatial index, see get_femnodes_index()
+    '''
     nodes = []
     for refelement in ref[1]:
         r = get_element(ref[0], refelement)  # the method getElement(element) does not return Solid elements
         print('  ReferenceShape : ', r.ShapeType, ', ', ref[0].Name, ', ', ref[0].Label, ' --> ', refelement)
+        if r.ShapeType in ('Vertex', 'Edge', 'Face', 'Solid'):
+            nodes += get_femnodes_by_ref_element(femmesh, ref[0], refelement, r, ref_nodes_cache, femnodes_index)
+        else:
+            print('  No Vertice, Edge, Face or Solid as reference shapes!')
+    return nodes
+
+
+def get_ref_element_key(ref_obj, refelement):
+    # the key of the femnodes of a reference shape element in the ref_nodes_cache
+    return (ref_obj.Name, refelement)
+
+
+def get_ref_element_shape_hash(r):
+    # the type, bound box and vertex points of the reference shape element, a moved or resized shape has other femnodes
+    # cheap in contrast to the exact geometry of exportBrepToString()
+    b = r.BoundBox
+    signature = [r.ShapeType, len(r.Edges), b.XMin, b.YMin, b.ZMin, b.XMax, b.YMax, b.ZMax]
+    for v in r.Vertexes:
+        signature += [v.X, v.Y, v.Z]
+    return hashlib.sha1(repr(signature).encode()).hexdigest()
+
+
+def get_femnodes_by_ref_element(femmesh, ref_obj, refelement, r, ref_nodes_cache=None, femnodes_index=None):
+    '''the femnodes of the shape element r = refelement of ref_obj, taken from the ref_nodes_cache if they are in it
+    the ref_nodes_cache is {(ref_obj.Name, refelement): (shape hash, femnodes)}, cached femnodes of a changed shape are not used
+    '''
+    if ref_nodes_cache is not None:
+        ref_key = get_ref_element_key(ref_obj, refelement)
+        shape_hash = get_ref_element_shape_hash(r)
+        cached = ref_nodes_cache.get(ref_key)
+        if cached is not None and cached[0] == shape_hash:
+            return list(cached[1])
+    nodes = get_femnodes_by_refshape_element(femmesh, r, femnodes_index)
+    if ref_nodes_cache is not None:
+        ref_nodes_cache[ref_key] = (shape_hash, list(nodes))
+    return nodes
+
+
+# reference shape elements with more candidate nodes are searched by the FemMesh methods,
+# the exact on shape test of every candidate node is faster in C++
+femnodes_index_max_candidates = 5000
+
+
+def get_femnodes_index(femnodes_mesh):
+    '''spatial index of the femnodes to find the femnodes of reference shapes
+    {'node_ids': [nodeID, ...], 'coords': [[x, y, z], ...], 'tree': KDTree of coords or None}
+    the femnodes_mesh are the femmesh.Nodes, they are already transformed by the mesh placement
+    '''
+    try:
+        from scipy.spatial import cKDTree as KDTree
+    except ImportError:
+        try:
+            from PathScripts.kdtree import KDTree
+        except ImportError:
+            KDTree = None  # a bound box mask over all femnodes is used
+    node_ids = np.array(sorted(femnodes_mesh), dtype=np.int64)
+    coords = np.array([(femnodes_mesh[n].x, femnodes_mesh[n].y, femnodes_mesh[n].z) for n in node_ids.tolist()], dtype=np.float64).reshape(-1, 3)
+    tree = None
+    if KDTree is not None and len(node_ids):
+        tree = KDTree(coords)
+    return {'node_ids': node_ids, 'coords': coords, 'tree': tree}
+
+
+def get_femnodes_index_candidates(femnodes_index, bound_box, tolerance):
+    '''returns the indices into femnodes_index['node_ids'] of the femnodes inside the bound box enlarged by tolerance
+    '''
+    coords = femnodes_index['coords']
+    box_min = np.array((bound_box.XMin, bound_box.YMin, bound_box.ZMin)) - tolerance
+    box_max = np.array((bound_box.XMax, bound_box.YMax, bound_box.ZMax)) + tolerance
+    if femnodes_index['tree'] is not None:
+        # the ball of the maximum norm around the box center contains the box
+        center = (box_min + box_max) / 2.0
+        radius = (box_max - box_min).max() / 2.0
+        candidates = np.array(femnodes_index['tree'].query_ball_point(center, radius, p=np.inf), dtype=np.int64)
+    else:
+        candidates = np.arange(len(coords))
+    inside = np.all((coords[candidates] >= box_min) & (coords[candidates] <= box_max), axis=1)
+    return candidates[inside]
+
+
+def get_femnodes_by_refshape_element(femmesh, r, femnodes_index=None):
+    '''the femnodes of a Vertex, Edge, Face or Solid reference shape element
+    same search as the FemMesh methods: the femnodes in the bound box of the shape are candidates,
+    a candidate belongs to the shape if its distance to the shape is below the tolerance of the shape
+    '''
+    if femnodes_index is None:
         if r.ShapeType == 'Vertex':
-            nodes += femmesh.getNodesByVertex(r)
+            return femmesh.getNodesByVertex(r)
         elif r.ShapeType == 'Edge':
-            nodes += femmesh.getNodesByEdge(r)
+            return femmesh.getNodesByEdge(r)
         elif r.ShapeType == 'Face':
-            nodes += femmesh.getNodesByFace(r)
+            return femmesh.getNodesByFace(r)
         elif r.ShapeType == 'Solid':
-            nodes += femmesh.getNodesBySolid(r)
+            return femmesh.getNodesBySolid(r)
+        return []
+    coords = femnodes_index['coords']
+    if r.ShapeType == 'Vertex':
+        limit = r.Tolerance
+        candidates = get_femnodes_index_candidates(femnodes_index, r.BoundBox, limit)
+        distances_2 = ((coords[candidates] - np.array((r.X, r.Y, r.Z))) ** 2).sum(axis=1)
+        found = candidates[distances_2 <= limit * limit]
+    else:
+        if r.ShapeType == 'Solid':
+            limit = r.BoundBox.DiagonalLength ** 2 / 10000.0
         else:
-            print('  No Vertice, Edge, Face or Solid as reference shapes!')
-    return nodes
+            limit = r.Tolerance
+        candidates = get_femnodes_index_candidates(femnodes_index, r.BoundBox, limit)
+        if len(candidates) > femnodes_index_max_candidates:
+            return get_femnodes_by_refshape_element(femmesh, r)
+        import Part
+        found = [c for c in candidates.tolist() if r.distToShape(Part.Vertex(FreeCAD.Vector(*coords[c])))[0] < limit]
+        found = np.array(found, dtype=np.int64)
+    return sorted(femnodes_index['node_ids'][found].tolist())
 
 
 def get_femelement_table(femmesh):
@@ -106,7 +214,11 @@ def get_femelement_table(femmesh):
 
 def get_femnodes_ele_table(femnodes_mesh, femelement_table):
     '''the femnodes_ele_table contains for each node its membership in elements
-    {nodeID : [[eleID, NodePosition], [], ...], nodeID : [[], [], ...], ...}
+    it is stored in compressed sparse row (CSR) form in NumPy arrays:
+    {'ele_ids': [eleID, ...], 'ele_lens': [number of nodes of the element, ...],
+     'node_ids': [nodeID, ...] sorted, 'offsets': [start of the node in ele_index and positions, ...],
+     'ele_index': [index in ele_ids, ...], 'positions': [NodePosition, ...]}
+    the memberships of node_ids[i] are ele_index[offsets[i]:offsets[i + 1]] and positions[offsets[i]:offsets[i + 1]]
     stored informatation are:
     element number, the number of nodes per element, the position of the node in the element.
     The position of the node in the element is coded as a set bit at that position in a bit array (integer)
@@ -114,19 +226,26 @@ def get_femnodes_ele_table(femnodes_mesh, femelement_table):
     but I did not know, how to get this from the mesh.
     Since the femelement_table contains either volume or face or edgemesh the femnodes_ele_table only
     has either volume or face or edge elements, see get_femelement_table()
+    The femnodes_mesh is not needed, the nodes without element have no entry.
     '''
-    femnodes_ele_table = {}  # node_dict in ulrichs class
-    for n in femnodes_mesh:  # initialize it with sorted node keys and empty lists
-        femnodes_ele_table[n] = []
-    for ele in femelement_table:
-        ele_list = femelement_table[ele]
-        # print(ele_list)
-        pos = int(1)
-        for ele_node in ele_list:
-            femnodes_ele_table[ele_node].append([ele, pos])
-            pos = pos << 1
-    print('len femnodes_ele_table:' + str(len(femnodes_ele_table)))
-    # print('femnodes_ele_table: ', femnodes_ele_table)
+    ele_ids = np.array(list(femelement_table.keys()), dtype=np.int64)
+    ele_nodes = [femelement_table[ele] for ele in ele_ids.tolist()]
+    ele_lens = np.array([len(nodes) for nodes in ele_nodes], dtype=np.int64)
+    ele_starts = np.cumsum(ele_lens) - ele_lens
+    nodes = np.fromiter((n for nodes in ele_nodes for n in nodes), dtype=np.int64, count=int(ele_lens.sum()))
+    ele_index = np.repeat(np.arange(len(ele_ids)), ele_lens)
+    positions = np.left_shift(1, np.arange(len(nodes)) - np.repeat(ele_starts, ele_lens))
+    # sort the memberships by node, a stable sort keeps the element order for each node
+    order = np.argsort(nodes, kind='mergesort')
+    node_ids, node_counts = np.unique(nodes[order], return_counts=True)
+    femnodes_ele_table = {
+        'ele_ids': ele_ids,
+        'ele_lens': ele_lens,
+        'node_ids': node_ids,
+        'offsets': np.concatenate(([0], np.cumsum(node_counts))),
+        'ele_index': ele_index[order],
+        'positions': positions[order]}
+    print('len femnodes_ele_table:' + str(len(node_ids)))
     return femnodes_ele_table
 
 
@@ -139,35 +258,53 @@ def get_copy_of_empty_femelement_table(femelement_table):
     return empty_femelement_table.copy()
 
 
+def get_femnodes_ele_memberships(femnodes_ele_table, node_set):
+    '''returns the indices into femnodes_ele_table['ele_index'] and ['positions'] of all memberships of the nodes of node_set
+    '''
+    node_ids = femnodes_ele_table['node_ids']
+    offsets = femnodes_ele_table['offsets']
+    node_set = np.unique(np.asarray(list(node_set), dtype=np.int64))
+    node_index = np.searchsorted(node_ids, node_set)
+    # nodes without element are not in node_ids
+    in_table = node_index < len(node_ids)
+    in_table[in_table] = node_ids[node_index[in_table]] == node_set[in_table]
+    node_index = node_index[in_table]
+    starts = offsets[node_index]
+    counts = offsets[node_index + 1] - starts
+    # concatenated ranges starts[i]:starts[i] + counts[i]
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
 def get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_set):
     '''Now we are looking for nodes inside of the Faces = filling the bit_pattern_dict
-    {eleID : [lenEleNodes, binary_position]}
+    {'ele_ids': [eleID, ...], 'ele_lens': [lenEleNodes, ...], 'bit_pattern': [binary_position, ...]}
     see forumpost for a ver good explanation whats really happening
     http://forum.freecadweb.org/viewtopic.php?f=18&p=141133&sid=013c93f496a63872951d2ce521702ffa#p141108
     The bit_pattern_dict holds later an integer (bit array) for each element, which gives us
     the information we are searching for:
     Is this element part of the node list (searching for elements) or  has this element a face we are searching for?
-    The number in the ele_dict is organized as a bit array.
+    The number in the bit_pattern is organized as a bit array.
     The corresponding bit is set, if the node of the node_set is contained in the element.
     '''
-    print('len femnodes_ele_table:' + str(len(femnodes_ele_table)))
+    print('len femnodes_ele_table:' + str(len(femnodes_ele_table['node_ids'])))
     print('len node_set: ' + str(len(node_set)))
-    # print('node_set: ', node_set)
-    bit_pattern_dict = get_copy_of_empty_femelement_table(femelement_table)
-    # # initializing the bit_pattern_dict
-    for ele in femelement_table:
-        len_ele = len(femelement_table[ele])
-        bit_pattern_dict[ele] = [len_ele, 0]
-    for node in node_set:
-        for nList in femnodes_ele_table[node]:
-            bit_pattern_dict[nList[0]][1] += nList[1]
-    print('len bit_pattern_dict:' + str(len(bit_pattern_dict)))
-    # print('bit_pattern_dict: ', bit_pattern_dict)
+    memberships = get_femnodes_ele_memberships(femnodes_ele_table, node_set)
+    # every node sets a different bit of an element, thus summing up the positions is a bitwise or
+    bit_pattern = np.bincount(
+        femnodes_ele_table['ele_index'][memberships],
+        weights=femnodes_ele_table['positions'][memberships],
+        minlength=len(femnodes_ele_table['ele_ids'])).astype(np.int64)
+    bit_pattern_dict = {
+        'ele_ids': femnodes_ele_table['ele_ids'],
+        'ele_lens': femnodes_ele_table['ele_lens'],
+        'bit_pattern': bit_pattern}
+    print('len bit_pattern_dict:' + str(len(bit_pattern)))
     return bit_pattern_dict
 
 
 def get_ccxelement_faces_from_binary_search(bit_pattern_dict):
     '''get the CalculiX element face numbers
+    returns [[eleID, face number], ...] sorted by element and face number
     '''
     tet10_mask = {
         119: 1,
@@ -212,12 +349,21 @@ def get_ccxelement_faces_from_binary_search(bit_pattern_dict):
         10: tet10_mask,
         15: pent15_mask,
         20: hex20_mask}
-    faces = []
-    for ele in bit_pattern_dict:
-        mask_dict = vol_dict[bit_pattern_dict[ele][0]]
-        for key in mask_dict:
-            if (key & bit_pattern_dict[ele][1]) == key:
-                faces.append([ele, mask_dict[key]])
+    ele_ids = bit_pattern_dict['ele_ids']
+    ele_lens = bit_pattern_dict['ele_lens']
+    bit_pattern = bit_pattern_dict['bit_pattern']
+    face_eles = []
+    face_numbers = []
+    for len_ele, mask_dict in vol_dict.items():
+        is_len_ele = ele_lens == len_ele
+        for key, face_number in mask_dict.items():
+            found = np.flatnonzero(is_len_ele & ((bit_pattern & key) == key))
+            face_eles.append(ele_ids[found])
+            face_numbers.append(np.full(len(found), face_number, dtype=np.int64))
+    face_eles = np.concatenate(face_eles)
+    face_numbers = np.concatenate(face_numbers)
+    order = np.lexsort((face_numbers, face_eles))
+    faces = np.column_stack((face_eles[order], face_numbers[order])).tolist()
     print('found Faces: ', len(faces))
     print('faces: ', faces)
     return faces
@@ -230,22 +376,12 @@ def get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, node_l
     blind fast binary search, but workd for volumes only
     '''
     print('binary search: get_femelements_by_femnodes_bin')
-    vol_masks = {
-        4: 15,
-        6: 63,
-        8: 255,
-        10: 1023,
-        15: 32767,
-        20: 1048575}
     # Now we are looking for nodes inside of the Volumes = filling the bit_pattern_dict
-    print('len femnodes_ele_table:' + str(len(femnodes_ele_table)))
     bit_pattern_dict = get_bit_pattern_dict(femelement_table, femnodes_ele_table, node_list)
-    # search
-    ele_list = []  # The ele_list contains the result of the search.
-    for ele in bit_pattern_dict:
-        # print('bit_pattern_dict[ele][0]: ', bit_pattern_dict[ele][0])
-        if bit_pattern_dict[ele][1] == vol_masks[bit_pattern_dict[ele][0]]:
-            ele_list.append(ele)
+    # search, all bits of the element nodes are set
+    vol_masks = np.left_shift(1, bit_pattern_dict['ele_lens']) - 1
+    found = bit_pattern_dict['bit_pattern'] == vol_masks
+    ele_list = bit_pattern_dict['ele_ids'][found].tolist()  # The ele_list contains the result of the search.
     print('found Volumes: ', len(ele_list))
     print('   volumes: ', len(ele_list))
     return ele_list
@@ -259,17 +395,18 @@ def get_femelements_by_femnodes_std(femelement_table, node_list):
     nodes: nodelist '''
     print('std search: get_femelements_by_femnodes_std')
     e = []  # elementlist
+    node_set = set(node_list)
     for elementID in sorted(femelement_table):
         nodecount = 0
         for nodeID in femelement_table[elementID]:
-            if nodeID in node_list:
+            if nodeID in node_set:
                 nodecount = nodecount + 1
         if nodecount == len(femelement_table[elementID]):   # all nodes of the element are in the node_list!
             e.append(elementID)
     return e
 
 
-def get_femvolumeelements_by_femfacenodes(femelement_table, node_list):
+def get_femvolumeelements_by_femfacenodes(femelement_table, node_list, femnodes_ele_table=None):
     '''assume femelement_table only has volume elements
     for every femvolumeelement of femelement_table
     for tetra4 and tetra10 the C++ methods could be used --> test again to be sure
@@ -279,53 +416,32 @@ def get_femvolumeelements_by_femfacenodes(femelement_table, node_list):
     if penta15 volume element --> if exact 6 or 8 element nodes are in node_list --> add femelement
     e: elementlist
     nodes: nodelist '''
-    e = []  # elementlist
-    for elementID in sorted(femelement_table):
-        nodecount = 0
-        el_nd_ct = len(femelement_table[elementID])
-        if el_nd_ct == 4:  # tetra4
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 3:
-                e.append(elementID)
-        elif el_nd_ct == 10:  # tetra10
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 4:
-                e.append(elementID)
-        elif el_nd_ct == 8:  # hexa8
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 4:
-                e.append(elementID)
-        elif el_nd_ct == 20:  # hexa20
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 8:
-                e.append(elementID)
-        elif el_nd_ct == 6:  # penta6
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 3 or nodecount == 4:
-                e.append(elementID)
-        elif el_nd_ct == 15:  # penta15
-            for nodeID in femelement_table[elementID]:
-                if nodeID in node_list:
-                    nodecount = nodecount + 1
-            if nodecount == 6 or nodecount == 8:
-                e.append(elementID)
-        else:
-            FreeCAD.Console.PrintError('Error in get_femvolumeelements_by_femfacenodes(): not known volume element: ' + el_nd_ct + '\n')
-    # print(sorted(e))
+    # element node count --> node counts of an element face
+    face_node_counts = {
+        4: (3, ),  # tetra4
+        10: (4, ),  # tetra10
+        8: (4, ),  # hexa8
+        20: (8, ),  # hexa20
+        6: (3, 4),  # penta6
+        15: (6, 8)}  # penta15
+    if femnodes_ele_table is None:
+        femnodes_ele_table = get_femnodes_ele_table(None, femelement_table)
+    ele_ids = femnodes_ele_table['ele_ids']
+    ele_lens = femnodes_ele_table['ele_lens']
+    memberships = get_femnodes_ele_memberships(femnodes_ele_table, node_list)
+    nodecounts = np.bincount(femnodes_ele_table['ele_index'][memberships], minlength=len(ele_ids))
+    found = np.zeros(len(ele_ids), dtype=bool)
+    for el_nd_ct in np.unique(ele_lens).tolist():
+        if el_nd_ct not in face_node_counts:
+            FreeCAD.Console.PrintError('Error in get_femvolumeelements_by_femfacenodes(): not known volume element: ' + str(el_nd_ct) + '\n')
+            continue
+        found |= (ele_lens == el_nd_ct) & np.in1d(nodecounts, face_node_counts[el_nd_ct])
+    e = np.sort(ele_ids[found]).tolist()  # elementlist
+    # print(e)
     return e
 
 
-def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_table=None):  # fem_objects = FreeCAD FEM document objects
+def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_table=None, ref_nodes_cache=None, femnodes_index=None):  # fem_objects = FreeCAD FEM document objects
     # get femelements for reference shapes of each obj.References
     count_femelements = 0
     referenced_femelements = []
@@ -335,7 +451,7 @@ def get_femelement_sets(femmesh, femelement_table, fem_objects, femnodes_ele_tab
         fem_object['ShortName'] = get_elset_short_name(obj, fem_object_i)  # unique short identifier
         if obj.References:
             ref_shape_femelements = []
-            ref_shape_femelements = get_femelements_by_references(femmesh, femelement_table, obj.References, femnodes_ele_table)
+            ref_shape_femelements = get_femelements_by_references(femmesh, femelement_table, obj.References, femnodes_ele_table, ref_nodes_cache, femnodes_index)
             referenced_femelements += ref_shape_femelements
             count_femelements += len(ref_shape_femelements)
             fem_object['FEMElements'] = ref_shape_femelements
@@ -428,7 +544,7 @@ def get_elset_short_name(obj, i):
         print('Error: ', obj.Name, ' --> ', obj.Proxy.Type)
 
 
-def get_force_obj_vertex_nodeload_table(femmesh, frc_obj):
+def get_force_obj_vertex_nodeload_table(femmesh, frc_obj, femnodes_index=None, ref_nodes_cache=None):
     # force_obj_node_load_table = [('refshape_name.elemname',node_load_table), ..., ('refshape_name.elemname',node_load_table)]
     force_obj_node_load_table = []
     node_load = frc_obj.Force / len(frc_obj.References)
@@ -436,14 +552,14 @@ def get_force_obj_vertex_nodeload_table(femmesh, frc_obj):
         node_count = len(elem_tup)
         for elem in elem_tup:
             ref_node = o.Shape.getElement(elem)
-            node = femmesh.getNodesByVertex(ref_node)
+            node = get_femnodes_by_ref_element(femmesh, o, elem, ref_node, ref_nodes_cache, femnodes_index)
             elem_info_string = 'node load on shape: ' + o.Name + ':' + elem
             force_obj_node_load_table.append((elem_info_string, {node[0]: node_load / node_count}))
 
     return force_obj_node_load_table
 
 
-def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj):
+def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj, femnodes_index=None, ref_nodes_cache=None):
     # force_obj_node_load_table = [('refshape_name.elemname',node_load_table), ..., ('refshape_name.elemname',node_load_table)]
     force_obj_node_load_table = []
     sum_ref_edge_length = 0
@@ -459,20 +575,15 @@ def get_force_obj_edge_nodeload_table(femmesh, femelement_table, femnodes_mesh,
             ref_edge = o.Shape.getElement(elem)
 
             # edge_table = { meshedgeID : ( nodeID, ... , nodeID ) }
-            edge_table = get_ref_edgenodes_table(femmesh, femelement_table, ref_edge)
-
-            # node_length_table = [ (nodeID, length), ... , (nodeID, length) ]  some nodes will have more than one entry
-            node_length_table = get_ref_edgenodes_lengths(femnodes_mesh, edge_table)
+            refedge_nodes = get_femnodes_by_ref_element(femmesh, o, elem, ref_edge, ref_nodes_cache, femnodes_index)
+            edge_table = get_ref_edgenodes_table(femmesh, femelement_table, ref_edge, femnodes_index, refedge_nodes)
 
-            # node_sum_length_table = { nodeID : Length, ... , nodeID : Length }  LengthSum for each node, one entry for each node
-            node_sum_length_table = get_ref_shape_node_sum_geom_table(node_length_table)
+            # node_ids, node_lengths = arrays of the nodeIDs and their LengthSum, one entry for each node
+            node_ids, node_lengths = get_ref_edgenodes_length_arrays(femnodes_mesh, edge_table)
 
             # node_load_table = { nodeID : NodeLoad, ... , nodeID : NodeLoad }  NodeLoad for each node, one entry for each node
-            node_load_table = {}
-            sum_node_lengths = 0  # for debugging
-            for node in node_sum_length_table:
-                sum_node_lengths += node_sum_length_table[node]  # for debugging
-                node_load_table[node] = node_sum_length_table[node] * force_per_sum_ref_edge_length
+            node_load_table = dict(zip(node_ids.tolist(), (node_lengths * force_per_sum_ref_edge_length).tolist()))
+            sum_node_lengths = node_lengths.sum()  # for debugging
             ratio_refedge_lengths = sum_node_lengths / ref_edge.Length
             if ratio_refedge_lengths < 0.99 or ratio_refedge_lengths > 1.01:
                 FreeCAD.Console.PrintError('Error on: ' + frc_obj.Name + ' --> ' + o.Name + '.' + elem + '\n')
@@ -550,10 +661,10 @@ def get_pressure_obj_faces_depreciated(femmesh, femobj):
     return pressure_faces
 
 
-def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj):
+def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj, ref_nodes_cache=None, femnodes_index=None):
     if is_solid_femmesh(femmesh):
         # get the nodes
-        prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj)  # sorted and duplicates removed
+        prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj, ref_nodes_cache, femnodes_index)  # sorted and duplicates removed
         # print('prs_face_node_set: ', prs_face_node_set)
         # fill the bit_pattern_dict and search for the faces
         bit_pattern_dict = get_bit_pattern_dict(femelement_table, femnodes_ele_table, prs_face_node_set)
@@ -575,7 +686,7 @@ def get_pressure_obj_faces(femmesh, femelement_table, femnodes_ele_table, femobj
     return pressure_faces
 
 
-def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj):
+def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh, frc_obj, femnodes_index=None, ref_nodes_cache=None):
     # force_obj_node_load_table = [('refshape_name.elemname',node_load_table), ..., ('refshape_name.elemname',node_load_table)]
     force_obj_node_load_table = []
     sum_ref_face_area = 0
@@ -591,20 +702,17 @@ def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh,
             ref_face = o.Shape.getElement(elem)
 
             # face_table = { meshfaceID : ( nodeID, ... , nodeID ) }
-            face_table = get_ref_facenodes_table(femmesh, femelement_table, ref_face)
-
-            # node_area_table = [ (nodeID, Area), ... , (nodeID, Area) ]  some nodes will have more than one entry
-            node_area_table = get_ref_facenodes_areas(femnodes_mesh, face_table)
+            ref_face_nodes = None
+            if ref_facenodes_needed(femmesh):
+                ref_face_nodes = get_femnodes_by_ref_element(femmesh, o, elem, ref_face, ref_nodes_cache, femnodes_index)
+            face_table = get_ref_facenodes_table(femmesh, femelement_table, ref_face, femnodes_index, ref_face_nodes)
 
-            # node_sum_area_table = { nodeID : Area, ... , nodeID : Area }  AreaSum for each node, one entry for each node
-            node_sum_area_table = get_ref_shape_node_sum_geom_table(node_area_table)
+            # node_ids, node_areas = arrays of the nodeIDs and their AreaSum, one entry for each node
+            node_ids, node_areas = get_ref_facenodes_area_arrays(femnodes_mesh, face_table)
 
             # node_load_table = { nodeID : NodeLoad, ... , nodeID : NodeLoad }  NodeLoad for each node, one entry for each node
-            node_load_table = {}
-            sum_node_areas = 0  # for debugging
-            for node in node_sum_area_table:
-                sum_node_areas += node_sum_area_table[node]  # for debugging
-                node_load_table[node] = node_sum_area_table[node] * force_per_sum_ref_face_area
+            node_load_table = dict(zip(node_ids.tolist(), (node_areas * force_per_sum_ref_face_area).tolist()))
+            sum_node_areas = node_areas.sum()  # for debugging
             ratio_refface_areas = sum_node_areas / ref_face.Area
             if ratio_refface_areas < 0.99 or ratio_refface_areas > 1.01:
                 FreeCAD.Console.PrintError('Error on: ' + frc_obj.Name + ' --> ' + o.Name + '.' + elem + '\n')
@@ -632,16 +740,18 @@ def get_force_obj_face_nodeload_table(femmesh, femelement_table, femnodes_mesh,
     return force_obj_node_load_table
 
 
-def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
+def get_ref_edgenodes_table(femmesh, femelement_table, refedge, femnodes_index=None, refedge_nodes=None):
     edge_table = {}  # { meshedgeID : ( nodeID, ... , nodeID ) }
-    refedge_nodes = femmesh.getNodesByEdge(refedge)
+    if refedge_nodes is None:
+        refedge_nodes = get_femnodes_by_refshape_element(femmesh, refedge, femnodes_index)
+    refedge_node_set = set(refedge_nodes)
     if is_solid_femmesh(femmesh):
         refedge_fem_volumeelements = []
         # if at least two nodes of a femvolumeelement are in refedge_nodes the volume is added to refedge_fem_volumeelements
         for elem in femelement_table:
             nodecount = 0
             for node in femelement_table[elem]:
-                if node in refedge_nodes:
+                if node in refedge_node_set:
                     nodecount += 1
             if nodecount > 1:
                 refedge_fem_volumeelements.append(elem)
@@ -649,7 +759,7 @@ def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
         for elem in refedge_fem_volumeelements:
             fe_refedge_nodes = []
             for node in femelement_table[elem]:
-                if node in refedge_nodes:
+                if node in refedge_node_set:
                     fe_refedge_nodes.append(node)
                 edge_table[elem] = fe_refedge_nodes  # { volumeID : ( edgenodeID, ... , edgenodeID  )} # only the refedge nodes
         #  FIXME duplicate_mesh_elements: as soon as contact ans springs are supported the user should decide on which edge the load is applied
@@ -660,7 +770,7 @@ def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
         for elem in femelement_table:
             nodecount = 0
             for node in femelement_table[elem]:
-                if node in refedge_nodes:
+                if node in refedge_node_set:
                     nodecount += 1
             if nodecount > 1:
                 refedge_fem_faceelements.append(elem)
@@ -668,7 +778,7 @@ def get_ref_edgenodes_table(femmesh, femelement_table, refedge):
         for elem in refedge_fem_faceelements:
             fe_refedge_nodes = []
             for node in femelement_table[elem]:
-                if node in refedge_nodes:
+                if node in refedge_node_set:
                     fe_refedge_nodes.append(node)
                 edge_table[elem] = fe_refedge_nodes  # { faceID : ( edgenodeID, ... , edgenodeID  )} # only the refedge nodes
         #  FIXME duplicate_mesh_elements: as soon as contact ans springs are supported the user should decide on which edge the load is applied
@@ -684,49 +794,50 @@ def get_ref_edgenodes_lengths(femnodes_mesh, edge_table):
     # calculate the appropriate node_length for every node of every mesh edge (me)
     # G. Lakshmi Narasaiah, Finite Element Analysis, p206ff
 
-    #  [ (nodeID, length), ... , (nodeID, length) ]  some nodes will have more than one entry
+    #  [ (nodeID, length), ... , (nodeID, length) ]  one entry for each node, the lengths of all mesh edges are summed
+    node_ids, node_lengths = get_ref_edgenodes_length_arrays(femnodes_mesh, edge_table)
+    return list(zip(node_ids.tolist(), node_lengths.tolist()))
+
+
+def get_ref_edgenodes_length_arrays(femnodes_mesh, edge_table):
+    # the mesh edges are grouped by their node count, the lengths of each group are calculated at once
+    # returns the node ids and the summed node lengths as arrays
     if (not femnodes_mesh) or (not edge_table):
         FreeCAD.Console.PrintError("Error in get_ref_edgenodes_lengths(): Empty femnodes_mesh or edge_table!\n")
-        return []
-    node_length_table = []
-    mesh_edge_length = 0
-    # print(len(edge_table))
-    for me in edge_table:
-        femmesh_edgetype = len(edge_table[me])
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    node_ids, node_coords, element_groups = get_geom_table_arrays(femnodes_mesh, edge_table)
+    node_lengths = np.zeros(len(node_ids))
+    for femmesh_edgetype, edges in element_groups:
+        P = node_coords[edges]  # P[:, 0] is P1 of every mesh edge
         if femmesh_edgetype == 2:  # 2 node femmesh edge
             # end_node_length = mesh_edge_length / 2
             #    ______
             #  P1      P2
-            P1 = femnodes_mesh[edge_table[me][0]]
-            P2 = femnodes_mesh[edge_table[me][1]]
-            edge_vec = P2 - P1
-            mesh_edge_length = edge_vec.Length
-            # print(mesh_edge_length)
+            mesh_edge_length = get_vector_lengths(P[:, 1] - P[:, 0])
             end_node_length = mesh_edge_length / 2.0
-            node_length_table.append((edge_table[me][0], end_node_length))
-            node_length_table.append((edge_table[me][1], end_node_length))
+            edge_node_lengths = np.column_stack((end_node_length, end_node_length))
 
         elif femmesh_edgetype == 3:  # 3 node femmesh edge
             # end_node_length = mesh_edge_length / 6
             # middle_node_length = mesh_face_area * 2 / 3
             #   _______ _______
             # P1       P3      P2
-            P1 = femnodes_mesh[edge_table[me][0]]
-            P2 = femnodes_mesh[edge_table[me][1]]
-            P3 = femnodes_mesh[edge_table[me][2]]
-            edge_vec1 = P3 - P1
-            edge_vec2 = P2 - P3
-            mesh_edge_length = edge_vec1.Length + edge_vec2.Length
-            # print(me, ' --> ', mesh_edge_length)
+            mesh_edge_length = get_vector_lengths(P[:, 2] - P[:, 0]) + get_vector_lengths(P[:, 1] - P[:, 2])
             end_node_length = mesh_edge_length / 6.0
             middle_node_length = mesh_edge_length * 2.0 / 3.0
-            node_length_table.append((edge_table[me][0], end_node_length))
-            node_length_table.append((edge_table[me][1], end_node_length))
-            node_length_table.append((edge_table[me][2], middle_node_length))
-    return node_length_table
+            edge_node_lengths = np.column_stack((end_node_length, end_node_length, middle_node_length))
+        else:
+            continue
+        np.add.at(node_lengths, edges.ravel(), edge_node_lengths.ravel())
+    return node_ids, node_lengths
 
 
-def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
+def ref_facenodes_needed(femmesh):
+    # get_ref_facenodes_table() does not need the femnodes of the ref_face for a volume mesh with face data
+    return not (is_solid_femmesh(femmesh) and not has_no_face_data(femmesh))
+
+
+def get_ref_facenodes_table(femmesh, femelement_table, ref_face, femnodes_index=None, ref_face_nodes=None):
     face_table = {}  # { meshfaceID : ( nodeID, ... , nodeID ) }
     if is_solid_femmesh(femmesh):
         if has_no_face_data(femmesh):
@@ -734,16 +845,18 @@ def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
             # there is no face data
             # the problem if we retrive the nodes ourself is they are not sorted we just have the nodes. We need to sourt them according
             # the shell mesh notaion of tria3, tria6, quad4, quad8
-            ref_face_nodes = femmesh.getNodesByFace(ref_face)
+            if ref_face_nodes is None:
+                ref_face_nodes = get_femnodes_by_refshape_element(femmesh, ref_face, femnodes_index)
             # try to use getccxVolumesByFace() to get the volume ids of element with elementfaces on the ref_face --> should work for tetra4 and tetra10
             ref_face_volume_elements = femmesh.getccxVolumesByFace(ref_face)  # list of tupels (mv, ccx_face_nr)
+            ref_face_node_set = set(ref_face_nodes)
             if ref_face_volume_elements:  # mesh with tetras
                 print('Use of getccxVolumesByFace() has returned volume elements of the ref_face!')
                 for ve in ref_face_volume_elements:
                     veID = ve[0]
                     ve_ref_face_nodes = []
                     for nodeID in femelement_table[veID]:
-                        if nodeID in ref_face_nodes:
+                        if nodeID in ref_face_node_set:
                             ve_ref_face_nodes.append(nodeID)
                     face_table[veID] = ve_ref_face_nodes  # { volumeID : ( facenodeID, ... , facenodeID ) } only the ref_face nodes
             else:  # mesh with hexa or penta
@@ -752,7 +865,7 @@ def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
                 for veID in ref_face_volume_elements:
                     ve_ref_face_nodes = []
                     for nodeID in femelement_table[veID]:
-                        if nodeID in ref_face_nodes:
+                        if nodeID in ref_face_node_set:
                             ve_ref_face_nodes.append(nodeID)
                     face_table[veID] = ve_ref_face_nodes  # { volumeID : ( facenodeID, ... , facenodeID ) } only the ref_face nodes
                 face_table = build_mesh_faces_of_volume_elements(face_table, femelement_table)  # we need to resort the nodes to make them build a element face
@@ -761,7 +874,8 @@ def get_ref_facenodes_table(femmesh, femelement_table, ref_face):
             for mf in faces:
                 face_table[mf] = femmesh.getElementNodes(mf)
     elif is_face_femmesh(femmesh):
-        ref_face_nodes = femmesh.getNodesByFace(ref_face)
+        if ref_face_nodes is None:
+            ref_face_nodes = get_femnodes_by_refshape_element(femmesh, ref_face, femnodes_index)
         ref_face_elements = get_femelements_by_femnodes_std(femelement_table, ref_face_nodes)
         for mf in ref_face_elements:
             face_table[mf] = femelement_table[mf]
@@ -879,19 +993,26 @@ def build_mesh_faces_of_volume_elements(face_table, femelement_table):
 def get_ref_facenodes_areas(femnodes_mesh, face_table):
     # calculate the appropriate node_areas for every node of every mesh face (mf)
     # G. Lakshmi Narasaiah, Finite Element Analysis, p206ff
+
+    #  [ (nodeID,Area), ... , (nodeID,Area) ]  one entry for each node, the areas of all mesh faces are summed
+    node_ids, node_areas = get_ref_facenodes_area_arrays(femnodes_mesh, face_table)
+    return list(zip(node_ids.tolist(), node_areas.tolist()))
+
+
+def get_ref_facenodes_area_arrays(femnodes_mesh, face_table):
+    # the mesh faces are grouped by their node count, the areas of each group are calculated at once
+    # returns the node ids and the summed node areas as arrays
     # FIXME only gives exact results in case of a real triangle. If for S6 or C3D10 elements
     # the midnodes are not on the line between the end nodes the area will not be a triangle
     # see http://forum.freecadweb.org/viewtopic.php?f=18&t=10939&start=40#p91355  and ff
     # same applies for the quads, results are exact only if mid nodes are on the line between corner nodes
-
-    #  [ (nodeID,Area), ... , (nodeID,Area) ]  some nodes will have more than one entry
     if (not femnodes_mesh) or (not face_table):
         FreeCAD.Console.PrintError("Error: Empty femnodes_mesh or face_table!\n")
-        return []
-    node_area_table = []
-    mesh_face_area = 0
-    for mf in face_table:
-        femmesh_facetype = len(face_table[mf])
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    node_ids, node_coords, element_groups = get_geom_table_arrays(femnodes_mesh, face_table)
+    node_areas = np.zeros(len(node_ids))
+    for femmesh_facetype, faces in element_groups:
+        P = node_coords[faces]  # P[:, 0] is P1 of every mesh face
         # nodes in face_table need to be in the right node order for the following calcualtions
         if femmesh_facetype == 3:  # 3 node femmesh face triangle
             # corner_node_area = mesh_face_area / 3.0
@@ -900,16 +1021,9 @@ def get_ref_facenodes_areas(femnodes_mesh, face_table):
             #     /  \
             #    /____\
             #  P1      P2
-            P1 = femnodes_mesh[face_table[mf][0]]
-            P2 = femnodes_mesh[face_table[mf][1]]
-            P3 = femnodes_mesh[face_table[mf][2]]
-
-            mesh_face_area = get_triangle_area(P1, P2, P3)
+            mesh_face_area = get_triangle_areas(P[:, 0], P[:, 1], P[:, 2])
             corner_node_area = mesh_face_area / 3.0
-
-            node_area_table.append((face_table[mf][0], corner_node_area))
-            node_area_table.append((face_table[mf][1], corner_node_area))
-            node_area_table.append((face_table[mf][2], corner_node_area))
+            face_node_areas = np.column_stack([corner_node_area] * 3)
 
         elif femmesh_facetype == 4:  # 4 node femmesh face quad
             # corner_node_area = mesh_face_area / 4.0
@@ -921,20 +1035,11 @@ def get_ref_facenodes_areas(femnodes_mesh, face_table):
             #    | / t1 |
             #    |/_____|
             #  P1       P2
-            P1 = femnodes_mesh[face_table[mf][0]]
-            P2 = femnodes_mesh[face_table[mf][1]]
-            P3 = femnodes_mesh[face_table[mf][2]]
-            P4 = femnodes_mesh[face_table[mf][3]]
-
-            mesh_face_t1_area = get_triangle_area(P1, P2, P3)
-            mesh_face_t2_area = get_triangle_area(P1, P3, P4)
-            mesh_face_area = mesh_face_t1_area + mesh_face_t1_area
+            mesh_face_t1_area = get_triangle_areas(P[:, 0], P[:, 1], P[:, 2])
+            mesh_face_t2_area = get_triangle_areas(P[:, 0], P[:, 2], P[:, 3])
+            mesh_face_area = mesh_face_t1_area + mesh_face_t2_area
             corner_node_area = mesh_face_area / 4.0
-
-            node_area_table.append((face_table[mf][0], corner_node_area))
-            node_area_table.append((face_table[mf][1], corner_node_area))
-            node_area_table.append((face_table[mf][2], corner_node_area))
-            node_area_table.append((face_table[mf][3], corner_node_area))
+            face_node_areas = np.column_stack([corner_node_area] * 4)
 
         elif femmesh_facetype == 6:  # 6 node femmesh face triangle
             # corner_node_area = 0
@@ -948,26 +1053,14 @@ def get_ref_facenodes_areas(femnodes_mesh, face_table):
             #    /t1 \  /t2 \
             #   /_____\/_____\
             # P1      P4      P2
-            P1 = femnodes_mesh[face_table[mf][0]]
-            P2 = femnodes_mesh[face_table[mf][1]]
-            P3 = femnodes_mesh[face_table[mf][2]]
-            P4 = femnodes_mesh[face_table[mf][3]]
-            P5 = femnodes_mesh[face_table[mf][4]]
-            P6 = femnodes_mesh[face_table[mf][5]]
-
-            mesh_face_t1_area = get_triangle_area(P1, P4, P6)
-            mesh_face_t2_area = get_triangle_area(P2, P5, P4)
-            mesh_face_t3_area = get_triangle_area(P3, P6, P5)
-            mesh_face_t4_area = get_triangle_area(P4, P5, P6)
+            mesh_face_t1_area = get_triangle_areas(P[:, 0], P[:, 3], P[:, 5])
+            mesh_face_t2_area = get_triangle_areas(P[:, 1], P[:, 4], P[:, 3])
+            mesh_face_t3_area = get_triangle_areas(P[:, 2], P[:, 5], P[:, 4])
+            mesh_face_t4_area = get_triangle_areas(P[:, 3], P[:, 4], P[:, 5])
             mesh_face_area = mesh_face_t1_area + mesh_face_t2_area + mesh_face_t3_area + mesh_face_t4_area
             middle_node_area = mesh_face_area / 3.0
-
-            node_area_table.append((face_table[mf][0], 0))
-            node_area_table.append((face_table[mf][1], 0))
-            node_area_table.append((face_table[mf][2], 0))
-            node_area_table.append((face_table[mf][3], middle_node_area))
-            node_area_table.append((face_table[mf][4], middle_node_area))
-            node_area_table.append((face_table[mf][5], middle_node_area))
+            corner_node_area = np.zeros(len(faces))
+            face_node_areas = np.column_stack([corner_node_area] * 3 + [middle_node_area] * 3)
 
         elif femmesh_facetype == 8:  # 8 node femmesh face quad
             # corner_node_area = -mesh_face_area / 12.0  (negativ!)
@@ -983,34 +1076,36 @@ def get_ref_facenodes_areas(femnodes_mesh, face_table):
             #    | t1 \   |   /  t2 |
             #    |______\_|_/_______|
             #  P1         P5        P2
-            P1 = femnodes_mesh[face_table[mf][0]]
-            P2 = femnodes_mesh[face_table[mf][1]]
-            P3 = femnodes_mesh[face_table[mf][2]]
-            P4 = femnodes_mesh[face_table[mf][3]]
-            P5 = femnodes_mesh[face_table[mf][4]]
-            P6 = femnodes_mesh[face_table[mf][5]]
-            P7 = femnodes_mesh[face_table[mf][6]]
-            P8 = femnodes_mesh[face_table[mf][7]]
-
-            mesh_face_t1_area = get_triangle_area(P1, P5, P8)
-            mesh_face_t2_area = get_triangle_area(P5, P2, P6)
-            mesh_face_t3_area = get_triangle_area(P6, P3, P7)
-            mesh_face_t4_area = get_triangle_area(P7, P4, P8)
-            mesh_face_t5_area = get_triangle_area(P5, P7, P8)
-            mesh_face_t6_area = get_triangle_area(P5, P6, P7)
+            mesh_face_t1_area = get_triangle_areas(P[:, 0], P[:, 4], P[:, 7])
+            mesh_face_t2_area = get_triangle_areas(P[:, 4], P[:, 1], P[:, 5])
+            mesh_face_t3_area = get_triangle_areas(P[:, 5], P[:, 2], P[:, 6])
+            mesh_face_t4_area = get_triangle_areas(P[:, 6], P[:, 3], P[:, 7])
+            mesh_face_t5_area = get_triangle_areas(P[:, 4], P[:, 6], P[:, 7])
+            mesh_face_t6_area = get_triangle_areas(P[:, 4], P[:, 5], P[:, 6])
             mesh_face_area = mesh_face_t1_area + mesh_face_t2_area + mesh_face_t3_area + mesh_face_t4_area + mesh_face_t5_area + mesh_face_t6_area
             corner_node_area = -mesh_face_area / 12.0
             middle_node_area = mesh_face_area / 3.0
-
-            node_area_table.append((face_table[mf][0], corner_node_area))
-            node_area_table.append((face_table[mf][1], corner_node_area))
-            node_area_table.append((face_table[mf][2], corner_node_area))
-            node_area_table.append((face_table[mf][3], corner_node_area))
-            node_area_table.append((face_table[mf][4], middle_node_area))
-            node_area_table.append((face_table[mf][5], middle_node_area))
-            node_area_table.append((face_table[mf][6], middle_node_area))
-            node_area_table.append((face_table[mf][7], middle_node_area))
-    return node_area_table
+            face_node_areas = np.column_stack([corner_node_area] * 4 + [middle_node_area] * 4)
+        else:
+            continue
+        np.add.at(node_areas, faces.ravel(), face_node_areas.ravel())
+    return node_ids, node_areas
+
+
+def get_geom_table_arrays(femnodes_mesh, element_table):
+    # element_table = { meshelementID : ( nodeID, ... , nodeID ) }
+    # returns the sorted node ids, their coordinates and a list of (node count, elements) with the elements
+    # of each node count as array of indices into the node ids, in the order of the element_table
+    element_lists = {}
+    for e in element_table:
+        nodes = element_table[e]
+        element_lists.setdefault(len(nodes), []).append(nodes)
+    node_ids = np.unique(np.concatenate([np.array(el, dtype=np.int64).ravel() for el in element_lists.values()]))
+    node_coords = np.array([(femnodes_mesh[n].x, femnodes_mesh[n].y, femnodes_mesh[n].z) for n in node_ids.tolist()], dtype=np.float64)
+    element_groups = []
+    for node_count in sorted(element_lists):
+        element_groups.append((node_count, np.searchsorted(node_ids, np.array(element_lists[node_count], dtype=np.int64))))
+    return node_ids, node_coords, element_groups
 
 
 def get_ref_shape_node_sum_geom_table(node_geom_table):
@@ -1342,6 +1437,15 @@ def get_triangle_area(P1, P2, P3):
     return 0.5 * vec3.Length
 
 
+def get_triangle_areas(P1, P2, P3):
+    # areas of many triangles, the corner points are arrays (N x 3)
+    return 0.5 * get_vector_lengths(np.cross(P2 - P1, P3 - P1))
+
+
+def get_vector_lengths(vecs):
+    return np.sqrt(vecs[:, 0] * vecs[:, 0] + vecs[:, 1] * vecs[:, 1] + vecs[:, 2] * vecs[:, 2])
+
+
 def sortlistoflistvalues(listoflists):
     new_list = []
     for l in listoflists:
@@ -0,0 +1,203 @@
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+__title__ = "FEM mesh topology cache"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+## @package FemMeshTopologyCache
+#  \ingroup FEM
+#  \brief cache of the mesh topology used by the input file writers
+#
+#  The cache of a mesh object holds the femelement_table, the femnodes_ele_table and the
+#  femnodes of the reference shapes of the constraints. It is kept in memory until the FemMesh of
+#  the mesh object changes and is saved beside the document in <document>.<mesh>.femtopo.npz
+#  The file is used if the cheap mesh hash of its mesh is the same, its file is removed if the
+#  FemMesh changes while the cache is in use, thus a remesh with other connectivity is not read.
+#  The file holds NumPy arrays only and is read without pickle, a cache file of an untrusted
+#  project can not run any code.
+
+import FreeCAD
+import hashlib
+import os
+import numpy as np
+
+
+topology_caches = {}  # (document name, mesh object name) --> cache dict
+
+# arrays of the femnodes_ele_table, see FemMeshTools.get_femnodes_ele_table()
+femnodes_ele_table_keys = ('ele_ids', 'ele_lens', 'node_ids', 'offsets', 'ele_index', 'positions')
+
+
+def get_femmesh_hash(femmesh):
+    '''hash of the counts, the node ids and coordinates and the element ids of the femmesh
+    it does not walk the element nodes, a changed connectivity is found by the MeshObserver
+    '''
+    sha = hashlib.sha1()
+    counts = (femmesh.NodeCount, femmesh.EdgeCount, femmesh.FaceCount, femmesh.VolumeCount, femmesh.GroupCount)
+    sha.update(repr(counts).encode())
+    nodes = femmesh.Nodes
+    node_ids = sorted(nodes)
+    sha.update(np.array(node_ids, dtype=np.int64).tobytes())
+    node_coords = np.array([(nodes[n].x, nodes[n].y, nodes[n].z) for n in node_ids], dtype=np.float64)
+    sha.update(node_coords.tobytes())
+    for elements in (femmesh.Edges, femmesh.Faces, femmesh.Volumes):
+        sha.update(np.array(elements, dtype=np.int64).tobytes())
+    return sha.hexdigest()
+
+
+class MeshObserver(object):
+    '''document observer, a cache in use is dropped with its file if the FemMesh of its mesh object changes
+    caches which were not used yet are not touched, thus restoring a document keeps its cache files
+    '''
+    def slotChangedObject(self, obj, prop):
+        if prop == 'FemMesh':
+            if topology_caches.pop((obj.Document.Name, obj.Name), None) is not None:
+                remove_cache_file(obj)
+
+    def slotDeletedDocument(self, doc):
+        for key in list(topology_caches):
+            if key[0] == doc.Name:
+                del topology_caches[key]
+
+
+mesh_observer = None
+
+
+def add_mesh_observer():
+    global mesh_observer
+    if mesh_observer is None:
+        mesh_observer = MeshObserver()
+        FreeCAD.addDocumentObserver(mesh_observer)
+
+
+def get_cache_file_name(mesh_obj):
+    '''the cache file beside the document, None for a document which was never saved
+    '''
+    doc_file_name = mesh_obj.Document.FileName
+    if not doc_file_name:
+        return None
+    return os.path.splitext(doc_file_name)[0] + '.' + mesh_obj.Name + '.femtopo.npz'
+
+
+def new_topology_cache(mesh_hash):
+    return {'hash': mesh_hash, 'femelement_table': {}, 'femnodes_ele_table': {}, 'ref_nodes': {}}
+
+
+def get_topology_cache(mesh_obj):
+    '''returns the topology cache of the mesh object, an empty one if the mesh has changed
+    the cache in memory is used without hashing the mesh, the MeshObserver drops it if the mesh changes
+    '''
+    add_mesh_observer()
+    key = (mesh_obj.Document.Name, mesh_obj.Name)
+    cache = topology_caches.get(key)
+    if cache is None:
+        mesh_hash = get_femmesh_hash(mesh_obj.FemMesh)
+        cache = read_topology_cache(get_cache_file_name(mesh_obj))
+        if cache is None or cache.get('hash') != mesh_hash:
+            print('FEM: no valid mesh topology cache for ' + mesh_obj.Name + ', it will be rebuilt.')
+            cache = new_topology_cache(mesh_hash)
+        topology_caches[key] = cache
+    return cache
+
+
+def save_topology_cache(mesh_obj, cache):
+    '''saves the cache beside the document, nothing is saved for a document which was never saved
+    '''
+    topology_caches[(mesh_obj.Document.Name, mesh_obj.Name)] = cache
+    cache_file_name = get_cache_file_name(mesh_obj)
+    if cache_file_name is None:
+        return
+    try:
+        cache_file = open(cache_file_name, 'wb')
+        np.savez(cache_file, **get_cache_arrays(cache))
+        cache_file.close()
+    except (IOError, OSError) as e:
+        FreeCAD.Console.PrintWarning('FEM: mesh topology cache could not be saved: {}\n'.format(e))
+
+
+def read_topology_cache(cache_file_name):
+    if cache_file_name is None or not os.path.isfile(cache_file_name):
+        return None
+    try:
+        npz = np.load(cache_file_name, allow_pickle=False)
+        try:
+            cache = get_cache_from_arrays(dict((k, npz[k]) for k in npz.files))
+        finally:
+            npz.close()
+    except Exception as e:
+        FreeCAD.Console.PrintWarning('FEM: mesh topology cache {} could not be read: {}\n'.format(cache_file_name, e))
+        return None
+    return cache
+
+
+def get_cache_arrays(cache):
+    '''the cache as plain NumPy arrays, the variable length lists are stored as lengths and concatenated values
+    '''
+    arrays = {'hash': np.array(cache['hash'])}
+    femelement_table = cache['femelement_table']
+    element_ids = sorted(femelement_table)
+    arrays['element_ids'] = np.array(element_ids, dtype=np.int64)
+    arrays['element_lens'] = np.array([len(femelement_table[e]) for e in element_ids], dtype=np.int64)
+    arrays['element_nodes'] = np.array([n for e in element_ids for n in femelement_table[e]], dtype=np.int64)
+    femnodes_ele_table = cache['femnodes_ele_table']
+    if femnodes_ele_table:
+        for k in femnodes_ele_table_keys:
+            arrays['ele_table_' + k] = np.asarray(femnodes_ele_table[k], dtype=np.int64)
+    ref_nodes = cache['ref_nodes']
+    ref_keys = sorted(ref_nodes)
+    arrays['ref_objects'] = np.array([k[0] for k in ref_keys])
+    arrays['ref_elements'] = np.array([k[1] for k in ref_keys])
+    arrays['ref_shape_hashes'] = np.array([ref_nodes[k][0] for k in ref_keys])
+    arrays['ref_lens'] = np.array([len(ref_nodes[k][1]) for k in ref_keys], dtype=np.int64)
+    arrays['ref_nodes'] = np.array([n for k in ref_keys for n in ref_nodes[k][1]], dtype=np.int64)
+    return arrays
+
+
+def split_lists(lens, values):
+    # the lists of the concatenated values
+    ends = np.cumsum(lens).tolist()
+    values = values.tolist()
+    return [values[end - length:end] for end, length in zip(ends, lens.tolist())]
+
+
+def get_cache_from_arrays(arrays):
+    cache = new_topology_cache(str(arrays['hash']))
+    element_nodes = split_lists(arrays['element_lens'], arrays['element_nodes'])
+    cache['femelement_table'] = dict(zip(arrays['element_ids'].tolist(), [tuple(nodes) for nodes in element_nodes]))
+    if 'ele_table_node_ids' in arrays:
+        cache['femnodes_ele_table'] = dict((k, arrays['ele_table_' + k]) for k in femnodes_ele_table_keys)
+    ref_nodes = split_lists(arrays['ref_lens'], arrays['ref_nodes'])
+    for ref_object, ref_element, shape_hash, nodes in zip(arrays['ref_objects'].tolist(), arrays['ref_elements'].tolist(), arrays['ref_shape_hashes'].tolist(), ref_nodes):
+        cache['ref_nodes'][(str(ref_object), str(ref_element))] = (str(shape_hash), nodes)
+    return cache
+
+
+def remove_cache_file(mesh_obj):
+    cache_file_name = get_cache_file_name(mesh_obj)
+    if cache_file_name and os.path.isfile(cache_file_name):
+        os.remove(cache_file_name)
+
+
+def clear_topology_cache(mesh_obj):
+    topology_caches.pop((mesh_obj.Document.Name, mesh_obj.Name), None)
+    remove_cache_file(mesh_obj)
@@ -548,6 +548,8 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
                     has_results = True
             if not self.result_object:
                 raise Exception("No result object found in the analysis")
+        import importCcxFrdResults
+        importCcxFrdResults.load_lazy_result(self.result_object)
 
     ## Returns minimum, average and maximum value for provided result type
     #  @param self The python object self
@@ -561,20 +563,28 @@ class FemTools(QtCore.QRunnable, QtCore.QObject):
     #    MaxSear maximum shear stress
     #  - None - always return (0.0, 0.0, 0.0)
     def get_stats(self, result_type):
+        import importCcxFrdResults
         stats = (0.0, 0.0, 0.0)
-        for m in self.analysis.Member:
-            if m.isDerivedFrom("Fem::FemResultObject"):
-                match = {"U1": (m.Stats[0], m.Stats[1], m.Stats[2]),
-                         "U2": (m.Stats[3], m.Stats[4], m.Stats[5]),
-                         "U3": (m.Stats[6], m.Stats[7], m.Stats[8]),
-                         "Uabs": (m.Stats[9], m.Stats[10], m.Stats[11]),
-                         "Sabs": (m.Stats[12], m.Stats[13], m.Stats[14]),
-                         "MaxPrin": (m.Stats[15], m.Stats[16], m.Stats[17]),
-                         "MidPrin": (m.Stats[18], m.Stats[19], m.Stats[20]),
-                         "MinPrin": (m.Stats[21], m.Stats[22], m.Stats[23]),
-                         "MaxShear": (m.Stats[24], m.Stats[25], m.Stats[26]),
-                         "None": (0.0, 0.0, 0.0)}
-                stats = match[result_type]
+        m = None
+        for obj in self.analysis.Member:
+            if obj.isDerivedFrom("Fem::FemResultObject"):
+                m = obj  # the last result object is used
+        if m is not None:
+            if not m.Stats:
+                importCcxFrdResults.load_lazy_result(m)
+            stats = get_stats_of_type(m.Stats, result_type)
         return stats
 
+
+## index of the first of the (min, avg, max) values of a result type in the Stats of a result object
+result_stats_indices = {"U1": 0, "U2": 3, "U3": 6, "Uabs": 9, "Sabs": 12,
+                        "MaxPrin": 15, "MidPrin": 18, "MinPrin": 21, "MaxShear": 24}
+
+
+def get_stats_of_type(stats, result_type):
+    if result_type == "None":
+        return (0.0, 0.0, 0.0)
+    i = result_stats_indices[result_type]
+    return (stats[i], stats[i + 1], stats[i + 2])
+
 ##  @}
@@ -39,6 +39,7 @@ class FemToolsCcx(FemTools.FemTools):
 
     known_analysis_types = ["static", "frequency", "thermomech"]
     finished = QtCore.Signal(int)
+    progress = QtCore.Signal(object)  # progress dict of FemCcxRunner, emitted while ccx runs, shown by FEM_SolverRun
 
     ## The constructor
     #  @param analysis - analysis object to be used as the core object.
@@ -173,33 +174,35 @@ class FemToolsCcx(FemTools.FemTools):
             raise Exception(error_message)
 
     def start_ccx(self):
+        import FemCcxRunner
         import multiprocessing
-        import os
-        import subprocess
         self.ccx_stdout = ""
         self.ccx_stderr = ""
+        self.ccx_runner = None
         if self.inp_file_name != "" and self.ccx_binary_present:
-            ont_backup = os.environ.get('OMP_NUM_THREADS')
             self.ccx_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Ccx")
             num_cpu_pref = self.ccx_prefs.GetInt("AnalysisNumCPUs", 1)  # If number of CPU's specified
-            if not ont_backup:
-                ont_backup = str(num_cpu_pref)
             if num_cpu_pref > 1:
-                _env = os.putenv('OMP_NUM_THREADS', str(num_cpu_pref))  # if user picked a number use that instead
+                num_threads = num_cpu_pref  # if user picked a number use that instead
             else:
-                _env = os.putenv('OMP_NUM_THREADS', str(multiprocessing.cpu_count()))
-            # change cwd because ccx may crash if directory has no write permission
-            # there is also a limit of the length of file names so jump to the document directory
-            cwd = QtCore.QDir.currentPath()
-            f = QtCore.QFileInfo(self.inp_file_name)
-            QtCore.QDir.setCurrent(f.path())
-            p = subprocess.Popen([self.ccx_binary, "-i ", f.baseName()],
-                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                 shell=False, env=_env)
-            self.ccx_stdout, self.ccx_stderr = p.communicate()
-            os.putenv('OMP_NUM_THREADS', ont_backup)
-            QtCore.QDir.setCurrent(cwd)
-            return p.returncode
+                num_threads = multiprocessing.cpu_count()
+            time_limit = self.ccx_prefs.GetInt("AnalysisTimeLimit", 0)  # wall clock limit in seconds, 0 --> no limit
+            log_lines = self.ccx_prefs.GetInt("AnalysisLogLines", FemCcxRunner.default_log_lines)
+            time_period = None
+            if self.solver and self.analysis_type == "thermomech":
+                time_period = self.solver.TimeEnd
+            elif self.analysis_type == "static":
+                time_period = 1.0
+            self.ccx_runner = FemCcxRunner.CcxRunner(self.ccx_binary, self.inp_file_name, num_threads, time_limit,
+                                                     log_lines, self.progress.emit, time_period)
+            ret_code = self.ccx_runner.run()
+            self.ccx_stdout = self.ccx_runner.stdout
+            self.ccx_stderr = self.ccx_runner.stderr
+            if self.ccx_runner.status == 'timeout':
+                FreeCAD.Console.PrintError('FEM: CalculiX ccx was stopped after the time limit of {} s.\n'.format(time_limit))
+            elif self.ccx_runner.status == 'cancelled':
+                FreeCAD.Console.PrintWarning('FEM: CalculiX ccx was cancelled.\n')
+            return ret_code
         return -1
 
     def run(self):
@@ -226,10 +229,16 @@ class FemToolsCcx(FemTools.FemTools):
             print("--------end of stdout---------")
 
     def has_for_nonpositive_jacobians(self):
-        if '*ERROR in e_c3d: nonpositive jacobian' in self.ccx_stdout:
+        ccx_errors = self.ccx_stdout
+        if getattr(self, 'ccx_runner', None):
+            ccx_errors += '\n' + '\n'.join(self.ccx_runner.progress['errors'])
+        if '*ERROR in e_c3d: nonpositive jacobian' in ccx_errors:
             print('CalculiX returned an error due to nonpositive jacobian elements.')
             nonpositive_jacobian_elements = []
             nonpositive_jacobian_elenodes = []
+            if getattr(self, 'ccx_runner', None):
+                # collected while ccx was running, the stdout log may not contain all lines
+                nonpositive_jacobian_elements = list(self.ccx_runner.progress['nonpositive_jacobian_elements'])
             for line in self.ccx_stdout.splitlines():
                 if 'determinant in element' in line:
                     # print line
@@ -1538,9 +1538,16 @@ void CmdFemPostPipelineFromResult::activated(int)
     if (results.size() == 1) {
         std::string FeatName = getUniqueObjectName("Pipeline");
         openCommand("Create pipeline from result");
+        // the list properties of a lazy or compact result object are filled before the pipeline reads them
+        doCommand(Doc,"import importCcxFrdResults");
+        doCommand(Doc,"importCcxFrdResults.load_lazy_result(App.activeDocument().getObject(\"%s\"))",
+                  results[0]->getNameInDocument());
         doCommand(Doc,"App.activeDocument().addObject('Fem::FemPostPipeline','%s')",FeatName.c_str());
         doCommand(Doc,"App.activeDocument().ActiveObject.load("
                       "App.activeDocument().getObject(\"%s\"))", results[0]->getNameInDocument());
+        // a compact result object keeps its fields in its ResultData file only
+        doCommand(Doc,"importCcxFrdResults.release_compact_result(App.activeDocument().getObject(\"%s\"))",
+                  results[0]->getNameInDocument());
         commitCommand();
 
         this->updateActive();
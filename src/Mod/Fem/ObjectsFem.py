@@ -271,11 +271,21 @@ def makeMeshRegion(base_mesh, element_length=0.0, name="FEMMeshRegion"):
 
 
 ########## result objects ##########
-def makeResultMechanical(name="MechanicalResult"):
-    '''makeResultMechanical(name): creates an mechanical result object to hold FEM results'''
+def makeResultMechanical(name="MechanicalResult", compact=None):
+    '''makeResultMechanical(name, [compact]): creates an mechanical result object to hold FEM results
+    a compact result object keeps its fields in a binary file in the document, its list properties are filled on demand,
+    importCcxFrdResults.load_lazy_result() fills them before C++ code like Fem.writeResult() or a post pipeline reads them,
+    without compact the CompactResultStorage preference is used, it is off by default
+    the fields of a lazy result object made by importCcxFrdResults.importFrd() are read from its frd file on demand,
+    the entry point is importCcxFrdResults.load_lazy_result(obj), obj.Proxy.get_array(obj, prop) calls it,
+    the list properties like obj.DisplacementVectors are empty until it was called'''
     obj = FreeCAD.ActiveDocument.addObject('Fem::FemResultObjectPython', name)
     import PyObjects._FemResultMechanical
     PyObjects._FemResultMechanical._FemResultMechanical(obj)
+    if compact is None:
+        compact = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General").GetBool("CompactResultStorage", False)
+    if compact:
+        obj.Proxy.init_compact(obj)
     if FreeCAD.GuiUp:
         import PyGui._ViewProviderFemResultMechanical
         PyGui._ViewProviderFemResultMechanical._ViewProviderFemResultMechanical(obj.ViewObject)
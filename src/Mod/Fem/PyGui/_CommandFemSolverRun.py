@@ -49,6 +49,13 @@ class _CommandFemSolverRun(FemCommands):
             else:
                 print ("CalculiX failed ccx finished with error {}".format(ret_code))
 
+        def show_progress(progress):
+            # progress dict of FemCcxRunner
+            message = "CalculiX ccx: step {step}, increment {increment}, iteration {iteration}".format(**progress)
+            if progress['fraction'] is not None:
+                message += ", {:.0%} of the step time".format(progress['fraction'])
+            FreeCADGui.getMainWindow().statusBar().showMessage(message)
+
         sel = FreeCADGui.Selection.getSelection()
         if len(sel) == 1 and sel[0].isDerivedFrom("Fem::FemSolverObjectPython"):
             self.solver = sel[0]
@@ -61,6 +68,7 @@ class _CommandFemSolverRun(FemCommands):
                 QtGui.QMessageBox.critical(None, "Missing prerequisite", message)
                 return
             self.fea.finished.connect(load_results)
+            self.fea.progress.connect(show_progress)
             QtCore.QThreadPool.globalInstance().start(self.fea)
         elif self.solver.SolverType == "FemSolverZ88":
             import FemToolsZ88
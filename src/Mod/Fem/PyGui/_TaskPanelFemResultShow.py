@@ -40,7 +40,10 @@ from PySide.QtGui import QApplication
 class _TaskPanelFemResultShow:
     '''The task panel for the post-processing'''
     def __init__(self, obj):
+        import importCcxFrdResults
         self.result_obj = obj
+        # results of multi increment frd files are loaded on selection
+        importCcxFrdResults.load_lazy_result(self.result_obj)
         self.mesh_obj = self.result_obj.Mesh
         # task panel should be started by use of setEdit of view provider
         # in view provider checks: Mesh, active analysis and if Mesh and result are in active analysis
@@ -270,40 +273,25 @@ class _TaskPanelFemResultShow:
         FreeCAD.FEM_dialog["results_type"] = "None"
         self.update()
         self.restore_result_dialog()
-        # Convert existing values to numpy array
-        P1 = np.array(self.result_obj.PrincipalMax)
-        P2 = np.array(self.result_obj.PrincipalMed)
-        P3 = np.array(self.result_obj.PrincipalMin)
-        Von = np.array(self.result_obj.StressValues)
-        Peeq = np.array(self.result_obj.Peeq)
-        T = np.array(self.result_obj.Temperature)
-        MF = np.array(self.result_obj.MassFlowRate)
-        NP = np.array(self.result_obj.NetworkPressure)
-        dispvectors = np.array(self.result_obj.DisplacementVectors)
-        x = np.array(dispvectors[:, 0])
-        y = np.array(dispvectors[:, 1])
-        z = np.array(dispvectors[:, 2])
-        stressvectors = np.array(self.result_obj.StressVectors)
-        sx = np.array(stressvectors[:, 0])
-        sy = np.array(stressvectors[:, 1])
-        sz = np.array(stressvectors[:, 2])
-        strainvectors = np.array(self.result_obj.StrainVectors)
-        ex = np.array(strainvectors[:, 0])
-        ey = np.array(strainvectors[:, 1])
-        ez = np.array(strainvectors[:, 2])
         userdefined_eq = self.form.user_def_eq.toPlainText()  # Get equation to be used
-        UserDefinedFormula = eval(userdefined_eq).tolist()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            UserDefinedValues = evaluate_user_defined_equation(self.result_obj, userdefined_eq)
+            minm = UserDefinedValues.min()
+            avg = UserDefinedValues.mean()
+            maxm = UserDefinedValues.max()
+        except Exception as e:
+            # an empty result has no min and max
+            QtGui.qApp.restoreOverrideCursor()
+            FreeCAD.Console.PrintError('FEM: User defined equation "{}" could not be calculated: {}\n'.format(userdefined_eq, e))
+            return
+        UserDefinedFormula = UserDefinedValues.tolist()
         self.result_obj.UserDefined = UserDefinedFormula
-        minm = min(UserDefinedFormula)
-        avg = sum(UserDefinedFormula) / len(UserDefinedFormula)
-        maxm = max(UserDefinedFormula)
 
-        QApplication.setOverrideCursor(Qt.WaitCursor)
         if self.suitable_results:
             self.mesh_obj.ViewObject.setNodeColorByScalars(self.result_obj.NodeNumbers, UserDefinedFormula)
         self.set_result_stats("", minm, avg, maxm)
         QtGui.qApp.restoreOverrideCursor()
-        del x, y, z, T, Von, Peeq, P1, P2, P3, sx, sy, sz, ex, ey, ez, MF, NP  # Dummy use to get around flake8, varibles not being used
 
     def select_displacement_type(self, disp_type):
         QApplication.setOverrideCursor(Qt.WaitCursor)
@@ -422,11 +410,72 @@ class _TaskPanelFemResultShow:
         self.mesh_obj.ViewObject.setNodeColorByScalars()
 
     def reject(self):
+        import importCcxFrdResults
+        # the list properties of a compact result object are not saved beside its ResultData file
+        importCcxFrdResults.release_compact_result(self.result_obj)
         FreeCADGui.Control.closeDialog()  # if the taks panell is called from Command obj is not in edit mode thus reset edit does not cleses the dialog, may be do not call but set in edit instead
         FreeCADGui.ActiveDocument.resetEdit()
 
 
 # helper
+# names of the result fields in the user defined equation --> (result property, vector component)
+user_defined_equation_fields = {
+    "P1": ("PrincipalMax", None),
+    "P2": ("PrincipalMed", None),
+    "P3": ("PrincipalMin", None),
+    "Von": ("StressValues", None),
+    "Peeq": ("Peeq", None),
+    "T": ("Temperature", None),
+    "MF": ("MassFlowRate", None),
+    "NP": ("NetworkPressure", None),
+    "x": ("DisplacementVectors", 0),
+    "y": ("DisplacementVectors", 1),
+    "z": ("DisplacementVectors", 2),
+    "sx": ("StressVectors", 0),
+    "sy": ("StressVectors", 1),
+    "sz": ("StressVectors", 2),
+    "ex": ("StrainVectors", 0),
+    "ey": ("StrainVectors", 1),
+    "ez": ("StrainVectors", 2)
+}
+
+compiled_equations = {}  # equation --> (code, names of the used result fields)
+
+
+def compile_user_defined_equation(equation):
+    if equation not in compiled_equations:
+        code = compile(equation.strip(), "<user defined equation>", "eval")
+        fields = [name for name in code.co_names if name in user_defined_equation_fields]
+        compiled_equations[equation] = (code, fields)
+    return compiled_equations[equation]
+
+
+def get_result_array(result_obj, prop):
+    # the proxy of the mechanical result caches the arrays of the result properties
+    proxy = getattr(result_obj, "Proxy", None)
+    if hasattr(proxy, "get_array"):
+        return proxy.get_array(result_obj, prop)
+    values = getattr(result_obj, prop)
+    if values and isinstance(values[0], FreeCAD.Vector):
+        return np.array([(v.x, v.y, v.z) for v in values], dtype=np.float64).reshape(-1, 3)
+    return np.array(values, dtype=np.float64)
+
+
+def evaluate_user_defined_equation(result_obj, equation):
+    '''evaluates the equation with the result fields it uses, returns one value for each result node
+    '''
+    code, fields = compile_user_defined_equation(equation)
+    field_arrays = {}
+    for name in fields:
+        prop, component = user_defined_equation_fields[name]
+        values = get_result_array(result_obj, prop)
+        field_arrays[name] = values if component is None else values[:, component]
+    values = np.asarray(eval(code, globals(), field_arrays), dtype=np.float64)
+    if values.ndim == 0:
+        values = np.full(len(result_obj.NodeNumbers), values.item())
+    return values
+
+
 def hide_parts_constraints():
     fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
     hide_constraints = fem_prefs.GetBool("HideConstraint", False)
@@ -58,6 +58,7 @@ class _TaskPanelFemSolverCalculix:
         self.solver_object = solver_object
 
         self.Calculix = QtCore.QProcess()
+        self.result_follower = None
         self.Timer = QtCore.QTimer()
         self.Timer.start(300)
 
@@ -128,6 +129,14 @@ class _TaskPanelFemSolverCalculix:
     def UpdateText(self):
         if(self.Calculix.state() == QtCore.QProcess.ProcessState.Running):
             self.form.l_time.setText('Time: {0:4.1f}: '.format(time.time() - self.Start))
+            if self.result_follower:
+                self.add_followed_results(self.result_follower.update())
+
+    def add_followed_results(self, results):
+        # the result sets ccx has written meanwhile
+        for result in results:
+            self.femConsoleMessage("Result set {}: time {}, max displacement {:.4g}, max von Mises stress {:.4g}".format(
+                result.Label, result.Time, result.Stats[11], result.Stats[14]))
 
     def calculixError(self, error):
         print ("Error() {}".format(error))
@@ -162,10 +171,17 @@ class _TaskPanelFemSolverCalculix:
         self.femConsoleMessage("Loading result sets...")
         self.form.l_time.setText('Time: {0:4.1f}: '.format(time.time() - self.Start))
         fea = FemToolsCcx.FemToolsCcx(None, self.solver_object)
-        fea.reset_mesh_purge_results_checked()
         fea.inp_file_name = self.inp_file_name
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        fea.load_results()
+        if self.result_follower:
+            # the results were added while ccx was running, only the rest of the frd file is read
+            self.add_followed_results(self.result_follower.finish())
+            self.result_follower = None
+            fea.results_present = True
+            fea.load_results_ccxdat()
+        else:
+            fea.reset_mesh_purge_results_checked()
+            fea.load_results()
         QApplication.restoreOverrideCursor()
         self.form.l_time.setText('Time: {0:4.1f}: '.format(time.time() - self.Start))
 
@@ -245,6 +261,17 @@ class _TaskPanelFemSolverCalculix:
         self.cwd = QtCore.QDir.currentPath()
         fi = QtCore.QFileInfo(self.inp_file_name)
         QtCore.QDir.setCurrent(fi.path())
+        self.result_follower = None
+        if self.ccx_prefs.GetBool("FollowResults", False):
+            # the result sets are added to the analysis while ccx writes them into the frd file
+            import importCcxFrdResults
+            fea = FemToolsCcx.FemToolsCcx(None, self.solver_object)
+            fea.reset_mesh_purge_results_checked()
+            frd_result_file = os.path.splitext(self.inp_file_name)[0] + '.frd'
+            if os.path.isfile(frd_result_file):
+                os.remove(frd_result_file)  # the results of the last run
+            result_name_prefix = 'CalculiX_' + self.solver_object.AnalysisType + '_'
+            self.result_follower = importCcxFrdResults.FrdResultFollower(frd_result_file, fea.analysis, result_name_prefix)
         self.Calculix.start(self.CalculixBinary, ['-i', fi.baseName()])
 
         QApplication.restoreOverrideCursor()
@@ -28,6 +28,13 @@ __url__ = "http://www.freecadweb.org"
 #  \ingroup FEM
 #  \brief FreeCAD DocumentObject class to hold mechanical results in FEM workbench
 
+import FreeCAD
+import numpy as np
+import os
+import tempfile
+
+vector_result_properties = ("DisplacementVectors", "StressVectors", "StrainVectors")
+
 
 class _FemResultMechanical():
     """The Fem::_FemResultMechanical's Proxy python type, add result specific properties
@@ -89,7 +96,81 @@ class _FemResultMechanical():
         return
 
     def onChanged(self, obj, prop):
-        return
+        # the array of a changed result property is made again on its next use
+        # the arrays of a compact result object are read from the ResultData file, the lists are views of them
+        arrays = self.__dict__.get("arrays")
+        if not arrays:
+            return
+        if prop == "ResultData":
+            arrays.clear()
+        elif prop in arrays and prop not in self.get_result_data_fields(obj):
+            del arrays[prop]
+
+    def init_compact(self, obj):
+        obj.addProperty("App::PropertyFileIncluded", "ResultData", "Fem", "Binary file of the result fields", True)
+        obj.addProperty("App::PropertyStringList", "ResultDataFields", "Fem", "Result fields in the ResultData file", True)
+
+    def get_result_data_fields(self, obj):
+        if hasattr(obj, "ResultDataFields") and obj.ResultData:
+            return obj.ResultDataFields
+        return []
+
+    def write_result_data(self, obj, arrays, float32=False):
+        """writes the result arrays {property: array} into the ResultData file, the list properties are emptied
+        the floats are saved as float32 or float64, the file is an uncompressed NumPy .npz archive
+        """
+        data = {}
+        for prop, values in arrays.items():
+            if prop == "NodeNumbers":
+                data[prop] = np.ascontiguousarray(values, dtype=np.int64)
+            else:
+                data[prop] = np.ascontiguousarray(values, dtype=np.float32 if float32 else np.float64)
+        fd, file_name = tempfile.mkstemp(suffix=".npz")
+        os.close(fd)
+        np.savez(file_name, **data)
+        obj.ResultDataFields = sorted(data)
+        obj.ResultData = file_name  # the file is copied into the transient directory of the document
+        if os.path.isfile(file_name):
+            os.remove(file_name)
+        for prop in data:
+            if getattr(obj, prop):
+                setattr(obj, prop, [])
+
+    def fill_result_lists(self, obj):
+        """fills the list properties with the fields of the ResultData file for C++ consumers
+        importCcxFrdResults.release_compact_result() empties them again, thus the fields are not saved twice
+        """
+        for prop in self.get_result_data_fields(obj):
+            values = self.get_array(obj, prop).tolist()
+            if prop in vector_result_properties:
+                values = [FreeCAD.Vector(*v) for v in values]
+            setattr(obj, prop, values)
+
+    def get_array(self, obj, prop):
+        """returns the values of a result property as read only NumPy array, (N x 3) for vector lists
+        the array is kept until the property changes, it is not saved with the document
+        the fields of a compact result object are read from its ResultData file with their saved dtype
+        the fields of a lazy result object are loaded from its frd file first, see importCcxFrdResults.load_lazy_result()
+        """
+        arrays = self.__dict__.setdefault("arrays", {})
+        if prop not in arrays and hasattr(obj, "ResultFile"):
+            import importCcxFrdResults
+            if not importCcxFrdResults.load_lazy_result(obj):
+                raise Exception("FEM: Result fields of {} could not be loaded from {}".format(obj.Label, obj.ResultFile))
+        if prop not in arrays and prop in self.get_result_data_fields(obj):
+            with np.load(obj.ResultData) as data:
+                array = data[prop]
+            array.setflags(write=False)
+            arrays[prop] = array
+        if prop not in arrays:
+            values = getattr(obj, prop)
+            if prop in vector_result_properties:
+                array = np.array([(v.x, v.y, v.z) for v in values], dtype=np.float64).reshape(-1, 3)
+            else:
+                array = np.array(values, dtype=np.float64)
+            array.setflags(write=False)
+            arrays[prop] = array
+        return arrays[prop]
 
     def __getstate__(self):
         return self.Type
@@ -92,6 +92,473 @@ class FemTest(unittest.TestCase):
         expected = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
         self.assertEqual(newmesh.getElementNodes(1), expected, "Nodes order of quadratic volume element is unexpected")
 
+    def test_frd_array_reader(self):
+        import importCcxFrdResults
+        for base_name in [static_base_name, frequency_base_name, thermomech_base_name]:
+            frd_file = test_file_dir + '/' + base_name + '.frd'
+            m_dict = importCcxFrdResults.readResult(frd_file)
+            m_array = importCcxFrdResults.readResultArrays(frd_file)
+            node_ids, node_coords = m_array['Nodes']
+            self.assertEqual(sorted(m_dict['Nodes'].keys()), sorted(node_ids.tolist()), "Node ids of frd readers differ in " + base_name)
+            self.assertEqual(m_dict['Nodes'][node_ids[-1]], FreeCAD.Vector(*node_coords[-1].tolist()), "Node coordinates of frd readers differ in " + base_name)
+            ele_ids, ele_nodes = m_array['Elements']['Tetra10Elem']
+            self.assertEqual(m_dict['Tetra10Elem'][ele_ids[0]], tuple(ele_nodes[0].tolist()), "Element nodes of frd readers differ in " + base_name)
+            self.assertEqual(len(m_dict['Results']), len(m_array['Results']), "Result set count of frd readers differ in " + base_name)
+            disp_ids, disp = m_array['Results'][0]['disp']
+            self.assertEqual(m_dict['Results'][0]['disp'][disp_ids[0]], FreeCAD.Vector(*disp[0].tolist()), "Displacements of frd readers differ in " + base_name)
+
+    def test_femmesh_from_arrays_nodes_only(self):
+        import importToolsFem
+        import numpy as np
+        node_ids = np.array([1, 2, 3], dtype=np.int64)
+        node_coords = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)])
+        femmesh = importToolsFem.make_femmesh_from_arrays(node_ids, node_coords, {})
+        self.assertEqual(femmesh.NodeCount, 3, "Nodes of a mesh without elements are missing")
+        self.assertEqual(femmesh.Nodes[2], FreeCAD.Vector(1, 0, 0), "Node of a mesh without elements is wrong")
+        self.assertEqual(femmesh.VolumeCount + femmesh.FaceCount + femmesh.EdgeCount, 0, "Mesh without elements has elements")
+
+    def test_frd_result_index(self):
+        import importCcxFrdResults
+        for base_name in [static_base_name, frequency_base_name, thermomech_base_name]:
+            frd_file = test_file_dir + '/' + base_name + '.frd'
+            m_array = importCcxFrdResults.readResultArrays(frd_file)
+            index = importCcxFrdResults.FrdResultIndex(frd_file)
+            self.assertEqual(len(index.result_sets), len(m_array['Results']), "Result set count of frd index differs in " + base_name)
+            self.assertEqual(index.read_nodes()[0].tolist(), m_array['Nodes'][0].tolist(), "Node ids of frd index differ in " + base_name)
+            result_set = index.read_result_set(len(index.result_sets) - 1)
+            self.assertEqual(result_set['time'], m_array['Results'][-1]['time'], "Time of frd index differs in " + base_name)
+            self.assertEqual(result_set['disp'][1].tolist(), m_array['Results'][-1]['disp'][1].tolist(), "Displacements of frd index differ in " + base_name)
+
+    def test_frd_lazy_result_stamp(self):
+        import importCcxFrdResults
+        import os
+        import shutil
+        lazy_dir = temp_dir + '/FEM_lazy_result'
+        if not os.path.isdir(lazy_dir):
+            os.makedirs(lazy_dir)
+        frd_file = lazy_dir + '/' + thermomech_base_name + '.frd'
+        shutil.copyfile(test_file_dir + '/' + thermomech_base_name + '.frd', frd_file)
+        index = importCcxFrdResults.get_frd_result_index(frd_file)
+        result_obj = ObjectsFem.makeResultMechanical('LazyResult', compact=False)
+        importCcxFrdResults.init_lazy_result(result_obj, frd_file, 0, index.result_sets[0])
+        self.assertEqual(result_obj.DisplacementVectors, [], "Lazy result was loaded before it was used")
+        displacements = result_obj.Proxy.get_array(result_obj, 'DisplacementVectors')
+        self.assertTrue(len(displacements) > 0, "Lazy result was not loaded on access")
+        self.assertEqual(len(result_obj.DisplacementVectors), len(displacements), "Lazy result lists were not loaded on access")
+        self.assertTrue(importCcxFrdResults.load_lazy_result(result_obj), "Lazy result could not be loaded")
+        importCcxFrdResults.resident_results.remove((result_obj.Document.Name, result_obj.Name))
+        # a rerun of the solver writes another frd file, the old result step must not be mapped onto it
+        with open(frd_file, 'a') as f:
+            f.write('\n')
+        self.assertFalse(importCcxFrdResults.load_lazy_result(result_obj), "Lazy result was loaded from a changed frd file")
+        self.assertRaises(Exception, result_obj.Proxy.get_array, result_obj, 'Temperature')
+
+    def test_frd_result_follower(self):
+        import importCcxFrdResults
+        import os
+        frd_file = test_file_dir + '/' + thermomech_base_name + '.frd'
+        m_array = importCcxFrdResults.readResultArrays(frd_file)
+        f = open(frd_file, 'rb')
+        frd_data = f.read()
+        f.close()
+        # the frd file is written in chunks like a running ccx does
+        follow_file = os.path.join(tempfile.mkdtemp(), thermomech_base_name + '.frd')
+        analysis = ObjectsFem.makeAnalysis('FollowAnalysis')
+        follower = importCcxFrdResults.FrdResultFollower(follow_file, analysis, 'Follow_', lazy=False)
+        self.assertEqual(follower.update(), [], "Follower added results before the frd file exists")
+        f = open(follow_file, 'wb')
+        results = []
+        for start in range(0, len(frd_data), 4093):
+            f.write(frd_data[start:start + 4093])
+            f.flush()
+            results += follower.update()
+            self.assertTrue(len(results) <= len(m_array['Results']), "Follower added too many result sets")
+        f.close()
+        results += follower.finish()
+        self.assertEqual(len(results), len(m_array['Results']), "Follower result set count differs")
+        self.assertEqual(follower.index.offset, len(frd_data), "Follower did not read the whole frd file")
+        self.assertEqual(results[-1].Time, round(m_array['Results'][-1]['time'], 2), "Time of followed result differs")
+        self.assertEqual(results[-1].Temperature, m_array['Results'][-1]['temp'][1].tolist(), "Temperatures of followed result differ")
+        for result in results:
+            self.active_doc.removeObject(result.Name)
+        self.active_doc.removeObject('FollowAnalysis')
+
+    def test_gmsh_mesh_cache(self):
+        import FemGmshMeshCache
+        import os
+        work_dir = tempfile.mkdtemp()
+        cache_dir = os.path.join(work_dir, 'cache')
+        brep_file = os.path.join(work_dir, 'part.brep')
+        geo_file = os.path.join(work_dir, 'shape2mesh.geo')
+        mesh_file = os.path.join(work_dir, 'mesh.unv')
+        for file_name, content in ((brep_file, 'brep'), (mesh_file, 'x' * 1000)):
+            f = open(file_name, 'w')
+            f.write(content)
+            f.close()
+        keys = []
+        for mesh_path, order in (('/tmp/a.unv', 1), ('/tmp/b.unv', 1), ('/tmp/a.unv', 2)):
+            f = open(geo_file, 'w')
+            f.write('Merge "{}";\nMesh.ElementOrder = {};\nSave "{}";\n'.format(brep_file, order, mesh_path))
+            f.close()
+            keys.append(FemGmshMeshCache.get_mesh_key(brep_file, geo_file, ['gmsh', '-', geo_file], (brep_file, mesh_path)))
+        self.assertEqual(keys[0], keys[1], "Gmsh mesh cache key depends on the file paths")
+        self.assertNotEqual(keys[0], keys[2], "Gmsh mesh cache key does not depend on the mesh parameters")
+        self.assertEqual(FemGmshMeshCache.get_mesh_file(keys[0], cache_dir), None, "Gmsh mesh cache is not empty")
+        os.utime(FemGmshMeshCache.add_mesh_file(keys[0], mesh_file, cache_dir, 2500), (1000, 1000))
+        os.utime(FemGmshMeshCache.add_mesh_file(keys[2], mesh_file, cache_dir, 2500), (2000, 2000))
+        self.assertTrue(FemGmshMeshCache.get_mesh_file(keys[0], cache_dir), "Gmsh mesh cache has lost a mesh")
+        FemGmshMeshCache.add_mesh_file('other', mesh_file, cache_dir, 2500)
+        self.assertEqual(FemGmshMeshCache.get_mesh_file(keys[2], cache_dir), None, "Gmsh mesh cache did not remove the least recently used mesh")
+        self.assertTrue(FemGmshMeshCache.get_mesh_file(keys[0], cache_dir), "Gmsh mesh cache removed a recently used mesh")
+        FemGmshMeshCache.clear_cache(cache_dir)
+
+    def test_z88_array_io(self):
+        import importZ88Mesh
+        import importZ88O2Results
+        import numpy as np
+        import os
+        z88_dir = tempfile.mkdtemp()
+        node_ids = np.arange(1, 11)
+        node_coords = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (0.5, 0, 0),
+                                (0.5, 0.5, 0), (0, 0.5, 0), (0, 0, 0.5), (0.5, 0, 0.5), (0, 0.5, 0.5)])
+        element_nodes = np.array([np.arange(1, 11)])
+        mesh_file = os.path.join(z88_dir, 'z88i1.txt')
+        f = open(mesh_file, 'w')
+        importZ88Mesh.write_z88_mesh_arrays(f, node_ids, node_coords, np.array([1]), element_nodes, 16)
+        f.close()
+        f = open(mesh_file, 'r')
+        lines = f.readlines()
+        f.close()
+        self.assertEqual(lines[0], '3 10 1 30 0 written by FreeCAD\n', "Z88 mesh header is wrong")
+        self.assertEqual(lines[-1], '4 2 3 1 9 6 10 5 7 8\n', "Z88 volume16 element nodes are not in Z88 order")
+        m = importZ88Mesh.read_z88_mesh_arrays(mesh_file)
+        self.assertEqual(m['Nodes'][1].tolist(), node_coords.tolist(), "Z88 node coordinates changed in the round trip")
+        self.assertEqual(m['Elements']['Tetra10Elem'][1].tolist(), element_nodes.tolist(), "Z88 tetra10 nodes changed in the round trip")
+        disp_file = os.path.join(z88_dir, 'z88o2.txt')
+        f = open(disp_file, 'w')
+        f.write('\n' * 5 + '1 0.1 0.2 0.3 0 0 0\n2 0.4 0.5 0.6 0 0 0\n')
+        f.close()
+        r = importZ88O2Results.read_z88_disp_arrays(disp_file)
+        self.assertEqual(r['Results'][0]['disp'][1].tolist(), [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], "Z88 displacements are wrong")
+
+    def test_structured_benchmark_mesh(self):
+        import FemBenchmarks
+        import importCcxFrdResults
+        import numpy as np
+        import os
+        node_ids, node_coords, element_ids, element_nodes = FemBenchmarks.make_structured_mesh('tetra10', 48)
+        self.assertEqual((len(node_ids), element_nodes.shape), (125, (48, 10)), "Structured tetra10 mesh has wrong size")
+        corners = node_coords[element_nodes[:, :4] - 1]
+        edges = corners[:, 1:] - corners[:, :1]
+        volumes = np.einsum('ij,ij->i', edges[:, 0], np.cross(edges[:, 1], edges[:, 2])) / 6.0
+        self.assertTrue(np.allclose(volumes, 1.0 / 6.0), "Structured tetra10 mesh elements are not in ccx orientation")
+        node_ids, node_coords, element_ids, element_nodes = FemBenchmarks.make_structured_mesh('hexa20', 8)
+        self.assertEqual((len(node_ids), element_nodes.shape), (81, (8, 20)), "Structured hexa20 mesh has wrong size")
+        frd_file = os.path.join(tempfile.mkdtemp(), 'structured_hexa20.frd')
+        disp, stress = FemBenchmarks.write_frd_result(frd_file, node_ids, node_coords, element_ids, element_nodes)
+        m = importCcxFrdResults.readResultArrays(frd_file)
+        self.assertTrue(np.array_equal(m['Elements']['Hexa20Elem'][1], FemBenchmarks.get_freecad_element_nodes(element_nodes)), "Structured hexa20 elements changed in the frd file")
+        self.assertTrue(np.allclose(m['Results'][0]['stress'][1], stress, rtol=1e-5), "Structured mesh stresses changed in the frd file")
+
+    def test_femnodes_ele_table(self):
+        import FemMeshTools
+        # two tetra4 sharing the face 2, 3, 4
+        femelement_table = {1: (1, 2, 3, 4), 2: (2, 3, 4, 5)}
+        femnodes_ele_table = FemMeshTools.get_femnodes_ele_table({}, femelement_table)
+        self.assertEqual(femnodes_ele_table['node_ids'].tolist(), [1, 2, 3, 4, 5], "Nodes of femnodes_ele_table are wrong")
+        self.assertEqual(FemMeshTools.get_femelements_by_femnodes_bin(femelement_table, femnodes_ele_table, [1, 2, 3, 4]), [1], "Binary volume search failed")
+        bit_pattern_dict = FemMeshTools.get_bit_pattern_dict(femelement_table, femnodes_ele_table, [2, 3, 4])
+        self.assertEqual(FemMeshTools.get_ccxelement_faces_from_binary_search(bit_pattern_dict), [[1, 4], [2, 1]], "Binary face search failed")
+        self.assertEqual(FemMeshTools.get_femvolumeelements_by_femfacenodes(femelement_table, [2, 3, 4]), [1, 2], "Volume search by face nodes failed")
+
+    def test_mesh_topology_cache(self):
+        import FemMeshTools
+        import FemMeshTopologyCache
+        import os
+        cache_dir = temp_dir + '/FEM_topology_cache'
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        self.active_doc.saveAs(cache_dir + '/topology_cache.fcstd')
+        femmesh = Fem.FemMesh()
+        for i, (x, y, z) in enumerate([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 1)]):
+            femmesh.addNode(x, y, z, i + 1)
+        femmesh.addVolume([1, 2, 3, 4], 1)
+        femmesh.addVolume([2, 3, 4, 5], 2)
+        mesh_object = self.active_doc.addObject('Fem::FemMeshObject', 'TopologyMesh')
+        mesh_object.FemMesh = femmesh
+        FemMeshTopologyCache.clear_topology_cache(mesh_object)
+
+        # round trip through the cache file
+        cache = FemMeshTopologyCache.get_topology_cache(mesh_object)
+        cache['femelement_table'] = FemMeshTools.get_femelement_table(femmesh)
+        cache['femnodes_ele_table'] = FemMeshTools.get_femnodes_ele_table({}, cache['femelement_table'])
+        cache['ref_nodes'][('Box', 'Face1')] = ('shapehash', [1, 2, 3])
+        FemMeshTopologyCache.save_topology_cache(mesh_object, cache)
+        FemMeshTopologyCache.topology_caches.clear()
+        read_cache = FemMeshTopologyCache.get_topology_cache(mesh_object)
+        self.assertEqual(read_cache['hash'], cache['hash'], "Hash of the topology cache file is wrong")
+        self.assertEqual(read_cache['femelement_table'], {1: (1, 2, 3, 4), 2: (2, 3, 4, 5)}, "femelement_table of the topology cache file is wrong")
+        for k in FemMeshTopologyCache.femnodes_ele_table_keys:
+            self.assertEqual(read_cache['femnodes_ele_table'][k].tolist(), cache['femnodes_ele_table'][k].tolist(), "femnodes_ele_table of the topology cache file is wrong")
+        self.assertEqual(read_cache['ref_nodes'], {('Box', 'Face1'): ('shapehash', [1, 2, 3])}, "Reference nodes of the topology cache file are wrong")
+        self.assertTrue(FemMeshTopologyCache.get_topology_cache(mesh_object) is read_cache, "Topology cache of an unchanged mesh is not reused")
+
+        # the same node count and node and element ids with other element nodes invalidate the cache and its file
+        renumbered_femmesh = Fem.FemMesh()
+        for n, v in femmesh.Nodes.items():
+            renumbered_femmesh.addNode(v.x, v.y, v.z, n)
+        renumbered_femmesh.addVolume([1, 2, 3, 5], 1)
+        renumbered_femmesh.addVolume([2, 3, 4, 1], 2)
+        mesh_object.FemMesh = renumbered_femmesh
+        self.assertFalse(os.path.isfile(FemMeshTopologyCache.get_cache_file_name(mesh_object)), "Topology cache file of a changed connectivity was kept")
+        self.assertEqual(FemMeshTopologyCache.get_topology_cache(mesh_object)['femelement_table'], {}, "Topology cache of a changed connectivity was used")
+        FemMeshTopologyCache.clear_topology_cache(mesh_object)
+
+        # cached femnodes of a reference shape are only used for the same shape
+        box = self.active_doc.addObject("Part::Box", "Box")
+        self.active_doc.recompute()
+        cube_femmesh = import_csv_mesh(mesh_points_file, mesh_volumes_file)
+        face = box.Shape.Faces[0]
+        nodes = FemMeshTools.get_femnodes_by_refshape_element(cube_femmesh, face)
+        ref_nodes_cache = {(box.Name, 'Face1'): ('shapehash', [1, 2, 3])}
+        self.assertEqual(sorted(FemMeshTools.get_femnodes_by_ref_element(cube_femmesh, box, 'Face1', face, ref_nodes_cache)), sorted(nodes), "Cached femnodes of another shape were used")
+        self.assertEqual(ref_nodes_cache[(box.Name, 'Face1')][0], FemMeshTools.get_ref_element_shape_hash(face), "Femnodes of the reference shape were not cached")
+
+    def test_femnodes_index_search(self):
+        import FemMeshTools
+        box = self.active_doc.addObject("Part::Box", "Box")
+        self.active_doc.recompute()
+        femmesh = import_csv_mesh(mesh_points_file, mesh_volumes_file)
+        femnodes_index = FemMeshTools.get_femnodes_index(femmesh.Nodes)
+        shape = box.Shape
+        for r, get_nodes in ((shape.Vertexes[6], femmesh.getNodesByVertex),
+                             (shape.Edges[4], femmesh.getNodesByEdge),
+                             (shape.Faces[5], femmesh.getNodesByFace),
+                             (shape.Solids[0], femmesh.getNodesBySolid)):
+            nodes = sorted(get_nodes(r))
+            self.assertTrue(nodes, "No femnodes of the {} found".format(r.ShapeType))
+            self.assertEqual(FemMeshTools.get_femnodes_by_refshape_element(femmesh, r, femnodes_index), nodes,
+                             "Femnodes of the {} found by the spatial index differ from the FemMesh method".format(r.ShapeType))
+
+    def test_ref_facenodes_areas(self):
+        import FemMeshTools
+        femnodes_mesh = {1: FreeCAD.Vector(0, 0, 0), 2: FreeCAD.Vector(2, 0, 0), 3: FreeCAD.Vector(2, 1, 0), 4: FreeCAD.Vector(0, 1, 0),
+                         5: FreeCAD.Vector(4, 0, 0), 6: FreeCAD.Vector(4, 1, 0), 7: FreeCAD.Vector(1, 0, 0), 8: FreeCAD.Vector(2, 0.5, 0),
+                         9: FreeCAD.Vector(1, 0.5, 0), 10: FreeCAD.Vector(0, 0.5, 0)}
+        # a quad4 and two tria3 sharing the nodes 2 and 3
+        face_table = {1: (1, 2, 3, 4), 2: (2, 5, 6), 3: (2, 6, 3)}
+        node_ids, node_areas = FemMeshTools.get_ref_facenodes_area_arrays(femnodes_mesh, face_table)
+        self.assertEqual(node_ids.tolist(), [1, 2, 3, 4, 5, 6], "Nodes of face area arrays are wrong")
+        self.assertEqual(node_areas.tolist(), [0.5, 0.5 + 1.0 / 3.0 + 1.0 / 3.0, 0.5 + 1.0 / 3.0, 0.5, 1.0 / 3.0, 1.0 / 3.0 + 1.0 / 3.0], "Node areas of tria3 and quad4 faces are wrong")
+        node_ids, node_areas = FemMeshTools.get_ref_facenodes_area_arrays(femnodes_mesh, {1: (1, 2, 4, 7, 9, 10)})
+        self.assertAlmostEqual(node_areas.sum(), 1.0, 12, "Node areas of tria6 face do not sum up to the face area")
+        node_ids, node_lengths = FemMeshTools.get_ref_edgenodes_length_arrays(femnodes_mesh, {1: (1, 2, 7), 2: (2, 8)})
+        self.assertEqual(node_lengths.tolist(), [1.0 / 3.0, 1.0 / 3.0 + 0.25, 4.0 / 3.0, 0.25], "Node lengths of seg2 and seg3 edges are wrong")
+
+    def test_result_array_cache(self):
+        result_obj = ObjectsFem.makeResultMechanical('ArrayCacheResult')
+        result_obj.Temperature = [300.0, 310.0]
+        result_obj.DisplacementVectors = [FreeCAD.Vector(1, 2, 3), FreeCAD.Vector(4, 5, 6)]
+        temperature = result_obj.Proxy.get_array(result_obj, 'Temperature')
+        self.assertTrue(result_obj.Proxy.get_array(result_obj, 'Temperature') is temperature, "Result array is not cached")
+        self.assertEqual(result_obj.Proxy.get_array(result_obj, 'DisplacementVectors')[:, 2].tolist(), [3.0, 6.0], "Result vector array is wrong")
+        result_obj.Temperature = [320.0, 330.0]
+        self.assertEqual(result_obj.Proxy.get_array(result_obj, 'Temperature').tolist(), [320.0, 330.0], "Result array cache is not invalidated")
+        self.active_doc.removeObject('ArrayCacheResult')
+
+    def test_compact_result_storage(self):
+        import importCcxFrdResults
+        import importToolsFem
+        import numpy as np
+        result_obj = ObjectsFem.makeResultMechanical('CompactResult', compact=True)
+        disp = np.array([(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)])
+        result_set = {'number': 0, 'time': 0, 'disp': (np.array([1, 2]), disp), 'temp': (np.array([1, 2]), np.array([300.0, 310.0]))}
+        importToolsFem.fill_femresult_mechanical(result_obj, result_set, 1.0)
+        self.assertEqual(result_obj.DisplacementVectors, [], "Compact result has filled list properties")
+        self.assertEqual(result_obj.Proxy.get_array(result_obj, 'DisplacementVectors').tolist(), disp.tolist(), "Compact result array is wrong")
+        self.assertEqual(result_obj.Stats[2], 4.0, "Compact result stats are wrong")
+        self.assertTrue(importCcxFrdResults.load_lazy_result(result_obj), "Compact result lists could not be loaded")
+        self.assertEqual(result_obj.NodeNumbers, [1, 2], "Compact result node numbers are wrong")
+        self.assertEqual(result_obj.Temperature, [300.0, 310.0], "Compact result temperatures are wrong")
+        self.assertEqual(result_obj.DisplacementVectors[1], FreeCAD.Vector(4, 5, 6), "Compact result vectors are wrong")
+        importCcxFrdResults.release_compact_result(result_obj)
+        self.assertEqual(result_obj.DisplacementVectors, [], "Released compact result keeps filled list properties")
+        self.assertEqual(result_obj.Proxy.get_array(result_obj, 'Temperature').tolist(), [300.0, 310.0], "Released compact result array is wrong")
+        self.assertTrue(importCcxFrdResults.load_lazy_result(result_obj), "Released compact result lists could not be loaded again")
+        self.assertEqual(result_obj.NodeNumbers, [1, 2], "Released compact result is not filled again")
+        result_obj.Proxy.write_result_data(result_obj, {'Temperature': np.array([300.5, 310.5])}, float32=True)
+        temperature = result_obj.Proxy.get_array(result_obj, 'Temperature')
+        self.assertEqual(temperature.dtype, np.float32, "Compact result is not saved as float32")
+        self.assertEqual(temperature.tolist(), [300.5, 310.5], "Compact float32 result is wrong")
+        self.active_doc.removeObject('CompactResult')
+
+    def test_stress_array_functions(self):
+        import importToolsFem
+        import numpy as np
+        stress = np.random.RandomState(42).uniform(-100.0, 100.0, (50, 6))
+        # degenerate tensors: hydrostatic with three equal eigenvalues, two equal eigenvalues and zero stress
+        stress = np.vstack((stress, [(50.0, 50.0, 50.0, 0.0, 0.0, 0.0), (10.0, 10.0, -20.0, 0.0, 0.0, 0.0), (0.0,) * 6]))
+        von_mises = importToolsFem.calculate_von_mises_array(stress)
+        principal = importToolsFem.calculate_principal_stress_array(stress)
+        for s, vm, p in zip(stress.tolist(), von_mises.tolist(), principal.tolist()):
+            self.assertAlmostEqual(vm, importToolsFem.calculate_von_mises(s), 9, "Von mises stress of the array function is wrong")
+            for p_array, p_scalar in zip(p, importToolsFem.calculate_principal_stress(s)):
+                self.assertAlmostEqual(p_array, p_scalar, 9, "Principal stress of the array function is wrong")
+        self.assertAlmostEqual(von_mises[-3], 0.0, 9, "Von mises stress of a hydrostatic stress is not zero")
+        self.assertAlmostEqual(principal[-2, 3], 15.0, 9, "Maximum shear stress of two equal eigenvalues is wrong")
+
+    def test_femmesh2mesh_surface_faces(self):
+        import FemMesh2Mesh
+        import numpy as np
+        # two tetra4 sharing the face 2, 3, 4
+        faces = np.array([(1, 2, 3, 4), (2, 3, 4, 5)])[:, [[0, 1, 2], [0, 3, 1], [1, 3, 2], [2, 3, 0]]].reshape(-1, 3)
+        single_faces = FemMesh2Mesh.get_single_faces(faces)
+        self.assertEqual(len(single_faces), 6, "Surface face search found a wrong number of faces")
+        self.assertEqual(single_faces.tolist(), [0, 1, 3, 5, 6, 7], "Surface face search found the shared face")
+
+    def test_inp_array_reader(self):
+        import importInpMesh
+        import os
+        deck_dir = tempfile.mkdtemp()
+        f = open(os.path.join(deck_dir, 'nodes.inp'), 'w')
+        f.write('*NODE, NSET=Nall\n')
+        for i in range(20):
+            f.write('{}, {}, {}, {}\n'.format(i + 1, i % 3, i % 4, i // 12))
+        f.close()
+        f = open(os.path.join(deck_dir, 'deck.inp'), 'w')
+        f.write('** test deck\n*INCLUDE, INPUT=nodes.inp\n*ELEMENT, TYPE=C3D20, ELSET=Eall\n')
+        f.write('1, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,\n16, 17, 18, 19, 20\n')
+        f.write('*NSET, NSET=Fixed, GENERATE\n3, 6, 1\n*NSET, NSET=Fixed\n10,\n*ELSET, ELSET=Solid\nEall\n*STEP\n*NODE\n99, 0, 0, 0\n')
+        f.close()
+        chunk_lines = importInpMesh.inp_chunk_lines
+        importInpMesh.inp_chunk_lines = 3  # elements and nodes across chunks
+        m = importInpMesh.read_inp_arrays(os.path.join(deck_dir, 'deck.inp'))
+        importInpMesh.inp_chunk_lines = chunk_lines
+        self.assertEqual(m['Nodes'][0].tolist(), list(range(1, 21)), "Node ids of inp array reader are wrong")
+        self.assertEqual(m['Nodes'][1][13].tolist(), [1.0, 1.0, 1.0], "Node coordinates of inp array reader are wrong")
+        ele_ids, ele_nodes = m['Elements']['Hexa20Elem']
+        self.assertEqual(ele_nodes[0].tolist(), [6, 7, 8, 5, 2, 3, 4, 1, 14, 15, 16, 13, 10, 11, 12, 9, 18, 19, 20, 17], "Element nodes of inp array reader are wrong")
+        self.assertEqual(m['NodeSets']['Fixed'].tolist(), [3, 4, 5, 6, 10], "Node set of inp array reader is wrong")
+        self.assertEqual(m['ElementSets']['Solid'].tolist(), [1], "Element set of inp array reader is wrong")
+
+    def test_inp_id_set_writer(self):
+        import FemInputWriterCcx
+        inp_file = tempfile.NamedTemporaryFile(mode='w+', suffix='.inp')
+        FemInputWriterCcx.write_id_set(inp_file, 'NSET', 'Test', [12, 1, 2, 3, 4, 8, 9])
+        inp_file.seek(0)
+        expected = '*NSET,NSET=Test\n8,\n9,\n12,\n*NSET,NSET=Test,GENERATE\n1,4,1\n'
+        self.assertEqual(inp_file.read(), expected, "Node set with GENERATE range is wrong")
+        inp_file.close()
+
+    def test_fenics_xdmf_binary(self):
+        import os
+        import readFenicsXDMF
+        import writeFenicsXDMF
+        mesh_obj = self.active_doc.addObject('Fem::FemMeshObject', 'XdmfMesh')
+        tetra4 = Fem.FemMesh()
+        for i, n in enumerate([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 1)]):
+            tetra4.addNode(n[0], n[1], n[2], i + 1)
+        tetra4.addVolume([1, 2, 3, 4], 1)
+        tetra4.addVolume([2, 3, 4, 5], 2)
+        mesh_obj.FemMesh = tetra4
+        xdmf_file = os.path.join(tempfile.mkdtemp(), 'tetra4.xdmf')
+        writeFenicsXDMF.write_fenics_mesh_xdmf(mesh_obj, xdmf_file, writeFenicsXDMF.ENCODING_BINARY)
+        m = readFenicsXDMF.read_fenics_mesh_xdmf(xdmf_file)
+        self.assertEqual(m['Nodes'][1][4].tolist(), [1.0, 1.0, 1.0], "Node coordinates of binary XDMF are wrong")
+        self.assertEqual(m['Elements']['Tetra4Elem'][1].tolist(), [[1, 2, 3, 4], [2, 3, 4, 5]], "Element nodes of binary XDMF are wrong")
+        self.active_doc.removeObject('XdmfMesh')
+
+    def test_fenics_xml_lower_dims(self):
+        import readFenicsXML
+        xml_file = tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False)
+        xml_file.write('<?xml version="1.0"?>\n<dolfin>\n  <mesh celltype="tetrahedron" dim="3">\n    <vertices size="5">\n')
+        for i, n in enumerate([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 1)]):
+            xml_file.write('      <vertex index="{}" x="{}" y="{}" z="{}" />\n'.format(i, *n))
+        xml_file.write('    </vertices>\n    <cells size="2">\n')
+        xml_file.write('      <tetrahedron index="1" v0="1" v1="2" v2="3" v3="4" />\n')
+        xml_file.write('      <tetrahedron index="0" v0="0" v1="1" v2="2" v3="3" />\n')
+        xml_file.write('    </cells>\n  </mesh>\n</dolfin>\n')
+        xml_file.close()
+        m = readFenicsXML.read_fenics_mesh_xml_arrays(xml_file.name)
+        self.assertEqual(m['Nodes'][1][4].tolist(), [1.0, 1.0, 1.0], "Node coordinates of Fenics XML are wrong")
+        # tetras with a positive determinant get their first two nodes swapped
+        self.assertEqual(m['Elements']['Tetra4Elem'][1].tolist(), [[2, 1, 3, 4], [3, 2, 4, 5]], "Tetra elements of Fenics XML are wrong")
+        self.assertEqual(len(m['Elements']['Tria3Elem'][0]), 7, "Shared face of Fenics XML tetras is not unique")
+        self.assertEqual(len(m['Elements']['Seg2Elem'][0]), 9, "Shared edges of Fenics XML tetras are not unique")
+
+    def test_ccx_runner(self):
+        import FemCcxRunner
+        import os
+        import sys
+        if not os.path.basename(sys.executable).lower().startswith('python'):
+            self.skipTest("no Python interpreter to run the ccx stub")
+        stub_dir = tempfile.mkdtemp()
+        stub_file = os.path.join(stub_dir, 'ccx_stub.py')
+        f = open(stub_file, 'w')
+        f.write("import sys, time\n")
+        f.write("for l in [' STEP 1', ' increment 1 attempt 1 ', ' actual step time=5.000000e-01',\n")
+        f.write("          ' iteration 1', ' iteration 2', ' convergence', ' Job finished']:\n")
+        f.write("    print(l)\n")
+        f.write("if sys.argv[-1] == 'hang':\n")
+        f.write("    sys.stdout.flush()\n")
+        f.write("    time.sleep(60)\n")
+        f.close()
+        progress = []
+        runner = FemCcxRunner.CcxRunner([sys.executable, stub_file], os.path.join(stub_dir, 'static.inp'),
+                                        log_lines=3, progress_callback=progress.append, time_period=1.0)
+        self.assertEqual(runner.run(), 0, "ccx stub failed")
+        self.assertEqual(runner.status, 'finished', "ccx runner status is wrong")
+        self.assertEqual(runner.stdout.splitlines(), [' iteration 2', ' convergence', ' Job finished'], "Bounded ccx log is wrong")
+        self.assertEqual(progress[-1]['iteration'], 2, "Iteration of ccx progress is wrong")
+        self.assertEqual(progress[-1]['converged_increments'], 1, "Convergence of ccx progress is wrong")
+        self.assertTrue(progress[-1]['job_finished'], "Job finished of ccx progress is wrong")
+        runner = FemCcxRunner.CcxRunner([sys.executable, stub_file], os.path.join(stub_dir, 'hang.inp'), time_limit=1)
+        runner.run()
+        self.assertEqual(runner.status, 'timeout', "ccx runner time limit failed")
+        self.assertTrue(runner.elapsed < 30, "ccx runner time limit did not stop ccx")
+
+    def test_ccx_runner_children(self):
+        import FemCcxRunner
+        import os
+        import sys
+        import threading
+        if not os.path.basename(sys.executable).lower().startswith('python'):
+            self.skipTest("no Python interpreter to run the ccx stub")
+        stub_dir = tempfile.mkdtemp()
+        stub_file = os.path.join(stub_dir, 'ccx_wrapper_stub.py')
+        f = open(stub_file, 'w')
+        # a wrapper like an MPI launcher, its child inherits the pipes and outlives a killed wrapper
+        f.write("import subprocess, sys\n")
+        f.write("print(' STEP 1')\n")
+        f.write("sys.stdout.flush()\n")
+        f.write("subprocess.call([sys.executable, '-c', 'import time; time.sleep(60)'])\n")
+        f.close()
+        runner = FemCcxRunner.CcxRunner([sys.executable, stub_file], os.path.join(stub_dir, 'static.inp'), time_limit=1)
+        runner.run()
+        self.assertEqual(runner.status, 'timeout', "ccx runner time limit failed")
+        self.assertTrue(runner.elapsed < 20, "ccx runner time limit did not stop the children of ccx")
+        runner = FemCcxRunner.CcxRunner([sys.executable, stub_file], os.path.join(stub_dir, 'static.inp'))
+        runner.start()
+        timer = threading.Timer(1.0, runner.cancel)
+        timer.start()
+        runner.wait()
+        timer.join()
+        self.assertEqual(runner.status, 'cancelled', "ccx runner cancel failed")
+        self.assertTrue(runner.elapsed < 20, "ccx runner cancel did not stop the children of ccx")
+
+    def test_batch_frd_stats(self):
+        import FemBatchCcx
+        import FemTools
+        for base_name in [static_base_name, frequency_base_name, thermomech_base_name]:
+            stats = FemBatchCcx.get_frd_stats(test_file_dir + '/' + base_name + '.frd')
+            lines = ["{}: {}\n".format(t, FemTools.get_stats_of_type(stats, t)) for t in FemBatchCcx.default_result_types]
+            sf = open(test_file_dir + '/' + base_name + '_expected_values', 'r')
+            expected = force_unix_line_ends(sf.readlines())
+            sf.close()
+            self.assertEqual(lines, expected, "Batch stats of frd file differ from expected values of " + base_name)
+        self.assertEqual(FemBatchCcx.get_job_split(100, 8), (8, 1), "Batch job split is wrong")
+        self.assertEqual(FemBatchCcx.get_job_split(2, 8), (2, 4), "Batch job split is wrong")
+
     def tearDown(self):
         FreeCAD.closeDocument("FemTest")
         pass
@@ -108,6 +575,30 @@ class FemCcxAnalysisTest(unittest.TestCase):
             FreeCAD.setActiveDocument("FemTest")
         self.active_doc = FreeCAD.ActiveDocument
 
+    def test_constraint_resolution_pool(self):
+        import shutil
+        analysis, solver_object, box, mesh_object = create_cube_static_analysis(self.active_doc)
+        working_dir = temp_dir + '/FEM_resolution_pool'
+        fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+        workers = fem_prefs.GetInt("ConstraintResolutionWorkers", 1)
+        use_cache = fem_prefs.GetBool("UseMeshTopologyCache", True)
+        fem_prefs.SetBool("UseMeshTopologyCache", False)  # the femnodes have to be searched on every write
+        inp_files = []
+        try:
+            for pool_workers in (1, 2):
+                fem_prefs.SetInt("ConstraintResolutionWorkers", pool_workers)
+                fea = FemToolsCcx.FemToolsCcx(analysis, solver_object, test_mode=True)
+                fea.setup_working_dir(working_dir)
+                fea.set_analysis_type("static")
+                fea.write_inp_file()
+                inp_files.append(working_dir + '/' + mesh_name + '_{}.inp'.format(pool_workers))
+                shutil.copyfile(fea.inp_file_name, inp_files[-1])
+        finally:
+            fem_prefs.SetInt("ConstraintResolutionWorkers", workers)
+            fem_prefs.SetBool("UseMeshTopologyCache", use_cache)
+        ret = compare_inp_files(inp_files[0], inp_files[1])
+        self.assertFalse(ret, "inp file written with the constraint resolution pool differs.\n{}".format(ret))
+
     def test_static_freq_analysis(self):
         # static
         fcc_print('--------------- Start of FEM tests ---------------')
@@ -422,6 +913,46 @@ def import_csv_mesh(import_points_file, import_volumes_file):
     return the_fem_mesh
 
 
+def create_cube_static_analysis(doc):
+    # the cube of test_static_freq_analysis, returns the analysis, the solver, the box and the mesh object
+    box = doc.addObject("Part::Box", "Box")
+    analysis = ObjectsFem.makeAnalysis('Analysis')
+    solver_object = ObjectsFem.makeSolverCalculix('CalculiX')
+    solver_object.GeometricalNonlinearity = 'linear'
+    solver_object.ThermoMechSteadyState = False
+    solver_object.MatrixSolverType = 'default'
+    solver_object.IterationsControlParameterTimeUse = False
+    analysis.Member = analysis.Member + [solver_object]
+    material_object = ObjectsFem.makeMaterialSolid('MechanicalMaterial')
+    mat = material_object.Material
+    mat['Name'] = "Steel-Generic"
+    mat['YoungsModulus'] = "200000 MPa"
+    mat['PoissonRatio'] = "0.30"
+    mat['Density'] = "7900 kg/m^3"
+    material_object.Material = mat
+    analysis.Member = analysis.Member + [material_object]
+    fixed_constraint = doc.addObject("Fem::ConstraintFixed", "FemConstraintFixed")
+    fixed_constraint.References = [(box, "Face1")]
+    analysis.Member = analysis.Member + [fixed_constraint]
+    force_constraint = doc.addObject("Fem::ConstraintForce", "FemConstraintForce")
+    force_constraint.References = [(box, "Face6")]
+    force_constraint.Force = 40000.0
+    force_constraint.Direction = (box, ["Edge5"])
+    doc.recompute()
+    force_constraint.Reversed = True
+    analysis.Member = analysis.Member + [force_constraint]
+    pressure_constraint = doc.addObject("Fem::ConstraintPressure", "FemConstraintPressure")
+    pressure_constraint.References = [(box, "Face2")]
+    pressure_constraint.Pressure = 1000.0
+    pressure_constraint.Reversed = False
+    analysis.Member = analysis.Member + [pressure_constraint]
+    mesh_object = doc.addObject('Fem::FemMeshObject', mesh_name)
+    mesh_object.FemMesh = import_csv_mesh(mesh_points_file, mesh_volumes_file)
+    analysis.Member = analysis.Member + [mesh_object]
+    doc.recompute()
+    return analysis, solver_object, box, mesh_object
+
+
 def compare_inp_files(file_name1, file_name2):
     file1 = open(file_name1, 'r')
     f1 = file1.readlines()
@@ -60,14 +60,32 @@ def insert(filename, docname):
 
 
 ########## module specific methods ##########
-def importFrd(filename, analysis=None, result_name_prefix=None):
+def importFrd(filename, analysis=None, result_name_prefix=None, lazy=None):
+    '''imports the frd file into result objects
+    with lazy loading only the index of the frd file is read, the result objects of a multi
+    increment or multi eigenmode frd file are filled on demand by load_lazy_result()
+    lazy loading is opt-in by the LazyResultLoading preference, the result fields of lazy result objects
+    are not saved in the document and they are empty for C++ consumers until they are loaded
+    '''
     import importToolsFem
     import ObjectsFem
     if result_name_prefix is None:
         result_name_prefix = ''
-    m = readResult(filename)
+    if lazy is None:
+        fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+        lazy = fem_prefs.GetBool("LazyResultLoading", False)
+    if lazy:
+        index = get_frd_result_index(filename)
+        if len(index.result_sets) > 1:
+            elements = index.read_elements() if analysis is None else {}  # the mesh is only made without analysis
+            m = {'Nodes': index.read_nodes(), 'Elements': elements, 'Results': index.result_sets}
+        else:
+            lazy = False
+    if not lazy:
+        m = readResultArrays(filename)
+    node_ids, node_coords = m['Nodes']
     mesh_object = None
-    if(len(m['Nodes']) > 0):
+    if(len(node_ids) > 0):
         if analysis is None:
             analysis_name = os.path.splitext(os.path.basename(filename))[0]
             analysis_object = ObjectsFem.makeAnalysis('Analysis')
@@ -75,44 +93,28 @@ def importFrd(filename, analysis=None, result_name_prefix=None):
         else:
             analysis_object = analysis  # see if statement few lines later, if not analysis -> no FemMesh object is created !
 
-        if 'Nodes' in m:
-            positions = []
-            for k, v in m['Nodes'].items():
-                positions.append(v)
-            p_x_max, p_y_max, p_z_max = map(max, zip(*positions))
-            p_x_min, p_y_min, p_z_min = map(min, zip(*positions))
-
-            x_span = abs(p_x_max - p_x_min)
-            y_span = abs(p_y_max - p_y_min)
-            z_span = abs(p_z_max - p_z_min)
-            span = max(x_span, y_span, z_span)
+        span = float((node_coords.max(axis=0) - node_coords.min(axis=0)).max())
 
         if (not analysis):
-            mesh = importToolsFem.make_femmesh(m)
+            mesh = importToolsFem.make_femmesh_from_arrays(node_ids, node_coords, m['Elements'])
 
-            if len(m['Nodes']) > 0:
+            if len(node_ids) > 0:
                 mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', 'ResultMesh')
                 mesh_object.FemMesh = mesh
                 analysis_object.Member = analysis_object.Member + [mesh_object]
 
         number_of_increments = len(m['Results'])
-        for result_set in m['Results']:
-            eigenmode_number = result_set['number']
-            step_time = result_set['time']
-            step_time = round(step_time, 2)
-            if eigenmode_number > 0:
-                results_name = result_name_prefix + 'mode_' + str(eigenmode_number) + '_results'
-            elif number_of_increments > 1:
-                results_name = result_name_prefix + 'time_' + str(step_time) + '_results'
-            else:
-                results_name = result_name_prefix + 'results'
-
-            results = ObjectsFem.makeResultMechanical(results_name)
+        for step, result_set in enumerate(m['Results']):
+            results_name = get_results_name(result_set, number_of_increments > 1, result_name_prefix)
+            results = ObjectsFem.makeResultMechanical(results_name, compact=False if lazy else None)
             for m in analysis_object.Member:  # TODO analysis could have multiple mesh objects in the future
                 if m.isDerivedFrom("Fem::FemMeshObject"):
                     results.Mesh = m
                     break
-            results = importToolsFem.fill_femresult_mechanical(results, result_set, span)
+            if lazy:
+                init_lazy_result(results, filename, step, result_set)
+            else:
+                results = importToolsFem.fill_femresult_mechanical(results, result_set, span)
             analysis_object.Member = analysis_object.Member + [results]
 
         if(FreeCAD.GuiUp):
@@ -120,20 +122,37 @@ def importFrd(filename, analysis=None, result_name_prefix=None):
             FemGui.setActiveAnalysis(analysis_object)
 
 
-# read a calculix result file and extract the nodes, displacement vectores and stress values.
-def readResult(frd_input):
-    inout_nodes_exist = False
+def get_results_name(result_set, multiple_increments, result_name_prefix=''):
+    eigenmode_number = result_set['number']
+    step_time = round(result_set['time'], 2)
+    if eigenmode_number > 0:
+        return result_name_prefix + 'mode_' + str(eigenmode_number) + '_results'
+    elif multiple_increments:
+        return result_name_prefix + 'time_' + str(step_time) + '_results'
+    else:
+        return result_name_prefix + 'results'
+
+
+def read_inout_nodes():
+    '''read and remove the inout_nodes.txt written by the CalculiX input writer for fluid networks
+    returns a list of [elem, node, node] string lists
+    '''
+    inout_nodes = []
     if os.path.exists("inout_nodes.txt"):
-        inout_nodes = []
         f = pyopen("inout_nodes.txt", "r")
         lines = f.readlines()
         for line in lines:
             a = line.split(',')
             inout_nodes.append(a)
-        if len(inout_nodes) > 0:
-            inout_nodes_exist = True
         f.close()
         os.remove("inout_nodes.txt")
+    return inout_nodes
+
+
+# read a calculix result file and extract the nodes, displacement vectores and stress values.
+def readResult(frd_input):
+    inout_nodes = read_inout_nodes()
+    inout_nodes_exist = len(inout_nodes) > 0
     frd_file = pyopen(frd_input, "r")
     nodes = {}
     elements_hexa8 = {}
@@ -536,3 +555,487 @@ def readResult(frd_input):
             'Penta15Elem': elements_penta15, 'Hexa20Elem': elements_hexa20, 'Tria3Elem': elements_tria3, 'Tria6Elem': elements_tria6,
             'Quad4Elem': elements_quad4, 'Quad8Elem': elements_quad8, 'Seg2Elem': elements_seg2, 'Seg3Elem': elements_seg3,
             'Results': results}
+
+
+# columnar frd reader, the fixed width blocks are parsed in bulk into NumPy arrays
+# CalculiX frd element type --> FreeCAD element key, node count, node index order (see readResult())
+frd_element_types = {
+    1: ('Hexa8Elem', 8, (5, 6, 7, 4, 1, 2, 3, 0)),
+    2: ('Penta6Elem', 6, (4, 5, 3, 1, 2, 0)),
+    3: ('Tetra4Elem', 4, (1, 0, 2, 3)),
+    4: ('Hexa20Elem', 20, (7, 4, 5, 6, 3, 0, 1, 2, 19, 16, 17, 18, 11, 8, 9, 10, 15, 12, 13, 14)),
+    5: ('Penta15Elem', 15, (4, 5, 3, 1, 2, 0, 13, 14, 12, 7, 8, 6, 10, 11, 9)),
+    6: ('Tetra10Elem', 10, (1, 0, 2, 3, 4, 6, 5, 8, 7, 9)),
+    7: ('Tria3Elem', 3, (0, 1, 2)),
+    8: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    9: ('Quad4Elem', 4, (0, 1, 2, 3)),
+    10: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    11: ('Seg2Elem', 2, (0, 1)),
+    12: ('Seg3Elem', 3, (0, 2, 1))}
+
+# frd result block name --> result set key, number of values per node line
+frd_result_blocks = {
+    b'DISP': ('disp', 3),
+    b'STRESS': ('stress', 6),
+    b'TOSTRAIN': ('strain', 6),
+    b'PE': ('peeq', 1),
+    b'NDTEMP': ('temp', 1),
+    b'MAFLOW': ('mflow', 1),
+    b'STPRES': ('npressure', 1)}
+
+
+def readResultArrays(frd_input):
+    '''read a calculix result file into NumPy arrays
+    returns {'Nodes': (node_ids, node_coords),
+             'Elements': {'Tetra10Elem': (element_ids, element_nodes), ...},
+             'Results': [{'number': eigenmode, 'time': time, 'disp': (node_ids, values), ...}, ...]}
+    node_coords and the values of vector and tensor fields are 2D arrays with one row per node,
+    the element_nodes are 2D arrays with one row per element in FreeCAD node order
+    '''
+    import numpy as np
+    inout_nodes = read_inout_nodes()
+    nodes = (np.zeros(0, dtype=np.int64), np.zeros((0, 3)))
+    elements = {}
+    results = []
+    mode_results = {}
+    result_key = None  # (step number, step value) of the result set in mode_results
+    eigenmode = 0
+    block = None
+    block_lines = []
+
+    frd_file = pyopen(frd_input, "rb")
+    for line in frd_file:
+        code = line[1:3]
+        if code == b'-1' or code == b'-2':
+            if block is not None:
+                block_lines.append(line)
+        elif code == b'-3':
+            if block == b'2C':
+                nodes = _read_frd_value_block(block_lines, 3)
+            elif block == b'3C':
+                elements.update(_read_frd_element_block(block_lines, inout_nodes))
+            elif block is not None:
+                field = frd_result_blocks[block][0]
+                mode_results[field] = _read_frd_result_block(block, block_lines, inout_nodes)
+            block = None
+            block_lines = []
+        elif code == b'-4':
+            block = line[5:13].strip()
+            if block not in frd_result_blocks:
+                block = None  # result block we do not import
+        elif line[4:6] == b'2C' or line[4:6] == b'3C':
+            block = line[4:6]
+        elif line[5:10] == b'PMODE':
+            eigenmode = int(line[30:36])
+        elif line[2:7] == b'100CL':
+            # every step or eigenmode starts a new result set
+            step_key = (line[58:63], line[13:25])
+            if step_key != result_key:
+                _append_frd_result_set(results, mode_results)
+                mode_results = {'number': eigenmode, 'value': float(line[13:25])}
+                result_key = step_key
+            eigenmode = 0
+    frd_file.close()
+    _append_frd_result_set(results, mode_results)
+
+    if not len(nodes[0]):
+        FreeCAD.Console.PrintError('FEM: No nodes found in Frd file.\n')
+    return {'Nodes': nodes, 'Elements': elements, 'Results': results}
+
+
+# lazy loading of multi increment frd files
+# the FrdResultIndex knows the byte offsets of the node, element and result blocks of every result set
+# a lazy result object has the ResultFile and ResultStep properties, its fields are read on demand
+# by load_lazy_result(), at most max_resident_results lazy result objects keep their fields
+max_resident_results = 4
+resident_results = []  # (document name, result object name), least recently used first
+frd_result_indices = {}  # frd file --> FrdResultIndex
+
+
+class FrdResultIndex(object):
+    '''index of a calculix result file built in one pass over the file
+    result_sets: [{'number': eigenmode, 'time': time, 'disp': byte offset, 'stress': byte offset, ...}, ...]
+    with follow the index of the frd file of a running ccx is made, update() adds the lines ccx has
+    written meanwhile, a result set is added when the next one starts or the file ends
+    '''
+    def __init__(self, frd_input, follow=False):
+        self.frd_input = frd_input
+        self.inout_nodes = read_inout_nodes()
+        self.nodes_offset = None
+        self.elements_offsets = []
+        self.result_sets = []
+        self.span = None
+        self.offset = 0  # end of the last complete line which was read
+        self.mode_results = {}  # result set which is read
+        self.result_key = None
+        self.eigenmode = 0
+        self.finished = False
+        self.update()
+        if not follow:
+            self.finish()
+
+    def update(self):
+        '''reads the lines written since the last update, returns the number of new result sets'''
+        number_of_sets = len(self.result_sets)
+        frd_file = pyopen(self.frd_input, "rb")
+        frd_file.seek(self.offset)
+        for line in frd_file:
+            if not line.endswith(b'\n'):
+                break  # ccx is writing this line
+            self.offset += len(line)
+            if line[1:3] == b'-4':
+                block = line[5:13].strip()
+                if block in frd_result_blocks:
+                    self.mode_results[frd_result_blocks[block][0]] = (block, self.offset)
+            elif line[4:6] == b'2C':
+                self.nodes_offset = self.offset
+            elif line[4:6] == b'3C':
+                self.elements_offsets.append(self.offset)
+            elif line[5:10] == b'PMODE':
+                self.eigenmode = int(line[30:36])
+            elif line[2:7] == b'100CL':
+                step_key = (line[58:63], line[13:25])
+                if step_key != self.result_key:
+                    _append_frd_result_set(self.result_sets, self.mode_results)
+                    self.mode_results = {'number': self.eigenmode, 'value': float(line[13:25])}
+                    self.result_key = step_key
+                self.eigenmode = 0
+            elif line[:5] == b' 9999':
+                self.finish()
+                break
+        frd_file.close()
+        self.mtime = os.path.getmtime(self.frd_input)
+        self.size = os.path.getsize(self.frd_input)
+        return len(self.result_sets) - number_of_sets
+
+    def finish(self):
+        # the last result set is complete if the file has ended
+        if not self.finished:
+            _append_frd_result_set(self.result_sets, self.mode_results)
+            self.mode_results = {}
+            self.finished = True
+
+    def is_current(self):
+        if not os.path.isfile(self.frd_input):
+            return False
+        if not self.finished:
+            # the frd file of a running ccx grows, the offsets of the complete result sets stay valid
+            return os.path.getsize(self.frd_input) >= self.offset
+        # a new solver run overwrites the frd file
+        return os.path.getmtime(self.frd_input) == self.mtime and os.path.getsize(self.frd_input) == self.size
+
+    def read_block(self, offset):
+        # the ' -1' and ' -2' lines of the block starting at offset
+        lines = []
+        frd_file = pyopen(self.frd_input, "rb")
+        frd_file.seek(offset)
+        for line in frd_file:
+            code = line[1:3]
+            if code == b'-1' or code == b'-2':
+                lines.append(line)
+            elif code == b'-3':
+                break
+        frd_file.close()
+        return lines
+
+    def read_nodes(self):
+        import numpy as np
+        if self.nodes_offset is None:
+            FreeCAD.Console.PrintError('FEM: No nodes found in Frd file.\n')
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+        nodes = _read_frd_value_block(self.read_block(self.nodes_offset), 3)
+        if len(nodes[0]):
+            self.span = float((nodes[1].max(axis=0) - nodes[1].min(axis=0)).max())
+        return nodes
+
+    def read_elements(self):
+        elements = {}
+        for offset in self.elements_offsets:
+            elements.update(_read_frd_element_block(self.read_block(offset), self.inout_nodes))
+        return elements
+
+    def read_result_set(self, step):
+        '''returns the result set like readResultArrays() does'''
+        result_set = {}
+        for key, value in self.result_sets[step].items():
+            if key in ('number', 'time'):
+                result_set[key] = value
+            else:
+                block, offset = value
+                result_set[key] = _read_frd_result_block(block, self.read_block(offset), self.inout_nodes)
+        return result_set
+
+    def get_span(self):
+        if self.span is None:
+            self.read_nodes()
+        return self.span or 0.0
+
+
+def get_frd_result_index(frd_input):
+    index = frd_result_indices.get(frd_input)
+    if index is None or not index.is_current():
+        index = FrdResultIndex(frd_input)
+        frd_result_indices[frd_input] = index
+    return index
+
+
+class FrdResultFollower(object):
+    '''follows the frd file of a running ccx, each complete result set is added to the analysis
+
+    update() is called periodically while ccx runs, only the lines written since the last call
+    are read, finish() is called after ccx has ended. The result objects are lazy result objects
+    with the LazyResultLoading preference, they are loaded once to get their Stats.
+    update() and finish() return the new result objects.
+    '''
+    def __init__(self, frd_input, analysis, result_name_prefix=None, lazy=None):
+        self.frd_input = frd_input
+        self.analysis = analysis
+        self.result_name_prefix = result_name_prefix or ''
+        if lazy is None:
+            fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+            lazy = fem_prefs.GetBool("LazyResultLoading", False)
+        self.lazy = lazy
+        self.index = None
+        self.number_of_results = 0
+        self.lazy_results = []
+
+    def update(self):
+        if self.index is None:
+            if not os.path.isfile(self.frd_input):
+                return []  # ccx has not started to write
+            self.index = FrdResultIndex(self.frd_input, follow=True)
+            frd_result_indices[self.frd_input] = self.index
+        else:
+            self.index.update()
+        return self.add_results()
+
+    def finish(self):
+        results = self.update()
+        if self.index is not None:
+            self.index.finish()
+            results += self.add_results()
+        for lazy_result in self.lazy_results:
+            lazy_result.ResultFileStamp = get_file_stamp(self.frd_input)
+        return results
+
+    def add_results(self):
+        import importToolsFem
+        import ObjectsFem
+        new_results = []
+        mesh_object = None
+        for m in self.analysis.Member:
+            if m.isDerivedFrom("Fem::FemMeshObject"):
+                mesh_object = m
+                break
+        for step in range(self.number_of_results, len(self.index.result_sets)):
+            result_set = self.index.result_sets[step]
+            # the number of increments is not known yet, the time is always in the name of a transient result
+            results_name = get_results_name(result_set, result_set['time'] > 0, self.result_name_prefix)
+            results = ObjectsFem.makeResultMechanical(results_name, compact=False if self.lazy else None)
+            if mesh_object:
+                results.Mesh = mesh_object
+            if self.lazy:
+                init_lazy_result(results, self.frd_input, step, result_set, stamp=False)  # the frd file still grows
+                load_lazy_result(results)
+                self.lazy_results.append(results)
+            else:
+                importToolsFem.fill_femresult_mechanical(results, self.index.read_result_set(step), self.index.get_span())
+            self.analysis.Member = self.analysis.Member + [results]
+            new_results.append(results)
+        self.number_of_results = len(self.index.result_sets)
+        return new_results
+
+
+def get_file_stamp(file_name):
+    # modification time and size, a rerun of the solver writes a new frd file with another stamp
+    return '{0!r} {1}'.format(os.path.getmtime(file_name), os.path.getsize(file_name))
+
+
+def init_lazy_result(results, frd_input, step, result_set, stamp=True):
+    # the result object only gets the data needed to list and identify it
+    results.addProperty("App::PropertyString", "ResultFile", "Fem", "frd file the results are loaded from")
+    results.addProperty("App::PropertyInteger", "ResultStep", "Fem", "index of the result set in the frd file")
+    results.addProperty("App::PropertyString", "ResultFileStamp", "Fem", "modification time and size of the frd file")
+    results.setEditorMode("ResultFile", 1)
+    results.setEditorMode("ResultStep", 1)
+    results.setEditorMode("ResultFileStamp", 1)
+    results.ResultFile = frd_input
+    results.ResultStep = step
+    if stamp:
+        results.ResultFileStamp = get_file_stamp(frd_input)
+    if result_set['number'] > 0 and 'stress' in result_set:
+        results.Eigenmode = result_set['number']
+    if 'temp' in result_set or 'mflow' in result_set or 'npressure' in result_set:
+        results.Time = round(result_set['time'], 2)
+
+
+def is_lazy_result(results):
+    return hasattr(results, 'ResultFile') and hasattr(results, 'ResultStep')
+
+
+def load_lazy_result(results):
+    '''fills a lazy result object with the fields of its result set, returns False if this was not possible
+    the list properties of a compact result object are filled from its ResultData file
+    the least recently used lazy result objects are unloaded if more than max_resident_results are loaded
+    '''
+    import importToolsFem
+    compact = importToolsFem.is_compact_result(results)
+    if not compact and not is_lazy_result(results):
+        return True
+    key = (results.Document.Name, results.Name)
+    if key in resident_results:
+        resident_results.remove(key)
+        resident_results.append(key)
+        return True
+    if compact:
+        # the fields of a compact result object are in its ResultData file
+        if not importToolsFem.load_compact_result(results):
+            return False
+    elif not os.path.isfile(results.ResultFile):
+        FreeCAD.Console.PrintError('FEM: Result file {} of {} not found.\n'.format(results.ResultFile, results.Label))
+        return False
+    elif hasattr(results, 'ResultFileStamp') and results.ResultFileStamp and results.ResultFileStamp != get_file_stamp(results.ResultFile):
+        FreeCAD.Console.PrintError('FEM: Result file {} of {} has changed since the results were imported, import them again.\n'.format(results.ResultFile, results.Label))
+        return False
+    else:
+        index = get_frd_result_index(results.ResultFile)
+        if results.ResultStep >= len(index.result_sets):
+            FreeCAD.Console.PrintError('FEM: Result file {} has no result set {}.\n'.format(results.ResultFile, results.ResultStep))
+            return False
+        result_set = index.read_result_set(results.ResultStep)
+        importToolsFem.fill_femresult_mechanical(results, result_set, index.get_span())
+    resident_results.append(key)
+    while len(resident_results) > max_resident_results:
+        unload_lazy_result(*resident_results.pop(0))
+    return True
+
+
+def release_compact_result(results):
+    '''empties the list properties of a compact result object which load_lazy_result() has filled
+    its fields stay in its ResultData file and in the arrays of its proxy, thus they are not saved twice
+    '''
+    import importToolsFem
+    if not importToolsFem.is_compact_result(results):
+        return
+    key = (results.Document.Name, results.Name)
+    if key in resident_results:
+        resident_results.remove(key)
+    for prop in results.ResultDataFields:
+        if getattr(results, prop):
+            setattr(results, prop, [])
+
+
+def unload_lazy_result(doc_name, results_name):
+    # Stats, Time and Eigenmode stay, they are small
+    try:
+        results = FreeCAD.getDocument(doc_name).getObject(results_name)
+    except NameError:
+        return  # document was closed
+    if results is None:
+        return  # result object was deleted
+    for prop in ('NodeNumbers', 'DisplacementVectors', 'DisplacementLengths', 'StressVectors', 'StrainVectors',
+                 'StressValues', 'PrincipalMax', 'PrincipalMed', 'PrincipalMin', 'MaxShear', 'Peeq',
+                 'Temperature', 'MassFlowRate', 'NetworkPressure', 'UserDefined'):
+        if hasattr(results, prop):
+            setattr(results, prop, [])
+
+
+def _append_frd_result_set(results, mode_results):
+    # same result sets as readResult(): displacements with stresses or mass flow with network pressure
+    if ('disp' in mode_results and 'stress' in mode_results) or ('mflow' in mode_results and 'npressure' in mode_results):
+        if 'temp' in mode_results or 'mflow' in mode_results:
+            mode_results['time'] = mode_results.pop('value', 0)
+        else:
+            mode_results['time'] = 0  # Don't return time if static
+            mode_results.pop('value', None)
+        results.append(mode_results)
+
+
+def _read_frd_result_block(block, lines, inout_nodes):
+    # returns the (node_ids, values) of the result block, values of one component per node are 1D
+    field, count = frd_result_blocks[block]
+    node_ids, values = _read_frd_value_block(lines, count)
+    if count == 1:
+        values = values[:, 0]
+    if field == 'mflow':
+        values = values * 1000  # convert units to kg/s from t/s
+    if (field == 'mflow' or field == 'npressure') and inout_nodes:
+        node_ids, values = _add_frd_inout_nodes(node_ids, values, inout_nodes)
+    return node_ids, values
+
+
+def _read_frd_value_block(lines, count):
+    # node lines: ' -1', node id (10 characters), count values (12 characters each)
+    import numpy as np
+    record_len = 10 + 12 * count
+    records = b''.join([l[3:3 + record_len] for l in lines if l[1:3] == b'-1'])
+    if len(records) % record_len:
+        # some lines are shorter than the fixed width, pad them
+        records = b''.join([l[3:3 + record_len].rstrip(b'\r\n').ljust(record_len) for l in lines if l[1:3] == b'-1'])
+    data = np.frombuffer(records, dtype=[('id', 'S10'), ('values', 'S12', (count,))])
+    return data['id'].astype(np.int64), data['values'].astype(np.float64)
+
+
+def _read_frd_element_block(lines, inout_nodes):
+    # element lines: ' -1', element id, element type, ... followed by ' -2' lines with the nodes (10 characters each)
+    import numpy as np
+    ele_ids = {}
+    ele_nodes = {}
+    ele_nodes_type = None
+    for line in lines:
+        if line[1:3] == b'-1':
+            ele_type = int(line[14:18])
+            ele_ids.setdefault(ele_type, []).append(line[3:13])
+            ele_nodes_type = ele_nodes.setdefault(ele_type, [])
+        else:
+            ele_nodes_type.append(line[3:].rstrip())
+    elements = {}
+    for ele_type in ele_ids:
+        key, node_count, node_order = frd_element_types[ele_type]
+        ids = np.frombuffer(b''.join(ele_ids[ele_type]), dtype='S10').astype(np.int64)
+        frd_nodes = np.frombuffer(b''.join(ele_nodes[ele_type]), dtype='S10').astype(np.int64)
+        frd_nodes = frd_nodes.reshape(len(ids), node_count)
+        elements[key] = (ids, frd_nodes[:, node_order])
+    if 'Seg3Elem' in elements and inout_nodes:
+        elements['Seg3Elem'] = _use_frd_inout_nodes(elements['Seg3Elem'], inout_nodes)
+    return elements
+
+
+def _use_frd_inout_nodes(seg3_elements, inout_nodes):
+    # fluid inlet and outlet node numbering of D elements, see readResult()
+    import numpy as np
+    ids, nodes = seg3_elements
+    inout = [(int(i[1]), int(i[2])) for i in inout_nodes]
+    new_ids = []
+    new_nodes = []
+    for ele, (nd1, nd2, nd3) in zip(ids.tolist(), nodes.tolist()):
+        ele_nodes = None
+        for node, inout_node in inout:
+            if nd1 == node:
+                ele_nodes = (inout_node, nd3, nd1)  # fluid inlet node numbering
+            elif nd3 == node:
+                ele_nodes = (nd1, inout_node, nd3)  # fluid outlet node numbering
+        if ele_nodes:
+            new_ids.append(ele)
+            new_nodes.append(ele_nodes)
+    return np.array(new_ids, dtype=np.int64), np.array(new_nodes, dtype=np.int64).reshape(-1, 3)
+
+
+def _add_frd_inout_nodes(node_ids, values, inout_nodes):
+    # the fluid inlet and outlet nodes get the value of their network node
+    import numpy as np
+    node_ids = node_ids.tolist()
+    values = values.tolist()
+    positions = dict((n, i) for i, n in enumerate(node_ids))
+    for i in inout_nodes:
+        node = int(i[1])
+        if node in positions:
+            value = values[positions[node]]
+            inout_node = int(i[2])
+            if inout_node in positions:
+                values[positions[inout_node]] = value
+            else:
+                positions[inout_node] = len(node_ids)
+                node_ids.append(inout_node)
+                values.append(value)
+    return np.array(node_ids, dtype=np.int64), np.array(values)
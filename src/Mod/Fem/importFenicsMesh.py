@@ -34,6 +34,7 @@ import importToolsFem
 import os
 
 import readFenicsXML
+import readFenicsXDMF
 import writeFenicsXML
 import writeFenicsXDMF
 
@@ -87,11 +88,13 @@ def export(objectslist, fileString):
 def import_fenics_mesh(filename, analysis=None):
     '''insert a FreeCAD FEM Mesh object in the ActiveDocument
     '''
-    mesh_data = readFenicsXML.read_fenics_mesh_xml(filename)
-    # xdmf not operational
-
     mesh_name = os.path.basename(os.path.splitext(filename)[0])
-    femmesh = importToolsFem.make_femmesh(mesh_data)
+    if os.path.splitext(filename)[1].lower() == '.xdmf':
+        mesh_data = readFenicsXDMF.read_fenics_mesh_xdmf(filename)
+    else:
+        mesh_data = readFenicsXML.read_fenics_mesh_xml_arrays(filename)
+    (node_ids, node_coords) = mesh_data['Nodes']
+    femmesh = importToolsFem.make_femmesh_from_arrays(node_ids, node_coords, mesh_data['Elements'])
     if femmesh:
         mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', mesh_name)
         mesh_object.FemMesh = femmesh
@@ -63,12 +63,15 @@ def insert(filename, docname):
 def import_inp(filename):
     "create imported objects in FreeCAD, currently only FemMesh"
 
-    m = read_inp(filename)
+    m = read_inp_arrays(filename)
     import importToolsFem
-    mesh = importToolsFem.make_femmesh(m)
+    node_ids, node_coords = m['Nodes']
+    mesh = importToolsFem.make_femmesh_from_arrays(node_ids, node_coords, m['Elements'])
     mesh_name = os.path.splitext(os.path.basename(filename))[0]
     mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', mesh_name)
     mesh_object.FemMesh = mesh
+    if m['NodeSets'] or m['ElementSets']:
+        print("read sets: {} node sets, {} element sets (not imported into the FemMesh)".format(len(m['NodeSets']), len(m['ElementSets'])))
 
 
 def read_inp(file_name):
@@ -240,3 +243,221 @@ def read_inp(file_name):
             'Tetra10Elem': elements.tetra10, 'Penta15Elem': elements.penta15, 'Hexa20Elem': elements.hexa20,
             'Tria3Elem': elements.tria3, 'Tria6Elem': elements.tria6, 'Quad4Elem': elements.quad4,
             'Quad8Elem': elements.quad8, 'Seg2Elem': elements.seg2}  # , 'Seg3Elem': elements.seg3}
+
+
+########## array based reader ##########
+# the data lines between two keyword lines are collected and parsed in bulk into NumPy arrays,
+# large blocks are parsed in chunks of inp_chunk_lines lines
+inp_chunk_lines = 100000
+include_cache = {}  # include file path --> (mtime, size, parsed inp part)
+
+# ccx element types --> element key, number of nodes, node order to switch from the CalculiX node numbering to the FreeCAD node numbering
+inp_element_groups = [
+    (("S3", "CPS3", "CPE3", "CAX3"), 'Tria3Elem', 3, (0, 1, 2)),
+    (("S6", "CPS6", "CPE6", "CAX6"), 'Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    (("S4", "S4R", "CPS4", "CPS4R", "CPE4", "CPE4R", "CAX4", "CAX4R"), 'Quad4Elem', 4, (0, 1, 2, 3)),
+    (("S8", "S8R", "CPS8", "CPS8R", "CPE8", "CPE8R", "CAX8", "CAX8R"), 'Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    (("C3D4",), 'Tetra4Elem', 4, (1, 0, 2, 3)),
+    (("C3D10",), 'Tetra10Elem', 10, (1, 0, 2, 3, 4, 6, 5, 8, 7, 9)),
+    (("C3D8", "C3D8R", "C3D8I"), 'Hexa8Elem', 8, (5, 6, 7, 4, 1, 2, 3, 0)),
+    (("C3D20", "C3D20R", "C3D20RI"), 'Hexa20Elem', 20, (5, 6, 7, 4, 1, 2, 3, 0, 13, 14, 15, 12, 9, 10, 11, 8, 17, 18, 19, 16)),
+    (("C3D6",), 'Penta6Elem', 6, (4, 5, 3, 1, 2, 0)),
+    (("C3D15",), 'Penta15Elem', 15, (4, 5, 3, 1, 2, 0, 10, 11, 9, 7, 8, 6, 13, 14, 12)),
+    (("B31", "B31R", "T3D2"), 'Seg2Elem', 2, (0, 1)),
+    (("B32", "B32R", "T3D3"), 'Seg3Elem', 3, (0, 2, 1))]
+inp_element_types = dict((t, (key, count, order)) for types, key, count, order in inp_element_groups for t in types)
+
+
+def read_inp_arrays(file_name):
+    '''read the mesh of an .inp file into NumPy arrays
+    returns {'Nodes': (node_ids, node_coords),
+             'Elements': {'Tetra10Elem': (element_ids, element_nodes), ...},
+             'NodeSets': {name: node_ids}, 'ElementSets': {name: element_ids}}
+    like importCcxFrdResults.readResultArrays() the element nodes are in FreeCAD node order,
+    the reading ends at the first *STEP
+    '''
+    import numpy as np
+    part = read_inp_part(file_name)
+    if part['nodes']:
+        node_ids = np.concatenate([n[0] for n in part['nodes']])
+        node_coords = np.concatenate([n[1] for n in part['nodes']])
+        # a node defined twice gets the coordinates of the last definition
+        node_ids, last = np.unique(node_ids[::-1], return_index=True)
+        node_coords = node_coords[::-1][last]
+    else:
+        node_ids, node_coords = np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+        FreeCAD.Console.PrintError("No Nodes found!\n")
+    elements = {}
+    for key, blocks in part['elements'].items():
+        elements[key] = (np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks]))
+    if 'Seg3Elem' in elements:
+        FreeCAD.Console.PrintError("Error: seg3 (3-node beam element type) not supported, yet.\n")
+        del elements['Seg3Elem']
+    node_sets = dict((name, np.unique(np.concatenate(ids))) for name, ids in part['nsets'].items())
+    element_sets = dict((name, np.unique(np.concatenate(ids))) for name, ids in part['elsets'].items())
+    return {'Nodes': (node_ids, node_coords), 'Elements': elements, 'NodeSets': node_sets, 'ElementSets': element_sets}
+
+
+def new_inp_part():
+    return {'nodes': [], 'elements': {}, 'nsets': {}, 'elsets': {}, 'step': False}
+
+
+def merge_inp_part(part, other):
+    part['nodes'].extend(other['nodes'])
+    for key, blocks in other['elements'].items():
+        part['elements'].setdefault(key, []).extend(blocks)
+    for set_type in ('nsets', 'elsets'):
+        for name, ids in other[set_type].items():
+            part[set_type].setdefault(name, []).extend(ids)
+    part['step'] = other['step']
+
+
+def read_inp_part(file_name, use_cache=False):
+    '''parses the mesh data of one file, *INCLUDE files are parsed once and cached
+    as long as they do not change
+    '''
+    if use_cache:
+        key = os.path.abspath(file_name)
+        stat = os.stat(key)
+        cached = include_cache.get(key)
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+    part = new_inp_part()
+    block = None
+    data = []
+    f = pyopen(file_name, "r")
+    for line in f:
+        if line[:1] == '*':
+            if line[:2] == '**':  # comments
+                continue
+            parse_inp_block(part, block, data)
+            data = []
+            block = None
+            keyword, params = parse_inp_keyword_line(line)
+            if keyword == '*INCLUDE':
+                merge_inp_part(part, read_inp_part(get_include_path(file_name, params.get('INPUT', '')), True))
+                if part['step']:
+                    break
+            elif keyword == '*STEP':
+                part['step'] = True
+                break
+            elif keyword == '*NODE':
+                block = {'type': 'node', 'set': params.get('NSET'), 'width': 4}
+            elif keyword == '*ELEMENT':
+                elm_type = params.get('TYPE', '').upper()
+                if elm_type in inp_element_types:
+                    key, count, order = inp_element_types[elm_type]
+                    block = {'type': 'element', 'set': params.get('ELSET'), 'width': count + 1, 'key': key, 'order': order}
+                else:
+                    FreeCAD.Console.PrintError("Element type {} is not supported, its elements are not imported.\n".format(elm_type))
+            elif keyword == '*NSET' or keyword == '*ELSET':
+                set_type = keyword[1:]
+                block = {'type': set_type.lower() + 's', 'set': params.get(set_type), 'generate': 'GENERATE' in params,
+                         'width': 3 if 'GENERATE' in params else 1}
+        elif block is not None:
+            data.append(line)
+            if len(data) >= inp_chunk_lines:
+                parse_inp_block(part, block, data)
+                data = []
+    else:
+        parse_inp_block(part, block, data)
+    f.close()
+    if use_cache:
+        include_cache[key] = (stat.st_mtime, stat.st_size, part)
+    return part
+
+
+def parse_inp_keyword_line(line):
+    # '*NSET, NSET=Fixed, GENERATE' --> ('*NSET', {'NSET': 'Fixed', 'GENERATE': ''})
+    line_list = line.strip().split(',')
+    params = {}
+    for param in line_list[1:]:
+        if '=' in param:
+            name, value = param.split('=', 1)
+            params[name.strip().upper()] = value.strip().strip('"')
+        elif param.strip():
+            params[param.strip().upper()] = ''
+    return line_list[0].strip().upper(), params
+
+
+def get_include_path(file_name, include):
+    include_path = os.path.normpath(include)
+    if os.path.isfile(include_path):
+        return include_path
+    return os.path.join(os.path.split(file_name)[0], include_path)
+
+
+def parse_inp_block(part, block, data):
+    '''parses the data lines of a node, element or set block and adds the arrays to the part
+    the values of an element which continues in the next chunk are kept in the block
+    '''
+    import numpy as np
+    if block is None:
+        return
+    text = ''.join(data).replace(',', ' ')
+    if block['type'] == 'node':
+        values = np.fromstring(text, dtype=np.float64, sep=' ')
+        if values.size != 4 * (len(data) - data.count('\n')):
+            values = parse_inp_node_lines(data)
+        values = values.reshape(-1, 4)
+        node_ids = values[:, 0].astype(np.int64)
+        part['nodes'].append((node_ids, values[:, 1:]))
+        if block['set']:
+            part['nsets'].setdefault(block['set'], []).append(node_ids)
+        return
+    if block['type'] == 'element':
+        values = np.fromstring(text, dtype=np.int64, sep=' ')
+    else:
+        values = get_inp_set_ids(part, block, text.split())
+    if 'leftover' in block:
+        values = np.concatenate((block.pop('leftover'), values))
+    width = block['width']
+    count = len(values) // width * width
+    if count < len(values):
+        block['leftover'] = values[count:]
+    values = values[:count].reshape(-1, width)
+    if block['type'] == 'element':
+        ele_ids = values[:, 0]
+        part['elements'].setdefault(block['key'], []).append((ele_ids, values[:, 1:][:, block['order']]))
+        if block['set']:
+            part['elsets'].setdefault(block['set'], []).append(ele_ids)
+        return
+    if block['generate']:
+        ids = [np.arange(first, last + 1, max(1, increment)) for first, last, increment in values.tolist()]
+        ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    else:
+        ids = values.ravel()
+    part[block['type']].setdefault(block['set'], []).append(ids)
+
+
+def parse_inp_node_lines(data):
+    # nodes with less than three coordinates, one line at a time
+    import numpy as np
+    values = []
+    for line in data:
+        line_list = [v for v in line.replace(',', ' ').split()]
+        if line_list:
+            values.append([float(v) for v in line_list[:4]] + [0.0] * (4 - len(line_list)))
+    return np.array(values, dtype=np.float64).reshape(-1, 4)
+
+
+def get_inp_set_ids(part, block, tokens):
+    # the ids of set data lines, the ids of a set name are the ids of the set defined before
+    import numpy as np
+    try:
+        return np.array(tokens, dtype=np.int64)
+    except ValueError:
+        pass
+    ids = []
+    for token in tokens:
+        try:
+            ids.append(np.array([int(token)], dtype=np.int64))
+        except ValueError:
+            if block['generate']:
+                FreeCAD.Console.PrintError("Set {}: set name {} in a GENERATE set.\n".format(block['set'], token))
+            elif token in part[block['type']]:
+                # added in the width of one id, thus the leftover handling does not change
+                ids.extend(part[block['type']][token])
+            else:
+                FreeCAD.Console.PrintError("Set {}: set {} not found.\n".format(block['set'], token))
+    return np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
@@ -31,6 +31,7 @@ __url__ = "http://www.freecadweb.org"
 import FreeCAD
 from math import pow, sqrt
 import numpy as np
+import os
 
 
 def get_FemMeshObjectOrder(fem_mesh_obj):
@@ -105,6 +106,11 @@ def get_MaxDimElementFromList(elem_list):
     return elem_list[-1]
 
 
+# FEM Mesh data element keys
+volume_element_keys = ('Hexa8Elem', 'Penta6Elem', 'Tetra4Elem', 'Tetra10Elem', 'Penta15Elem', 'Hexa20Elem')
+face_element_keys = ('Tria3Elem', 'Tria6Elem', 'Quad4Elem', 'Quad8Elem')
+
+
 def make_femmesh(mesh_data):
     ''' makes an FreeCAD FEM Mesh object from FEM Mesh data
     '''
@@ -187,9 +193,63 @@ def make_femmesh(mesh_data):
     return mesh
 
 
+def make_femmesh_from_arrays(node_ids, node_coords, elements):
+    ''' makes an FreeCAD FEM Mesh object from FEM Mesh data in NumPy arrays
+    node_ids (N), node_coords (N x 3), elements {'Tetra10Elem': (element_ids, element_nodes), ...}
+    see importCcxFrdResults.readResultArrays()
+    '''
+    import Fem
+    mesh = Fem.FemMesh()
+    if len(node_ids) > 0:
+        print("Found: nodes")
+        # the nodes are added without elements too, a node only mesh is not empty
+        addNode = mesh.addNode
+        for i, n in zip(node_ids.tolist(), node_coords.tolist()):
+            addNode(n[0], n[1], n[2], i)
+        if elements:
+            print("Found: elements")
+            for key in volume_element_keys + face_element_keys:
+                if key in elements:
+                    add_element = mesh.addVolume if key in volume_element_keys else mesh.addFace
+                    ele_ids, ele_nodes = elements[key]
+                    for i, e in zip(ele_ids.tolist(), ele_nodes.tolist()):
+                        add_element(e, i)
+            if 'Seg2Elem' in elements:
+                for e in elements['Seg2Elem'][1].tolist():
+                    mesh.addEdge(e[0], e[1])
+            print("imported mesh: {} nodes, {}".format(
+                  len(node_ids), ', '.join(['{} {}'.format(len(elements[key][0]), key[:-4].upper()) for key in sorted(elements)])))
+        else:
+            FreeCAD.Console.PrintWarning("No Elements found, the mesh has {} nodes only!\n".format(len(node_ids)))
+    else:
+        FreeCAD.Console.PrintError("No Nodes found!\n")
+    return mesh
+
+
+def result_set_to_arrays(result_set):
+    ''' converts the {nodeID : value} dicts of a result set into (node_ids, values) NumPy arrays
+    result sets which already hold arrays are returned unchanged
+    '''
+    array_set = {}
+    for key in result_set:
+        field = result_set[key]
+        if not isinstance(field, dict):
+            array_set[key] = field
+        elif len(field) > 0 and key != 'stressv':  # stress vectors are the first three stress components
+            if key == 'strainv':
+                key = 'strain'
+            values = list(field.values())
+            if hasattr(values[0], 'x'):  # FreeCAD.Vector
+                values = [(v.x, v.y, v.z) for v in values]
+            array_set[key] = (np.array(list(field.keys()), dtype=np.int64), np.array(values, dtype=np.float64))
+    return array_set
+
+
 def fill_femresult_mechanical(results, result_set, span):
     ''' fills  an FreeCAD FEM mechanical result object with result data
+    the fields of the result_set are (node_ids, values) NumPy arrays or {nodeID : value} dicts
     '''
+    result_set = result_set_to_arrays(result_set)
 
     if 'number' in result_set:
         eigenmode_number = result_set['number']
@@ -199,165 +259,129 @@ def fill_femresult_mechanical(results, result_set, span):
         step_time = result_set['time']
         step_time = round(step_time, 2)
 
-    if 'disp' in result_set:
-        disp = result_set['disp']
-        no_of_values = len(disp)
-        displacement = []
-        for k, v in disp.items():
-            displacement.append(v)
-
-        x_max, y_max, z_max = map(max, zip(*displacement))
-        if eigenmode_number > 0:
-            max_disp = max(x_max, y_max, z_max)
-            # Allow for max displacement to be 0.1% of the span
-            # FIXME - add to Preferences
-            max_allowed_disp = 0.001 * span
-            scale = max_allowed_disp / max_disp
-        else:
-            scale = 1.0
-
-        results.DisplacementVectors = list(map((lambda x: x * scale), disp.values()))
-        results.NodeNumbers = disp.keys()
-        results.DisplacementLengths = calculate_disp_abs(displacement)
-
-        if 'stressv' in result_set:
-            stressv = result_set['stressv']
-            results.StressVectors = list(map((lambda x: x * scale), stressv.values()))
-
-        if 'strainv' in result_set:
-            strainv = result_set['strainv']
-            results.StrainVectors = list(map((lambda x: x * scale), strainv.values()))
-
-        if 'stress' in result_set:
-            stress = result_set['stress']
-            if len(stress) > 0:
-                mstress = []
-                prinstress1 = []
-                prinstress2 = []
-                prinstress3 = []
-                shearstress = []
-                for i in stress.values():
-                    mstress.append(calculate_von_mises(i))
-                    prin1, prin2, prin3, shear = calculate_principal_stress(i)
-                    prinstress1.append(prin1)
-                    prinstress2.append(prin2)
-                    prinstress3.append(prin3)
-                    shearstress.append(shear)
-                if eigenmode_number > 0:
-                    results.StressValues = list(map((lambda x: x * scale), mstress))
-                    results.PrincipalMax = list(map((lambda x: x * scale), prinstress1))
-                    results.PrincipalMed = list(map((lambda x: x * scale), prinstress2))
-                    results.PrincipalMin = list(map((lambda x: x * scale), prinstress3))
-                    results.MaxShear = list(map((lambda x: x * scale), shearstress))
-                    results.Eigenmode = eigenmode_number
-                else:
-                    results.StressValues = mstress
-                    results.PrincipalMax = prinstress1
-                    results.PrincipalMed = prinstress2
-                    results.PrincipalMin = prinstress3
-                    results.MaxShear = shearstress
-            if (results.NodeNumbers != 0 and results.NodeNumbers != stress.keys()):
-                print("Inconsistent FEM results: element number for Stress doesn't equal element number for Displacement {} != {}"
-                      .format(results.NodeNumbers, len(results.StressValues)))
-            results.NodeNumbers = stress.keys()
-
-        # Read Equivalent Plastic strain if they exist
-        if 'peeq' in result_set:
-            Peeq = result_set['peeq']
-            if len(Peeq) > 0:
-                if len(Peeq.values()) != len(disp.values()):
-                    Pe = []
-                    Pe_extra_nodes = Peeq.values()
-                    nodes = len(disp.values())
-                    for i in range(nodes):
-                        Pe_value = Pe_extra_nodes[i]
-                        Pe.append(Pe_value)
-                    results.Peeq = Pe
-                else:
-                    results.Peeq = Peeq.values()
+    arrays = {}  # result property --> array
+    stats = calculate_femresult_stats(result_set, span, arrays)
+    if 'stress' in result_set and eigenmode_number > 0:
+        results.Eigenmode = eigenmode_number
+    no_of_values = len(arrays['DisplacementVectors']) if 'DisplacementVectors' in arrays else None
 
     # Read temperatures if they exist
     if 'temp' in result_set:
-        Temperature = result_set['temp']
-        if len(Temperature) > 0:
-            if len(Temperature.values()) != len(disp.values()):
-                Temp = []
-                Temp_extra_nodes = Temperature.values()
-                nodes = len(disp.values())
-                for i in range(nodes):
-                    Temp_value = Temp_extra_nodes[i]
-                    Temp.append(Temp_value)
-                results.Temperature = list(map((lambda x: x), Temp))
-            else:
-                results.Temperature = list(map((lambda x: x), Temperature.values()))
-            results.Time = step_time
+        # the temperatures may have extra nodes, only the displacement nodes are used
+        arrays['Temperature'] = result_set['temp'][1][:no_of_values]
+        results.Time = step_time
 
     if 'mflow' in result_set:
-        MassFlow = result_set['mflow']
-        if len(MassFlow) > 0:
-            results.MassFlowRate = list(map((lambda x: x), MassFlow.values()))
-            results.Time = step_time
+        arrays['MassFlowRate'] = result_set['mflow'][1]
+        results.Time = step_time
 
     if 'npressure' in result_set:
-        NetworkPressure = result_set['npressure']
-        if len(NetworkPressure) > 0:
-            results.NetworkPressure = list(map((lambda x: x), NetworkPressure.values()))
-            results.Time = step_time
-
-    # result stats, set stats values to 0, they may not exist
-    x_min = y_min = z_min = x_max = y_max = z_max = x_avg = y_avg = z_avg = 0
-    a_max = a_min = a_avg = s_max = s_min = s_avg = 0
-    p1_min = p1_avg = p1_max = p2_min = p2_avg = p2_max = p3_min = p3_avg = p3_max = 0
-    ms_min = ms_avg = ms_max = peeq_min = peeq_avg = peeq_max = 0
-
-    if results.DisplacementVectors:
-        x_max, y_max, z_max = map(max, zip(*displacement))
-        x_min, y_min, z_min = map(min, zip(*displacement))
-        sum_list = map(sum, zip(*displacement))
-        x_avg, y_avg, z_avg = [i / no_of_values for i in sum_list]
-        a_max = max(results.DisplacementLengths)
-        a_min = min(results.DisplacementLengths)
-        a_avg = sum(results.DisplacementLengths) / no_of_values
-    if results.StressValues:
-        s_max = max(results.StressValues)
-        s_min = min(results.StressValues)
-        s_avg = sum(results.StressValues) / no_of_values
-    if results.PrincipalMax:
-        p1_min = min(results.PrincipalMax)
-        p1_avg = sum(results.PrincipalMax) / no_of_values
-        p1_max = max(results.PrincipalMax)
-    if results.PrincipalMed:
-        p2_min = min(results.PrincipalMed)
-        p2_avg = sum(results.PrincipalMed) / no_of_values
-        p2_max = max(results.PrincipalMed)
-    if results.PrincipalMin:
-        p3_min = min(results.PrincipalMin)
-        p3_avg = sum(results.PrincipalMin) / no_of_values
-        p3_max = max(results.PrincipalMin)
-    if results.MaxShear:
-        ms_min = min(results.MaxShear)
-        ms_avg = sum(results.MaxShear) / no_of_values
-        ms_max = max(results.MaxShear)
-    if results.Peeq:
-        peeq_max = max(results.Peeq)
-        peeq_min = min(results.Peeq)
-        peeq_avg = sum(results.Peeq) / no_of_values
-
-    results.Stats = [x_min, x_avg, x_max,
-                     y_min, y_avg, y_max,
-                     z_min, z_avg, z_max,
-                     a_min, a_avg, a_max,
-                     s_min, s_avg, s_max,
-                     p1_min, p1_avg, p1_max,
-                     p2_min, p2_avg, p2_max,
-                     p3_min, p3_avg, p3_max,
-                     ms_min, ms_avg, ms_max,
-                     peeq_min, peeq_avg, peeq_max]
+        arrays['NetworkPressure'] = result_set['npressure'][1]
+        results.Time = step_time
+
+    set_femresult_arrays(results, arrays)
+    results.Stats = stats
 
     return results
 
 
-# helper
+def is_compact_result(results):
+    ''' a compact result object keeps its fields in the ResultData file, see ObjectsFem.makeResultMechanical()
+    '''
+    return hasattr(results, 'ResultDataFields')
+
+
+def set_femresult_arrays(results, arrays):
+    ''' sets the result properties {property: array} of a mechanical result object
+    a compact result object gets the arrays into its ResultData file, its list properties stay empty
+    '''
+    if is_compact_result(results):
+        fem_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/General")
+        results.Proxy.write_result_data(results, arrays, fem_prefs.GetBool("CompactResultFloat32", False))
+        return
+    for prop, values in arrays.items():
+        if values.ndim == 2:
+            setattr(results, prop, array_to_vectors(values))
+        else:
+            setattr(results, prop, values.tolist())
+
+
+def load_compact_result(results):
+    ''' fills the list properties of a compact result object from its ResultData file
+    returns False if the ResultData file was not found
+    '''
+    if not results.ResultDataFields:
+        return True  # nothing was written into the ResultData file, the fields are in the list properties
+    if not results.ResultData or not os.path.isfile(results.ResultData):
+        FreeCAD.Console.PrintError('FEM: Result data of {} not found.\n'.format(results.Label))
+        return False
+    results.Proxy.fill_result_lists(results)
+    return True
+
+
+def calculate_femresult_stats(result_set, span, arrays=None):
+    ''' returns the Stats of a mechanical result object for a result set without making a result object,
+    [x_min, x_avg, x_max, y_*, z_*, a_*, s_*, p1_*, p2_*, p3_*, ms_*, peeq_*], stats which do not exist are 0
+    a dict arrays gets the displacement, stress and peeq result properties {property: array} the stats are made of,
+    fill_femresult_mechanical() uses them to fill the result object
+    '''
+    result_set = result_set_to_arrays(result_set)
+    if arrays is None:
+        arrays = {}
+    stats = [0] * 30
+    if 'disp' not in result_set:
+        return stats
+    disp_ids, displacement = result_set['disp']
+    no_of_values = len(displacement)
+
+    eigenmode_number = result_set.get('number', 0)
+    if eigenmode_number > 0:
+        # Allow for max displacement to be 0.1% of the span
+        # FIXME - add to Preferences
+        scale = 0.001 * span / displacement.max()
+    else:
+        scale = 1.0
+
+    disp_abs = calculate_disp_abs_array(displacement)
+    arrays['DisplacementVectors'] = displacement * scale
+    arrays['NodeNumbers'] = disp_ids
+    arrays['DisplacementLengths'] = disp_abs
+    stats[0:9] = calculate_stats_array(displacement, no_of_values)
+    stats[9:12] = calculate_stats_array(disp_abs, no_of_values)
+
+    if 'stress' in result_set:
+        stress_ids, stress = result_set['stress']
+        arrays['StressVectors'] = stress[:, :3] * scale
+
+    if 'strain' in result_set:
+        strain = result_set['strain'][1]
+        arrays['StrainVectors'] = strain[:, :3] * scale
+
+    if 'stress' in result_set:
+        # columns: von Mises, PrincipalMax, PrincipalMed, PrincipalMin, MaxShear
+        stress_results = np.column_stack((calculate_von_mises_array(stress), calculate_principal_stress_array(stress)))
+        if eigenmode_number > 0:
+            stress_results *= scale
+        arrays['StressValues'] = stress_results[:, 0]
+        arrays['PrincipalMax'] = stress_results[:, 1]
+        arrays['PrincipalMed'] = stress_results[:, 2]
+        arrays['PrincipalMin'] = stress_results[:, 3]
+        arrays['MaxShear'] = stress_results[:, 4]
+        stats[12:27] = calculate_stats_array(stress_results, no_of_values)
+        if not np.array_equal(disp_ids, stress_ids):
+            print("Inconsistent FEM results: element number for Stress doesn't equal element number for Displacement {} != {}"
+                  .format(len(disp_ids), len(stress_ids)))
+        arrays['NodeNumbers'] = stress_ids
+
+    # Read Equivalent Plastic strain if they exist
+    if 'peeq' in result_set:
+        # the Peeq may have extra nodes, only the displacement nodes are used
+        peeq = result_set['peeq'][1][:no_of_values]
+        arrays['Peeq'] = peeq
+        stats[27:30] = calculate_stats_array(peeq, no_of_values)
+    return stats
+
+
 def calculate_von_mises(i):
     # Von mises stress (http://en.wikipedia.org/wiki/Von_Mises_yield_criterion)
     s11 = i[0]
@@ -386,6 +410,45 @@ def calculate_principal_stress(i):
     return (eigvals[0], eigvals[1], eigvals[2], maxshear)
 
 
+def array_to_vectors(values):
+    return [FreeCAD.Vector(v[0], v[1], v[2]) for v in values.tolist()]
+
+
+def calculate_von_mises_array(stress):
+    # Von mises stress for an (N, 6) stress array, see calculate_von_mises()
+    s11, s22, s33, s12, s23, s31 = stress.T
+    s11s22 = (s11 - s22) ** 2
+    s22s33 = (s22 - s33) ** 2
+    s33s11 = (s33 - s11) ** 2
+    s12s23s31 = 6 * (s12 ** 2 + s23 ** 2 + s31 ** 2)
+    return np.sqrt(0.5 * (s11s22 + s22s33 + s33s11 + s12s23s31))
+
+
+def calculate_principal_stress_array(stress):
+    # principal stresses and maximum shear stress for an (N, 6) stress array, see calculate_principal_stress()
+    # returns an (N, 4) array, columns PrincipalMax, PrincipalMed, PrincipalMin, MaxShear
+    sigma = stress[:, [0, 3, 4, 3, 1, 5, 4, 5, 2]].reshape(-1, 3, 3)
+    eigvals = np.linalg.eigvalsh(sigma)[:, ::-1]  # eigvalsh returns ascending eigenvalues
+    maxshear = (eigvals[:, 0] - eigvals[:, 2]) / 2.0
+    return np.column_stack((eigvals, maxshear))
+
+
+def calculate_disp_abs_array(displacements):
+    # displacement lengths for an (N, 3) displacement array
+    return np.sqrt(displacements[:, 0] ** 2 + displacements[:, 1] ** 2 + displacements[:, 2] ** 2)
+
+
+def calculate_stats_array(values, no_of_values):
+    # [min, avg, max] for each column of values, the avg is the sum divided by no_of_values
+    # cumsum adds the values in order like the builtin sum, thus the Stats do not change with the summation order
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    if len(values) == 0:
+        return [0] * (3 * values.shape[1])
+    stats = np.column_stack((values.min(axis=0), np.cumsum(values, axis=0)[-1] / no_of_values, values.max(axis=0)))
+    return stats.ravel().tolist()
+
+
 def calculate_disp_abs(displacements):
     disp_abs = []
     for d in displacements:
@@ -69,7 +69,12 @@ def export(objectslist, filename):
     if not obj.isDerivedFrom("Fem::FemResultObject"):
         FreeCAD.Console.PrintError("object selcted is not FemResultObject.\n")
         return
+    # the list properties of a lazy or compact result object are filled before Fem.writeResult() reads them
+    import importCcxFrdResults
+    if not importCcxFrdResults.load_lazy_result(obj):
+        return
     Fem.writeResult(filename, obj)
+    importCcxFrdResults.release_compact_result(obj)
 
 
 ########## module specific methods ##########
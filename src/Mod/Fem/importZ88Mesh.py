@@ -83,233 +83,169 @@ def export(objectslist, filename):
 def import_z88_mesh(filename, analysis=None):
     '''insert a FreeCAD FEM Mesh object in the ActiveDocument
     '''
-    mesh_data = read_z88_mesh(filename)
+    mesh_arrays = read_z88_mesh_arrays(filename)
+    if not mesh_arrays:
+        return
     mesh_name = os.path.basename(os.path.splitext(filename)[0])
     import importToolsFem
-    femmesh = importToolsFem.make_femmesh(mesh_data)
+    node_ids, node_coords = mesh_arrays['Nodes']
+    femmesh = importToolsFem.make_femmesh_from_arrays(node_ids, node_coords, mesh_arrays['Elements'])
     if femmesh:
         mesh_object = FreeCAD.ActiveDocument.addObject('Fem::FemMeshObject', mesh_name)
         mesh_object.FemMesh = femmesh
 
 
+# Z88 element type --> (FreeCAD element key, node count, node order)
+# the node order are the FreeCAD element nodes in Z88 order: z88_nodes = freecad_nodes[node_order]
+z88_element_table = {
+    # volume1 Z88 <--> hexa8 FreeCAD, N1, N2, N3, N4, N5, N6, N7, N8
+    1: ('Hexa8Elem', 8, list(range(8))),
+    # stab4 or stab5 or welle5 or beam13 or beam25 Z88 <--> seg2 FreeCAD, N1, N2
+    2: ('Seg2Elem', 2, [0, 1]),
+    4: ('Seg2Elem', 2, [0, 1]),
+    5: ('Seg2Elem', 2, [0, 1]),
+    9: ('Seg2Elem', 2, [0, 1]),
+    13: ('Seg2Elem', 2, [0, 1]),
+    25: ('Seg2Elem', 2, [0, 1]),
+    # scheibe3 or scheibe14 or schale24 Z88 <--> tria6 FreeCAD, N1, N2, N3, N4, N5, N6
+    3: ('Tria6Elem', 6, list(range(6))),
+    14: ('Tria6Elem', 6, list(range(6))),
+    24: ('Tria6Elem', 6, list(range(6))),
+    # scheibe7 or platte20 or schale23 Z88 <--> quad8 FreeCAD, N1, N2, N3, N4, N5, N6, N7, N8
+    7: ('Quad8Elem', 8, list(range(8))),
+    20: ('Quad8Elem', 8, list(range(8))),
+    23: ('Quad8Elem', 8, list(range(8))),
+    # volume10 Z88 <--> hexa20 FreeCAD
+    # N2, N3, N4, N1, N6, N7, N8, N5, N10, N11, N12, N9,  N14, N15, N16, N13, N18, N19, N20, N17
+    # or turn by 90 degree and they match !
+    # N1, N2, N3, N4, N5, N6, N7, N8, N9, N10, N11, N12, N13, N14, N15, N16, N17, N18, N19, N20
+    10: ('Hexa20Elem', 20, list(range(20))),
+    # volume16 Z88 <--> tetra10 FreeCAD, N4, N2, N3, N1, N9, N6, N10, N5, N7, N8
+    16: ('Tetra10Elem', 10, [3, 1, 2, 0, 8, 5, 9, 4, 6, 7]),
+    # volume17 Z88 <--> tetra4 FreeCAD, N4, N2, N3, N1
+    17: ('Tetra4Elem', 4, [3, 1, 2, 0]),
+}
+
+# Z88 element types which can not be read
+z88_unsupported_elements = {
+    8: ('torus8', 'Rotational elements are not supported at the moment'),
+    12: ('torus12', 'Rotational elements are not supported at the moment'),
+    15: ('torus6', 'Rotational elements are not supported at the moment'),
+    19: ('platte16', 'Not supported at the moment'),
+    21: ('schale16', 'Not supported at the moment'),  # mixture made from hexa8 und hexa20 (thickness is linear)
+    22: ('schale12', 'Not supported at the moment'),  # mixture made from prism6 and prism15 (thickness is linear)
+}
+
+
 def read_z88_mesh(z88_mesh_input):
     ''' reads a z88 mesh file z88i1.txt (Z88OSV14) or z88structure.txt (Z88AuroraV3)
         and extracts the nodes and elements
     '''
+    mesh_arrays = read_z88_mesh_arrays(z88_mesh_input)
+    if not mesh_arrays:
+        return {}
+    node_ids, node_coords = mesh_arrays['Nodes']
     nodes = {}
-    elements_hexa8 = {}
-    elements_penta6 = {}
-    elements_tetra4 = {}
-    elements_tetra10 = {}
-    elements_penta15 = {}
-    elements_hexa20 = {}
-    elements_tria3 = {}
-    elements_tria6 = {}
-    elements_quad4 = {}
-    elements_quad8 = {}
-    elements_seg2 = {}
-
-    input_continues = False
-    # elem = -1
-    z88_element_type = 0
+    for node_no, (node_x, node_y, node_z) in zip(node_ids.tolist(), node_coords.tolist()):
+        nodes[node_no] = FreeCAD.Vector(node_x, node_y, node_z)
+    mesh_data = {'Nodes': nodes,
+                 'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
+                 'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
+                 'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {},
+                 }
+    for key, (element_ids, element_nodes) in mesh_arrays['Elements'].items():
+        mesh_data[key] = dict(zip(element_ids.tolist(), [tuple(e) for e in element_nodes.tolist()]))
+    if Debug:
+        for n in nodes:
+            print(n, '  ', nodes[n])
+    return mesh_data
 
+
+def read_z88_mesh_arrays(z88_mesh_input):
+    ''' reads a z88 mesh file z88i1.txt (Z88OSV14) or z88structure.txt (Z88AuroraV3)
+        returns {'Nodes': (node_ids, node_coords), 'Elements': {element key: (element ids, element nodes)}}
+        the node and element lines are converted block by block, the elements grouped by their Z88 type
+        returns {} for not supported meshes
+    '''
+    import numpy as np
     z88_mesh_file = pyopen(z88_mesh_input, "r")
     mesh_info = z88_mesh_file.readline().strip().split()
-
     nodes_dimension = int(mesh_info[0])
     nodes_count = int(mesh_info[1])
     elements_count = int(mesh_info[2])
     kflag = int(mesh_info[4])
     if kflag:  # for non rotational elements ist --> kflag = 0 --> karthesian, kflag = 1 polar koordinates
         FreeCAD.Console.PrintError("KFLAG = 1, Rotational koordinates not supported at the moment\n")
+        z88_mesh_file.close()
         return {}
-    nodes_first_line = 2  # first line is mesh_info
-    nodes_last_line = nodes_count + 1
-    elemts_first_line = nodes_last_line + 1
-    elements_last_line = elemts_first_line - 1 + elements_count * 2
+    node_lines = [z88_mesh_file.readline() for i in range(nodes_count)]
+    element_lines = [z88_mesh_file.readline() for i in range(2 * elements_count)]
+    z88_mesh_file.close()
     if Debug:
         print(nodes_count)
         print(elements_count)
-        print(nodes_last_line)
-        print(elemts_first_line)
-        print(elements_last_line)
-
-    z88_mesh_file.seek(0)  # go back to the beginning of the file
-    for no, line in enumerate(z88_mesh_file):
-        lno = no + 1
-        linecolumns = line.split()
-
-        if lno >= nodes_first_line and lno <= nodes_last_line:
-            # node line
-            node_no = int(linecolumns[0])
-            node_x = float(linecolumns[2])
-            node_y = float(linecolumns[3])
-            if nodes_dimension == 2:
-                node_z = 0.0
-            elif nodes_dimension == 3:
-                node_z = float(linecolumns[4])
-            nodes[node_no] = FreeCAD.Vector(node_x, node_y, node_z)
-
-        if lno >= elemts_first_line and lno <= elements_last_line:
-            # first element line
-            if not input_continues:
-                elem_no = int(linecolumns[0])
-                z88_element_type = int(linecolumns[1])
-                input_continues = True
-
-            # second element line
-            elif input_continues:
-                # not supported elements
-                if z88_element_type == 8:
-                    # torus8
-                    FreeCAD.Console.PrintError("Z88 Element No. 8, torus8\n")
-                    FreeCAD.Console.PrintError("Rotational elements are not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 12:
-                    # torus12
-                    FreeCAD.Console.PrintError("Z88 Element No. 12, torus12\n")
-                    FreeCAD.Console.PrintError("Rotational elements are not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 15:
-                    # torus6
-                    FreeCAD.Console.PrintError("Z88 Element No. 15, torus6\n")
-                    FreeCAD.Console.PrintError("Rotational elements are not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 19:
-                    # platte16
-                    FreeCAD.Console.PrintError("Z88 Element No. 19, platte16\n")
-                    FreeCAD.Console.PrintError("Not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 21:
-                    # schale16, mixture made from hexa8  und hexa20 (thickness is linear)
-                    FreeCAD.Console.PrintError("Z88 Element No. 21, schale16\n")
-                    FreeCAD.Console.PrintError("Not supported at the moment\n")
-                    return {}
-                elif z88_element_type == 22:
-                    # schale12, mixtrue made from prism6 and prism15 (thickness is linear)
-                    FreeCAD.Console.PrintError("Z88 Element No. 22, schale12\n")
-                    FreeCAD.Console.PrintError("Not supported at the moment\n")
-                    return {}
-
-                # supported elements
-                elif z88_element_type == 2 or z88_element_type == 4 or z88_element_type == 5 or z88_element_type == 9 or z88_element_type == 13 or z88_element_type == 25:
-                    # stab4 or stab5 or welle5 or beam13 or beam25 Z88 --> seg2 FreeCAD
-                    # N1, N2
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    elements_seg2[elem_no] = (nd1, nd2)
-                    input_continues = False
-                elif z88_element_type == 3 or z88_element_type == 14 or z88_element_type == 24:
-                    # scheibe3 or scheibe14 or schale24 Z88 --> tria6 FreeCAD
-                    # N1, N2, N3, N4, N5, N6
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    elements_tria6[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6)
-                    input_continues = False
-                elif z88_element_type == 7 or z88_element_type == 20 or z88_element_type == 23:
-                    # scheibe7 or platte20 or schale23 Z88 --> quad8 FreeCAD
-                    # N1, N2, N3, N4, N5, N6, N7, N8
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    elements_quad8[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8)
-                    input_continues = False
-                elif z88_element_type == 17:
-                    # volume17 Z88 --> tetra4 FreeCAD
-                    # N4, N2, N3, N1
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    elements_tetra4[elem_no] = (nd4, nd2, nd3, nd1)
-                    input_continues = False
-                elif z88_element_type == 16:
-                    # volume16 Z88 --> tetra10 FreeCAD
-                    # N4, N2, N3, N1, N9, N6, N10, N5, N7, N8
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    nd9 = int(linecolumns[8])
-                    nd10 = int(linecolumns[9])
-                    elements_tetra10[elem_no] = (nd4, nd2, nd3, nd1, nd9, nd6, nd10, nd5, nd7, nd8)
-                    input_continues = False
-                elif z88_element_type == 1:
-                    # volume1 Z88 --> hexa8 FreeCAD
-                    # N1, N2, N3, N4, N5, N6, N7, N8
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    elements_hexa8[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8)
-                    input_continues = False
-                elif z88_element_type == 10:
-                    # volume10 Z88 --> hexa20 FreeCAD
-                    # N2, N3, N4, N1, N6, N7, N8, N5, N10, N11, N12, N9,  N14, N15, N16, N13, N18, N19, N20, N17
-                    # or turn by 90 degree and they match !
-                    # N1, N2, N3, N4, N5, N6, N7, N8, N9, N10, N11, N12, N13, N14, N15, N16, N17, N18, N19, N20
-                    nd1 = int(linecolumns[0])
-                    nd2 = int(linecolumns[1])
-                    nd3 = int(linecolumns[2])
-                    nd4 = int(linecolumns[3])
-                    nd5 = int(linecolumns[4])
-                    nd6 = int(linecolumns[5])
-                    nd7 = int(linecolumns[6])
-                    nd8 = int(linecolumns[7])
-                    nd9 = int(linecolumns[8])
-                    nd10 = int(linecolumns[9])
-                    nd11 = int(linecolumns[10])
-                    nd12 = int(linecolumns[11])
-                    nd13 = int(linecolumns[12])
-                    nd14 = int(linecolumns[13])
-                    nd15 = int(linecolumns[14])
-                    nd16 = int(linecolumns[15])
-                    nd17 = int(linecolumns[16])
-                    nd18 = int(linecolumns[17])
-                    nd19 = int(linecolumns[18])
-                    nd20 = int(linecolumns[19])
-                    elements_hexa20[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8, nd9, nd10,
-                                                nd11, nd12, nd13, nd14, nd15, nd16, nd17, nd18, nd19, nd20)
-                    input_continues = False
-
-                # not known elements, some example have -1 for some teaching reasons to show some other stuff
-                else:
-                    FreeCAD.Console.PrintError("Not known element\n")
-                    return {}
 
-    if Debug:
-        for n in nodes:
-            print(n, '  ', nodes[n])
-        for e in elements_tria6:
-            print(e, '  ', elements_tria6[e])
+    # node line: node number, dof, x, y (, z)
+    node_columns = 4 if nodes_dimension == 2 else 5
+    node_data = lines_to_array(node_lines, node_columns, float)
+    node_ids = node_data[:, 0].astype(np.int64)
+    node_coords = np.zeros((nodes_count, 3))
+    node_coords[:, :nodes_dimension] = node_data[:, 2:2 + nodes_dimension]
+
+    # first element line: element number, element type, second element line: element nodes
+    element_info = lines_to_array(element_lines[0::2], 2, int)
+    node_lines = element_lines[1::2]
+    elements = {}
+    for z88_element_type in np.unique(element_info[:, 1]).tolist():
+        if z88_element_type in z88_unsupported_elements:
+            name, message = z88_unsupported_elements[z88_element_type]
+            FreeCAD.Console.PrintError("Z88 Element No. {}, {}\n".format(z88_element_type, name))
+            FreeCAD.Console.PrintError(message + "\n")
+            return {}
+        if z88_element_type not in z88_element_table:
+            # not known elements, some example have -1 for some teaching reasons to show some other stuff
+            FreeCAD.Console.PrintError("Not known element\n")
+            return {}
+        key, node_count, node_order = z88_element_table[z88_element_type]
+        selected = np.flatnonzero(element_info[:, 1] == z88_element_type)
+        element_nodes = lines_to_array([node_lines[i] for i in selected.tolist()], node_count, int)
+        element_nodes[:, node_order] = element_nodes.copy()  # Z88 --> FreeCAD node order
+        if key in elements:  # several Z88 types of one FreeCAD type
+            element_ids, other_nodes = elements[key]
+            element_nodes = np.concatenate((other_nodes, element_nodes))
+            selected = np.concatenate((element_ids, element_info[selected, 0]))
+        else:
+            selected = element_info[selected, 0]
+        elements[key] = (selected, element_nodes)
+    return {'Nodes': (node_ids, node_coords), 'Elements': elements}
 
-    z88_mesh_file.close()
-    return {'Nodes': nodes,
-            'Hexa8Elem': elements_hexa8, 'Penta6Elem': elements_penta6, 'Tetra4Elem': elements_tetra4, 'Tetra10Elem': elements_tetra10,
-            'Penta15Elem': elements_penta15, 'Hexa20Elem': elements_hexa20, 'Tria3Elem': elements_tria3, 'Tria6Elem': elements_tria6,
-            'Quad4Elem': elements_quad4, 'Quad8Elem': elements_quad8, 'Seg2Elem': elements_seg2,
-            }
+
+def lines_to_array(lines, columns, dtype):
+    # the first columns of the lines as (len(lines) x columns) array, lines with more columns are cut
+    import numpy as np
+    values = np.fromstring(' '.join(lines), dtype=np.float64, sep=' ')
+    if values.size == len(lines) * columns:
+        values = values.reshape(-1, columns)
+    else:
+        values = np.array([l.split()[:columns] for l in lines], dtype=np.float64).reshape(-1, columns)
+    return values if dtype is float else values.astype(np.int64)
 
 
 # write z88 Mesh
 def write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f):
+    import numpy as np
+    node_ids = np.array(list(femnodes_mesh.keys()), dtype=np.int64)
+    node_coords = np.array([(v.x, v.y, v.z) for v in femnodes_mesh.values()], dtype=np.float64).reshape(-1, 3)
+    element_ids = np.array(list(femelement_table.keys()), dtype=np.int64)
+    element_nodes = np.array(list(femelement_table.values()), dtype=np.int64)
+    write_z88_mesh_arrays(f, node_ids, node_coords, element_ids, element_nodes, z88_element_type)
+
+
+def write_z88_mesh_arrays(f, node_ids, node_coords, element_ids, element_nodes, z88_element_type):
+    ''' writes the nodes and elements of one element type into a z88i1.txt file object
+        element_nodes (element count x node count) are in FreeCAD node order
+    '''
+    import numpy as np
     node_dimension = 3  # 2 for 2D not supported
     if (z88_element_type == 4 or
        z88_element_type == 17 or z88_element_type == 16 or
@@ -320,8 +256,14 @@ def write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f)
     else:
         print("Error: wrong z88_element_type")
         return
-    node_count = len(femnodes_mesh)
-    element_count = len(femelement_table)
+    # mixed elements are not supported up to date
+    key, node_count, node_order = z88_element_table[z88_element_type]
+    if element_nodes.ndim != 2 or element_nodes.shape[1] != node_count:
+        FreeCAD.Console.PrintError("Writing of Z88 elementtype {0} not supported.\n".format(z88_element_type))
+        # TODO support schale12 (made from prism15) and schale16 (made from hexa20)
+        return
+    node_count = len(node_ids)
+    element_count = len(element_ids)
     dofs = node_dof * node_count
     unknown_flag = 0
     written_by = "written by FreeCAD"
@@ -329,61 +271,17 @@ def write_z88_mesh_to_file(femnodes_mesh, femelement_table, z88_element_type, f)
     # first line, some z88 specific stuff
     f.write("{0} {1} {2} {3} {4} {5}\n".format(node_dimension, node_count, element_count, dofs, unknown_flag, written_by))
     # nodes
-    for node in femnodes_mesh:
-        vec = femnodes_mesh[node]
-        f.write("{0} {1} {2:.6f} {3:.6f} {4:.6f}\n".format(node, node_dof, vec.x, vec.y, vec.z, node))
-    # elements
-    for element in femelement_table:
-        # z88_element_type is checked for every element, but mixed elements are not supported up to date
-        n = femelement_table[element]
-        if z88_element_type == 2 or z88_element_type == 4 or z88_element_type == 5 or z88_element_type == 9 or z88_element_type == 13 or z88_element_type == 25:
-            # seg2 FreeCAD --> stab4 Z88
-            # N1, N2
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1}\n".format(
-                    n[0], n[1]))
-        elif z88_element_type == 3 or z88_element_type == 14 or z88_element_type == 24:
-            # tria6 FreeCAD --> schale24 Z88
-            # N1, N2, N3, N4, N5, N6
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5]))
-        elif z88_element_type == 7 or z88_element_type == 20 or z88_element_type == 23:
-            # quad8 FreeCAD --> schale23 Z88
-            # N1, N2, N3, N4, N5, N6, N7, N8
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5], n[6], n[7]))
-        elif z88_element_type == 17:
-            # tetra4 FreeCAD --> volume17 Z88#
-            # N4, N2, N3, N1
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3}\n".format(
-                    n[3], n[1], n[2], n[0]))
-        elif z88_element_type == 16:
-            # tetra10 FreeCAD --> volume16 Z88
-            # N4, N2, N3, N1, N9, N6, N10, N5, N7, N8
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7} {8} {9}\n".format(
-                    n[3], n[1], n[2], n[0], n[8], n[5], n[9], n[4], n[6], n[7]))
-        elif z88_element_type == 1:
-            # hexa8 FreeCAD --> volume1 Z88
-            # N1, N2, N3, N4, N5, N6, N7, N8
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5], n[6], n[7]))
-        elif z88_element_type == 10:
-            # hexa20 FreeCAD --> volume10 Z88
-            # N2, N3, N4, N1, N6, N7, N8, N5, N10, N11, N12, N9,  N14, N15, N16, N13, N18, N19, N20, N17
-            # or turn by 90 degree and they match !
-            # N1, N2, N3, N4, N5, N6, N7, N8, N9, N10, N11, N12, N13, N14, N15, N16, N17, N18, N19, N20
-            f.write("{0} {1}\n".format(element, z88_element_type, element))
-            f.write("{0} {1} {2} {3} {4} {5} {6} {7} {8} {9} {10} {11} {12} {13} {14} {15} {16} {17} {18} {19}\n".format(
-                    n[0], n[1], n[2], n[3], n[4], n[5], n[6], n[7], n[8], n[9], n[10], n[11], n[12], n[13], n[14], n[15], n[16], n[17], n[18], n[19]))
-        else:
-            FreeCAD.Console.PrintError("Writing of Z88 elementtype {0} not supported.\n".format(z88_element_type))
-            # TODO support schale12 (made from prism15) and schale16 (made from hexa20)
-            return
+    write_array_lines(f, '%d %d %.6f %.6f %.6f\n', np.column_stack((node_ids, np.full(node_count, node_dof), node_coords)))
+    # elements, two lines: element number and type, element nodes in Z88 order
+    element_format = '%d {}\n'.format(z88_element_type) + ' '.join(['%d'] * len(node_order)) + '\n'
+    write_array_lines(f, element_format, np.column_stack((element_ids, element_nodes[:, node_order])))
+
+
+def write_array_lines(f, line_format, values, chunk_size=50000):
+    # writes one line_format line for each row, the lines of chunk_size rows are formatted at once
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        f.write((line_format * len(chunk)) % tuple(chunk.ravel().tolist()))
 
 
 # Helper
@@ -68,7 +68,7 @@ def import_z88_disp(filename, analysis=None, result_name_prefix=None):
     import ObjectsFem
     if result_name_prefix is None:
         result_name_prefix = ''
-    m = read_z88_disp(filename)
+    m = read_z88_disp_arrays(filename)
     if(len(m['Nodes']) > 0):
         if analysis is None:
             analysis_name = os.path.splitext(os.path.basename(filename))[0]
@@ -107,36 +107,37 @@ def read_z88_disp(z88_disp_input):
 
     The FreeCAD file needs to have an Analysis and an appropriate FEM Mesh
     '''
+    m = read_z88_disp_arrays(z88_disp_input)
+    node_ids, disp = m['Results'][0]['disp']
     nodes = {}
     mode_disp = {}
-    mode_results = {}
-    results = []
-
-    z88_disp_file = pyopen(z88_disp_input, "r")
-
-    for no, line in enumerate(z88_disp_file):
-        lno = no + 1
-        linelist = line.split()
-
-        if lno >= 6:
-            # disp line
-            # print(linelist)
-            node_no = int(linelist[0])
-            mode_disp_x = float(linelist[1])
-            mode_disp_y = float(linelist[2])
-            if len(linelist) > 3:
-                mode_disp_z = float(linelist[3])
-            else:
-                mode_disp_z = 0.0
-            mode_disp[node_no] = FreeCAD.Vector(mode_disp_x, mode_disp_y, mode_disp_z)
-            nodes[node_no] = node_no
-
-    mode_results['disp'] = mode_disp
-    results.append(mode_results)
+    for node_no, (mode_disp_x, mode_disp_y, mode_disp_z) in zip(node_ids.tolist(), disp.tolist()):
+        mode_disp[node_no] = FreeCAD.Vector(mode_disp_x, mode_disp_y, mode_disp_z)
+        nodes[node_no] = node_no
+    results = [{'disp': mode_disp}]
 
     if Debug:
         for r in results[0]['disp']:
             print(r, ' --> ', results[0]['disp'][r])
 
-    z88_disp_file.close()
     return {'Nodes': nodes, 'Results': results}
+
+
+def read_z88_disp_arrays(z88_disp_input):
+    '''
+    read a z88 disp file z88o2.txt into NumPy arrays
+    returns {'Nodes': node_ids, 'Results': [{'disp': (node_ids, displacements)}]}
+    the displacement lines (from line 6) are converted in one block,
+    the first three displacements of each node are used, 2D displacements get a z of 0.0
+    '''
+    import numpy as np
+    import importZ88Mesh
+    z88_disp_file = pyopen(z88_disp_input, "r")
+    lines = [line for line in z88_disp_file.readlines()[5:] if line.strip()]
+    z88_disp_file.close()
+    columns = min(len(lines[0].split()), 4) if lines else 4
+    values = importZ88Mesh.lines_to_array(lines, columns, float)
+    node_ids = values[:, 0].astype(np.int64)
+    disp = np.zeros((len(node_ids), 3))
+    disp[:, :columns - 1] = values[:, 1:columns]
+    return {'Nodes': node_ids, 'Results': [{'disp': (node_ids, disp)}]}
@@ -28,14 +28,91 @@ __url__ = "http://www.freecadweb.org"
 ## @package importFenicsXDMF
 #  \ingroup FEM
 #  \brief FreeCAD Fenics Mesh XDMF reader for FEM workbench
+#
+#  Reads the Geometry and the Topology of the first Grid of the xdmf file. The heavy data
+#  is read as XML text, as raw Binary file or from a HDF5 file (needs h5py), see writeFenicsXDMF.
+
+from lxml import etree
+import numpy as np
+import os
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+Fenics_XDMF_to_FreeCAD_dict = {
+    "polyline": "Seg2Elem",
+    "triangle": "Tria3Elem",
+    "tri_6": "Tria6Elem",
+    "tetrahedron": "Tetra4Elem",
+    "tet_10": "Tetra10Elem"
+}
+
+
+def read_dataitem(dataitem, xdmf_dir):
+    """
+        Reads the array of a DataItem with Format XML, Binary or HDF
+    """
+    dimensions = [int(d) for d in dataitem.get("Dimensions").split()]
+    number_type = dataitem.get("NumberType", "Float")
+    precision = dataitem.get("Precision", "4" if number_type == "Float" else "8")
+    if number_type == "Float":
+        dtype = "f" + precision
+    elif number_type == "UInt":
+        dtype = "u" + precision
+    else:
+        dtype = "i" + precision
+    data_format = dataitem.get("Format", "XML")
+    text = dataitem.text.strip() if dataitem.text else ""
+    if data_format == "XML":
+        npa = np.array(text.split(), dtype=np.float64 if number_type == "Float" else np.int64)
+    elif data_format == "Binary":
+        endian = "<" if dataitem.get("Endian", "Native") == "Little" else ">" if dataitem.get("Endian") == "Big" else "="
+        npa = np.fromfile(os.path.join(xdmf_dir, text), dtype=endian + dtype)
+    elif data_format == "HDF":
+        if h5py is None:
+            raise Exception("XDMF with HDF5 heavy data needs h5py")
+        (h5filename, dataset) = text.split(":", 1)
+        with h5py.File(os.path.join(xdmf_dir, h5filename), "r") as h5file:
+            npa = h5file[dataset][...]
+    else:
+        raise Exception("XDMF DataItem Format not supported: " + data_format)
+    return npa.reshape(dimensions)
 
 
 def read_fenics_mesh_xdmf(xdmffilename):
+    """
+        returns the node ids (1..n), node coordinates and
+        {element key: (element ids, element nodes)} of the first grid
+    """
+
+    xdmf_dir = os.path.dirname(os.path.abspath(xdmffilename))
+    root = etree.parse(xdmffilename).getroot()
+    grid = root.find(".//Grid")
+    if grid is None:
+        print("No Grid found in " + xdmffilename)
+        return {'Nodes': (np.zeros(0, dtype=np.int64), np.zeros((0, 3))), 'Elements': {}}
+
+    geometry = grid.find("Geometry")
+    node_coords = read_dataitem(geometry.find("DataItem"), xdmf_dir).astype(np.float64)
+    if geometry.get("GeometryType", "XYZ") == "XY":
+        node_coords = np.hstack((node_coords, np.zeros((len(node_coords), 1))))
+    # fenics node indices start from 0, FreeCAD node ids from 1
+    node_ids = np.arange(1, len(node_coords) + 1, dtype=np.int64)
 
-    print("Not operational, yet")
+    elements = {}
+    topology = grid.find("Topology")
+    topology_type = topology.get("TopologyType")
+    element_key = Fenics_XDMF_to_FreeCAD_dict.get(topology_type.lower())
+    if element_key is None:
+        print("Topology type not supported by the XDMF reader: " + topology_type)
+    else:
+        nodes_per_element = int(topology.get("NodesPerElement"))
+        element_nodes = read_dataitem(topology.find("DataItem"), xdmf_dir).astype(np.int64)
+        element_nodes = element_nodes.reshape(-1, nodes_per_element) + 1
+        element_ids = np.arange(1, len(element_nodes) + 1, dtype=np.int64)
+        elements[element_key] = (element_ids, element_nodes)
+        print("Read {} nodes and {} {}".format(len(node_ids), len(element_ids), topology_type))
 
-    return {'Nodes': {},
-            'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
-            'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
-            'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {}
-            }
+    return {'Nodes': (node_ids, node_coords), 'Elements': elements}
@@ -33,6 +33,40 @@ __url__ = "http://www.freecadweb.org"
 import FreeCAD
 from lxml import etree  # parsing xml files and exporting
 import itertools
+import numpy as np
+
+
+Fenics_to_FreeCAD_dict = {
+    "triangle": "Tria3Elem",
+    "tetrahedron": "Tetra4Elem",
+    "hexahedron": "Hexa8Elem",
+    "interval": "Seg2Elem",
+    "quadrilateral": "Quad4Elem",
+}
+
+num_vert_dict = {'point': 1,
+                 'interval': 2,
+                 'triangle': 3,
+                 'tetrahedron': 4,
+                 'hexahedron': 8,
+                 'quadrilateral': 4}
+
+lower_dims_dict = {'point': [],
+                   'interval': [],
+                   'triangle': ['interval'],
+                   'tetrahedron': ['triangle', 'interval'],
+                   'hexahedron': ['quadrilateral', 'interval'],
+                   'quadrilateral': ['interval']}
+
+# local vertices of the faces and edges of the non simplex cells in dolfin vertex order
+# (the vertices are ordered lexicographically by their reference coordinates)
+non_simplex_entities_dict = {
+    ('quadrilateral', 'interval'): [(0, 1), (0, 2), (1, 3), (2, 3)],
+    ('hexahedron', 'quadrilateral'): [(0, 1, 3, 2), (4, 5, 7, 6), (0, 1, 5, 4),
+                                      (2, 3, 7, 6), (0, 2, 6, 4), (1, 3, 7, 5)],
+    ('hexahedron', 'interval'): [(0, 1), (2, 3), (4, 5), (6, 7), (0, 2), (1, 3),
+                                 (4, 6), (5, 7), (0, 4), (1, 5), (2, 6), (3, 7)]
+}
 
 
 def read_fenics_mesh_xml(xmlfilename):
@@ -40,193 +74,175 @@ def read_fenics_mesh_xml(xmlfilename):
         Returns element dictionary to be evaluated by make_femmesh later
     '''
 
-    Fenics_to_FreeCAD_dict = {
-        "triangle": "tria3",
-        "tetrahedron": "tetra4",
-        "hexahedron": "hexa8",
-        "interval": "seg2",
-        "quadrilateral": "quad4",
-    }
-
-    def read_mesh_block(mesh_block):
-        '''
-            Reading mesh block from XML file.
-            The mesh block only contains cells and vertices.
-        '''
-        dim = int(mesh_block.get("dim"))
-        cell_type = mesh_block.get("celltype")
-
-        vertex_size = 0
-
-        print("Mesh dimension: %d" % (dim,))
-        print("Mesh cell type: %s" % (cell_type,))
-
-        cells_parts_dim = {'point': {0: 1},
-                           'interval': {0: 2, 1: 1},
-                           'triangle': {0: 3, 1: 3, 2: 1},
-                           'tetrahedron': {0: 4, 1: 6, 2: 4, 3: 1},
-                           'quadrilateral': {0: 4, 1: 4, 2: 1},
-                           'hexahedron': {0: 8, 1: 12, 2: 6, 3: 1}}
-
-        find_vertices = mesh_block.find("vertices")
-        find_cells = mesh_block.find("cells")
-
-        nodes_dict = {}
-        cell_dict = {}
-
-        if find_vertices is None:
-            print("No vertices found!")
-        else:
-            vertex_size = int(find_vertices.attrib.get("size"))
-            print("Reading %d vertices" % (vertex_size,))
-
-            for vertex in find_vertices:
-                ind = int(vertex.get("index"))
-
-                if vertex.tag.lower() == 'vertex':
-                    [node_x, node_y, node_z] = [float(vertex.get(coord, 0.)) for coord in ["x", "y", "z"]]
+    mesh_arrays = read_fenics_mesh_xml_arrays(xmlfilename)
+    (node_ids, node_coords) = mesh_arrays['Nodes']
+    nodes = {}
+    for (ind, (node_x, node_y, node_z)) in zip(node_ids.tolist(), node_coords.tolist()):
+        nodes[ind] = FreeCAD.Vector(node_x, node_y, node_z)
 
-                    nodes_dict[ind + 1] = FreeCAD.Vector(node_x, node_y, node_z)
-                    # increase node index by one, since fenics starts at 0, FreeCAD at 1
-                    # print("%d %f %f %f" % (ind, node_x, node_y, node_z))
-                else:
-                    print("found strange vertex tag: %s" % (vertex.tag,))
+    mesh_data = {'Nodes': nodes,
+                 'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': {}, 'Tetra10Elem': {},
+                 'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': {}, 'Tria6Elem': {},
+                 'Quad4Elem': {}, 'Quad8Elem': {}, 'Seg2Elem': {}
+                 }
+    for (key, (element_ids, element_nodes)) in mesh_arrays['Elements'].items():
+        mesh_data[key] = dict(zip(element_ids.tolist(), [tuple(e) for e in element_nodes.tolist()]))
+    return mesh_data
 
-        if find_cells is None:
-            print("No cells found!")
-        else:
-            print("Reading %d cells" % (int(find_cells.attrib.get("size")),))
-            for cell in find_cells:
-                ind = int(cell.get("index"))
 
-                if cell.tag.lower() != cell_type.lower():
-                    print("Strange mismatch between cell type %s and cell tag %s" % (cell_type, cell.tag.lower()))
-                num_vertices = cells_parts_dim[cell_type][0]
+def read_fenics_mesh_xml_arrays(xmlfilename):
+    '''
+        Returns the node ids, node coordinates and {element key: (element ids, element nodes)}
+        to be evaluated by make_femmesh_from_arrays later
+    '''
 
-                vtupel = tuple([int(cell.get("v" + str(vnum))) + 1 for vnum in range(num_vertices)])
-                # generate "v0", "v1", ... from dimension lookup table
-                # increase numbers by one to match FC numbering convention
-
-                cell_dict[ind + 1] = vtupel
-
-                # valtupel = tuple([ind] + list(vtupel))
-                # print(("%d " + ("%d "*len(vtupel))) % valtupel)
-
-        return (nodes_dict, cell_dict, cell_type, dim)
-
-    def generate_lower_dimensional_structures(nodes, cell_dict, cell_type, dim):
-
-        def correct_volume_det(element_dict):
-            '''
-                Checks whether the cell elements
-                all have the same volume (<0?)
-                sign (is necessary to avoid negative
-                Jacobian errors).
-                Works only with tet4 and tri3 elements at the moment
-            '''
-            if dim == 3:
-                for (ind, tet) in element_dict['tetra4'].iteritems():
-                    v0 = nodes[tet[0]]
-                    v1 = nodes[tet[1]]
-                    v2 = nodes[tet[2]]
-                    v3 = nodes[tet[3]]
-                    a = v1 - v0
-                    b = v2 - v0
-                    c = v3 - v0
-                    if a.dot(b.cross(c)) > 0:
-                        element_dict['tetra4'][ind] = (tet[1], tet[0], tet[2], tet[3])
-            if dim == 2:
-                nz = FreeCAD.Vector(0., 0., 1.)
-                for (ind, tria) in element_dict['tria3'].iteritems():
-                    v0 = nodes[tria[0]]
-                    v1 = nodes[tria[1]]
-                    v2 = nodes[tria[2]]
-                    a = v1 - v0
-                    b = v2 - v0
-                    if nz.dot(a.cross(b)) < 0:
-                        element_dict['tria3'][ind] = (tria[1], tria[0], tria[2])
-
-        element_dict = {}
-        element_counter = {}
-
-        # TODO: remove upper level lookup
-        for (key, val) in Fenics_to_FreeCAD_dict.iteritems():
-            element_dict[val] = {}
-            element_counter[key] = 0  # count every distinct element and sub element type
-
-        def addtupletodict(di, tpl, counter):
-            sortedtpl = tuple(sorted(tpl))
-            if di.get(sortedtpl) is None:
-                di[sortedtpl] = counter
-                counter += 1
-            return counter
-
-        def invertdict(dic):
-            invdic = {}
-            for (key, it) in dic.iteritems():
-                invdic[it] = key
-            return invdic
-
-        num_vert_dict = {'interval': 2,
-                         'triangle': 3,
-                         'tetrahedron': 4,
-                         'hexahedron': 8,
-                         'quadrilateral': 4}
-        lower_dims_dict = {'interval': [],
-                           'triangle': ['interval'],
-                           'tetrahedron': ['triangle', 'interval'],
-                           'hexahedron': ['quadrilateral', 'interval'],
-                           'quadrilateral': ['interval']}
-
-        for (cell_index, cell) in cell_dict.iteritems():
-            cell_lower_dims = lower_dims_dict[cell_type]
-            element_counter[cell_type] += 1
-            element_dict[Fenics_to_FreeCAD_dict[cell_type]][cell] = element_counter[cell_type]
-            for ld in cell_lower_dims:
-                for vertextuple in itertools.combinations(cell, num_vert_dict[ld]):
-                    element_counter[ld] = addtupletodict(
-                        element_dict[Fenics_to_FreeCAD_dict[ld]],
-                        vertextuple,
-                        element_counter[ld])
-
-        length_counter = len(nodes)
-        for (key, val_dict) in element_dict.iteritems():
-            # to ensure distinct indices for FreeCAD
-            for (vkey, it) in val_dict.iteritems():
-                val_dict[vkey] = it + length_counter
-            length_counter += len(val_dict)
-            # inverse of the dict (dict[key] = val -> dict[val] = key)
-            element_dict[key] = invertdict(val_dict)
-
-        correct_volume_det(element_dict)
-
-        return element_dict
+    node_ids = np.zeros(0, dtype=np.int64)
+    node_coords = np.zeros((0, 3))
+    elements = {}
 
-    nodes = {}
-    element_dict = {}
-    # TODO: remove two times initialization
-    for val in Fenics_to_FreeCAD_dict.itervalues():
-        element_dict[val] = {}
-
-    tree = etree.parse(xmlfilename)
-    root = tree.getroot()
-
-    if root.tag.lower() != "dolfin":
-        print("Strange root tag, should be dolfin!")
-
-    find_mesh = root.find("mesh")
-    if find_mesh is not None:  # these are consistency checks of the XML structure
-        print("Mesh found")
-        (nodes, cells_dict, cell_type, dim) = read_mesh_block(find_mesh)
-        element_dict = generate_lower_dimensional_structures(nodes, cells_dict, cell_type, dim)
-    else:
+    mesh_block = read_mesh_block(xmlfilename)
+    if mesh_block is None:
         print("No mesh found")
+    else:
+        (node_ids, node_coords, cells, cell_type, dim) = mesh_block
+        if cell_type not in Fenics_to_FreeCAD_dict:
+            print("Cell type %s not supported" % (cell_type,))
+        elif len(cells):
+            elements = generate_lower_dimensional_structures(node_coords, cells, cell_type, dim, len(node_ids))
 
-    if root.find("data") is not None:
-        print("Internal mesh data found")
+    return {'Nodes': (node_ids, node_coords), 'Elements': elements}
 
-    return {'Nodes': nodes,
-            'Hexa8Elem': {}, 'Penta6Elem': {}, 'Tetra4Elem': element_dict['tetra4'], 'Tetra10Elem': {},
-            'Penta15Elem': {}, 'Hexa20Elem': {}, 'Tria3Elem': element_dict['tria3'], 'Tria6Elem': {},
-            'Quad4Elem': element_dict['quad4'], 'Quad8Elem': {}, 'Seg2Elem': element_dict['seg2']
-            }
+
+def read_mesh_block(xmlfilename):
+    '''
+        Reading mesh block from XML file.
+        The mesh block only contains cells and vertices.
+        The file is streamed, the parsed vertices and cells are removed from the tree.
+        Returns node ids, node coordinates (N x 3) and cells (fenics vertex indices + 1)
+        ordered by their index, None if there is no mesh block.
+    '''
+    dim = 0
+    cell_type = None
+    block = None
+    vertex_keys = []
+    vertex_values = []  # attribute strings, converted by numpy at the end
+    cell_values = []
+
+    tags = ("mesh", "vertices", "cells", "data", "vertex") + tuple(num_vert_dict)
+    for (event, element) in etree.iterparse(xmlfilename, events=("start", "end"), tag=tags):
+        tag = element.tag
+        if event == "start":
+            if tag == "mesh" and cell_type is None:
+                if element.getparent() is None or element.getparent().tag.lower() != "dolfin":
+                    print("Strange root tag, should be dolfin!")
+                dim = int(element.get("dim"))
+                cell_type = element.get("celltype")
+                vertex_keys = ["index"] + ["v" + str(vnum) for vnum in range(num_vert_dict[cell_type])]
+                # generate "v0", "v1", ... from dimension lookup table
+                print("Mesh found")
+                print("Mesh dimension: %d" % (dim,))
+                print("Mesh cell type: %s" % (cell_type,))
+            elif tag == "vertices" or tag == "cells":
+                block = tag
+                print("Reading %d %s" % (int(element.get("size")), tag))
+            elif tag == "data":
+                print("Internal mesh data found")
+            continue
+
+        if tag == "vertices" or tag == "cells":
+            block = None
+            continue
+        elif block == "vertices" and tag == "vertex":
+            get = element.get
+            vertex_values.extend((get("index"), get("x", "0"), get("y", "0"), get("z", "0")))
+        elif block == "cells" and tag in num_vert_dict:
+            if tag != cell_type:
+                print("Strange mismatch between cell type %s and cell tag %s" % (cell_type, tag))
+            cell_values.extend([element.get(key) for key in vertex_keys])
+        else:
+            continue
+        # free the parsed element and its already parsed siblings
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    if cell_type is None:
+        return None
+    if not vertex_values:
+        print("No vertices found!")
+    if not cell_values:
+        print("No cells found!")
+
+    # increase indices by one, since fenics starts at 0, FreeCAD at 1
+    vertices = np.fromstring(" ".join(vertex_values), dtype=np.float64, sep=" ").reshape(-1, 4)
+    vertices = vertices[np.argsort(vertices[:, 0], kind="mergesort")]
+    node_ids = vertices[:, 0].astype(np.int64) + 1
+    cells = np.fromstring(" ".join(cell_values), dtype=np.int64, sep=" ").reshape(-1, len(vertex_keys))
+    cells = cells[np.argsort(cells[:, 0], kind="mergesort"), 1:] + 1
+    return (node_ids, vertices[:, 1:], cells, cell_type, dim)
+
+
+def get_cell_entities(cells, cell_type, entity_type):
+    '''
+        Distinct sub entities (faces or edges) of all cells, ordered by their first appearance.
+        The vertices of simplex entities are sorted.
+    '''
+    local_entities = non_simplex_entities_dict.get((cell_type, entity_type))
+    simplex = local_entities is None
+    if simplex:
+        local_entities = list(itertools.combinations(range(cells.shape[1]), num_vert_dict[entity_type]))
+    entities = cells[:, local_entities].reshape(-1, num_vert_dict[entity_type])
+    sorted_entities = np.sort(entities, axis=1)
+    # the sort is stable, the first of equal entities is their first appearance
+    order = np.lexsort(sorted_entities.T[::-1])
+    ordered = sorted_entities[order]
+    distinct = np.ones(len(ordered), dtype=bool)
+    distinct[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    first = np.sort(order[distinct])
+    if simplex:
+        return sorted_entities[first]
+    return entities[first]
+
+
+def correct_volume_det(node_coords, cells, cell_type, dim):
+    '''
+        Checks whether the cell elements
+        all have the same volume (<0?)
+        sign (is necessary to avoid negative
+        Jacobian errors).
+        Works only with tet4 and tri3 elements at the moment
+    '''
+    # node ids are the fenics vertex indices + 1
+    v = node_coords[cells - 1]
+    swap = np.zeros(len(cells), dtype=bool)
+    if dim == 3 and cell_type == "tetrahedron":
+        a = v[:, 1] - v[:, 0]
+        b = v[:, 2] - v[:, 0]
+        c = v[:, 3] - v[:, 0]
+        swap = np.einsum('ij,ij->i', a, np.cross(b, c)) > 0
+    elif dim == 2 and cell_type == "triangle":
+        a = v[:, 1] - v[:, 0]
+        b = v[:, 2] - v[:, 0]
+        swap = np.cross(a, b)[:, 2] < 0
+    cells[swap, :2] = cells[swap][:, [1, 0]]
+    return cells
+
+
+def generate_lower_dimensional_structures(node_coords, cells, cell_type, dim, element_id_offset=0):
+    '''
+        Returns the cells and their distinct faces and edges as
+        {element key: (element ids, element nodes)}
+        The element ids follow each other starting after element_id_offset.
+    '''
+    element_arrays = [(Fenics_to_FreeCAD_dict[cell_type], correct_volume_det(node_coords, cells.copy(), cell_type, dim))]
+    for ld in lower_dims_dict[cell_type]:
+        element_arrays.append((Fenics_to_FreeCAD_dict[ld], get_cell_entities(cells, cell_type, ld)))
+
+    elements = {}
+    # to ensure distinct indices for FreeCAD
+    length_counter = element_id_offset
+    for (key, element_nodes) in element_arrays:
+        element_ids = np.arange(length_counter + 1, length_counter + len(element_nodes) + 1, dtype=np.int64)
+        length_counter += len(element_nodes)
+        elements[key] = (element_ids, element_nodes)
+    return elements
@@ -32,9 +32,19 @@ __url__ = "http://www.freecadweb.org"
 from importToolsFem import get_FemMeshObjectDimension, get_FemMeshObjectElementTypes, get_MaxDimElementFromList, get_FemMeshObjectOrder
 from lxml import etree  # parsing xml files and exporting
 import numpy as np
+import os
+try:
+    from StringIO import StringIO  # Python 2
+except ImportError:
+    from io import StringIO
+try:
+    import h5py
+except ImportError:
+    h5py = None
 
 ENCODING_ASCII = 'ASCII'
 ENCODING_HDF5 = 'HDF5'
+ENCODING_BINARY = 'Binary'  # raw little endian heavy data files beside the xdmf file
 
 # TODO: export mesh functions (to be defined, cell functions, vertex functions, facet functions)
 # TODO: integrate cell function
@@ -44,13 +54,22 @@ ENCODING_HDF5 = 'HDF5'
 # also the hd5 support better works together with numpy
 
 
+def get_default_encoding():
+    # binary heavy data, HDF5 if h5py is available
+    if h5py is not None:
+        return ENCODING_HDF5
+    return ENCODING_BINARY
+
+
 def numpy_array_to_str(npa):
     res = ""
     dt = str(npa.dtype)
+    out = StringIO()
     if 'int' in dt:
-        res = "\n".join([" ".join([("%d" % s) for s in a]) for a in npa.tolist()])
+        np.savetxt(out, npa, fmt="%d", delimiter=" ")
     elif 'float' in dt:
-        res = "\n".join([" ".join([("%3.6f" % s) for s in a]) for a in npa.tolist()])
+        np.savetxt(out, npa, fmt="%3.6f", delimiter=" ")
+    res = out.getvalue().rstrip("\n")
     return res
 
 
@@ -62,12 +81,39 @@ def tuples_to_numpy(tpls):
     return np.array([list(t) for t in tpls])
 
 
-def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_ASCII):
+def write_dataitem(parentnode, npa, heavy_data, name, encoding=ENCODING_ASCII):
     """
-        Writes either into hdf5 file or into open mesh file
+        Writes the array as XML text or into the heavy data file given by heavy_data
+        heavy_data: {'file_name': xdmf file name, 'h5file': open h5py.File for HDF5}
+    """
+    dimensions = " ".join(["%d" % d for d in npa.shape])
+    if 'int' in str(npa.dtype):
+        number_type = "Int"
+        npa = npa.astype('<i8')
+    else:
+        number_type = "Float"
+        npa = npa.astype('<f8')
+    if encoding == ENCODING_ASCII:
+        dataitem = etree.SubElement(parentnode, "DataItem", NumberType=number_type, Dimensions=dimensions, Format="XML")
+        dataitem.text = numpy_array_to_str(npa)
+    elif encoding == ENCODING_HDF5:
+        dataitem = etree.SubElement(parentnode, "DataItem", NumberType=number_type, Precision="8", Dimensions=dimensions, Format="HDF")
+        heavy_data['h5file'].create_dataset("mesh/" + name, data=npa)
+        dataitem.text = os.path.basename(heavy_data['h5file'].filename) + ":/mesh/" + name
+    elif encoding == ENCODING_BINARY:
+        dataitem = etree.SubElement(parentnode, "DataItem", NumberType=number_type, Precision="8", Dimensions=dimensions,
+                                    Format="Binary", Endian="Little")
+        binary_file_name = os.path.splitext(heavy_data['file_name'])[0] + "_" + name + ".bin"
+        npa.tofile(binary_file_name)
+        dataitem.text = os.path.basename(binary_file_name)
+    return dataitem
+
+
+def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_ASCII, heavy_data=None):
+    """
+        Writes either into heavy data file or into open mesh file
+        returns the sorted FreeCAD node ids, their index is the Fenics node index
     """
-
-    numnodes = fem_mesh_obj.FemMesh.NodeCount
 
     # dim = get_MaxDimElementFromList(get_FemMeshObjectElementTypes(fem_mesh_obj))[2]
     # if dim == 2:
@@ -80,23 +126,15 @@ def write_fenics_mesh_points_xdmf(fem_mesh_obj, geometrynode, encoding=ENCODING_
     # TODO: investigate: real two dimensional geometry. At the moment it is saved as
     # flat 3d geometry.
 
-    recalc_nodes_ind_dict = {}
-
-    if encoding == ENCODING_ASCII:
-        dataitem = etree.SubElement(geometrynode, "DataItem", Dimensions="%d %d" % (numnodes, 3), Format="XML")
-        nodes = []
-        for (ind, (key, node)) in enumerate(fem_mesh_obj.FemMesh.Nodes.iteritems()):
-            nodes.append(node)
-            recalc_nodes_ind_dict[key] = ind
+    fc_nodes = fem_mesh_obj.FemMesh.Nodes
+    node_ids = np.array(sorted(fc_nodes), dtype=np.int64)
+    nodes = points_to_numpy([fc_nodes[n] for n in node_ids.tolist()]).reshape(-1, 3)
+    write_dataitem(geometrynode, nodes, heavy_data, "geometry", encoding)
 
-        dataitem.text = numpy_array_to_str(points_to_numpy(nodes))
-    elif encoding == ENCODING_HDF5:
-        pass
+    return node_ids
 
-    return recalc_nodes_ind_dict
 
-
-def write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topologynode, rd, encoding=ENCODING_ASCII):
+def write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topologynode, node_ids, encoding=ENCODING_ASCII, heavy_data=None):
     (num_cells, name_cell, dim_cell) = get_MaxDimElementFromList(get_FemMeshObjectElementTypes(fem_mesh_obj))
     element_order = get_FemMeshObjectOrder(fem_mesh_obj)
 
@@ -128,15 +166,12 @@ def write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topologynode, rd, encoding=ENCO
         fc_cells = []
         print("Dimension of mesh incompatible with export XDMF function: %d" % (dim_cell,))
 
-    nodeindices = [(rd[ind] for ind in fem_mesh_obj.FemMesh.getElementNodes(fc_volume_ind)) for (fen_ind, fc_volume_ind) in enumerate(fc_cells)]
     # FC starts after all other entities, fenics start from 0 to size-1
-    # write nodeindices into dict to access them later
+    # the index of a node in the sorted node ids is the fenics node index
+    fc_elements = tuples_to_numpy([fem_mesh_obj.FemMesh.getElementNodes(fc_volume_ind) for fc_volume_ind in fc_cells])
+    nodeindices = np.searchsorted(node_ids, fc_elements.reshape(-1, nodes_per_element))
 
-    if encoding == ENCODING_ASCII:
-        dataitem = etree.SubElement(topologynode, "DataItem", NumberType="UInt", Dimensions="%d %d" % (num_cells, nodes_per_element), Format="XML")
-        dataitem.text = numpy_array_to_str(tuples_to_numpy(nodeindices))
-    elif encoding == ENCODING_HDF5:
-        pass
+    write_dataitem(topologynode, nodeindices, heavy_data, "topology", encoding)
 
 
 def write_fenics_mesh_cellfunctions(fem_mesh_obj, mycellvalues, attributenode, encoding=ENCODING_ASCII):
@@ -153,11 +188,15 @@ def write_fenics_mesh_cellfunctions(fem_mesh_obj, mycellvalues, attributenode, e
         pass
 
 
-def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, encoding=ENCODING_ASCII):
+def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, encoding=None):
     """
         For the export of xdmf.
+        Without encoding the heavy data is written binary, see get_default_encoding().
     """
 
+    if encoding is None:
+        encoding = get_default_encoding()
+
     FreeCAD_to_Fenics_dict = {
         "Triangle": "triangle",
         "Tetra": "tetrahedron",
@@ -188,13 +227,22 @@ def write_fenics_mesh_xdmf(fem_mesh_obj, outputfile, encoding=ENCODING_ASCII):
 
     # attribute = etree.SubElement(grid, "Attribute") #  for cell functions
 
-    recalc_dict = write_fenics_mesh_points_xdmf(fem_mesh_obj, geometry, encoding=encoding)
-    write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topology, recalc_dict, encoding=encoding)
+    heavy_data = {'file_name': outputfile, 'h5file': None}
+    if encoding == ENCODING_HDF5:
+        if h5py is None:
+            raise Exception("XDMF export with HDF5 heavy data needs h5py")
+        heavy_data['h5file'] = h5py.File(os.path.splitext(outputfile)[0] + ".h5", "w")
+    print("XDMF heavy data encoding: " + encoding)
+
+    node_ids = write_fenics_mesh_points_xdmf(fem_mesh_obj, geometry, encoding=encoding, heavy_data=heavy_data)
+    write_fenics_mesh_volumes_xdmf(fem_mesh_obj, topology, node_ids, encoding=encoding, heavy_data=heavy_data)
+    if heavy_data['h5file'] is not None:
+        heavy_data['h5file'].close()
 
     # TODO: improve cell functions support
     # write_fenics_mesh_cellfunctions(fem_mesh_obj, {}, attribute, encoding=encoding)
 
     fp = open(outputfile, "w")
     fp.write('''<?xml version="1.0"?>\n<!DOCTYPE Xdmf SYSTEM "Xdmf.dtd" []>\n''')
-    fp.write(etree.tostring(root, pretty_print=True))
+    fp.write(etree.tostring(root, pretty_print=True).decode("utf-8"))
     fp.close()
@@ -195,7 +195,7 @@ class Tag:
             self.isSquare = True
             self.solid = Part.makeCylinder(r1, height)
             radius = min(min(self.radius, r1), self.height)
-            PathLog.debug("Part.makeCone(%f, %f)" % (r1, height))
+            PathLog.debug("Part.makeCone(%f, %f)", r1, height)
         elif self.angle > 0.0 and height > 0.0:
             # cone
             rad = math.radians(self.angle)
@@ -212,23 +212,23 @@ class Tag:
                 height = r1 * tangens * 1.01
                 self.actualHeight = height
             self.r2 = r2
-            PathLog.debug("Part.makeCone(%f, %f, %f)" % (r1, r2, height))
+            PathLog.debug("Part.makeCone(%f, %f, %f)", r1, r2, height)
             self.solid = Part.makeCone(r1, r2, height)
         else:
             # degenerated case - no tag
-            PathLog.debug("Part.makeSphere(%f / 10000)" % (r1))
+            PathLog.debug("Part.makeSphere(%f / 10000)", r1)
             self.solid = Part.makeSphere(r1 / 10000)
         if not R == 0: # testing is easier if the solid is not rotated
             angle = -PathGeom.getAngle(self.originAt(0)) * 180 / math.pi
-            PathLog.debug("solid.rotate(%f)" % angle)
+            PathLog.debug("solid.rotate(%f)", angle)
             self.solid.rotate(FreeCAD.Vector(0,0,0), FreeCAD.Vector(0,0,1), angle)
         orig = self.originAt(z - 0.01 * self.actualHeight)
-        PathLog.debug("solid.translate(%s)" % orig)
+        PathLog.debug("solid.translate(%s)", orig)
         self.solid.translate(orig)
         radius = min(self.radius, radius)
         self.realRadius = radius
         if radius != 0:
-            PathLog.debug("makeFillet(%.4f)" % radius)
+            PathLog.debug("makeFillet(%.4f)", radius)
             self.solid = self.solid.makeFillet(radius, [self.solid.Edges[0]])
 
     def filterIntersections(self, pts, face):
@@ -310,10 +310,11 @@ class MapWireToTag:
         self.tail = tail
         self.edges = []
         self.entry = i
-        if tail:
-            PathLog.debug("MapWireToTag(%s - %s)" % (i, tail.valueAt(tail.FirstParameter)))
-        else:
-            PathLog.debug("MapWireToTag(%s - )" % i)
+        if PathLog.isEnabledFor(PathLog.Level.DEBUG):
+            if tail:
+                PathLog.debug("MapWireToTag(%s - %s)", i, tail.valueAt(tail.FirstParameter))
+            else:
+                PathLog.debug("MapWireToTag(%s - )", i)
         self.complete = False
         self.haveProblem = False
 
@@ -449,9 +450,9 @@ class MapWireToTag:
                     debugEdge(e, '    ', False)
                 raise ValueError("No connection to %s" % (p0))
             elif lastP:
-                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) (%.2f, %.2f, %.2f)" % (p0.x, p0.y, p0.z, lastP.x, lastP.y, lastP.z))
+                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) (%.2f, %.2f, %.2f)", p0.x, p0.y, p0.z, lastP.x, lastP.y, lastP.z)
             else:
-                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) -" % (p0.x, p0.y, p0.z))
+                PathLog.debug("xxxxxx (%.2f, %.2f, %.2f) -", p0.x, p0.y, p0.z)
             lastP = p0
         PathLog.track("-")
         return outputEdges
@@ -607,7 +608,7 @@ class PathData:
         startIndex = 0
         for i in range(0, len(self.base.Edges)):
             edge = self.base.Edges[i]
-            PathLog.debug('  %d: %.2f' % (i, edge.Length))
+            PathLog.debug('  %d: %.2f', i, edge.Length)
             if edge.Length == longestEdge.Length:
                 startIndex = i
                 break
@@ -622,10 +623,10 @@ class PathData:
 
         minLength = min(2. * W, longestEdge.Length)
 
-        PathLog.debug("length=%.2f shortestEdge=%.2f(%.2f) longestEdge=%.2f(%.2f) minLength=%.2f" % (self.base.Length, shortestEdge.Length, shortestEdge.Length/self.base.Length, longestEdge.Length, longestEdge.Length / self.base.Length, minLength))
-        PathLog.debug("   start: index=%-2d count=%d (length=%.2f, distance=%.2f)" % (startIndex, startCount, startEdge.Length, tagDistance))
-        PathLog.debug("               -> lastTagLength=%.2f)" % lastTagLength)
-        PathLog.debug("               -> currentLength=%.2f)" % currentLength)
+        PathLog.debug("length=%.2f shortestEdge=%.2f(%.2f) longestEdge=%.2f(%.2f) minLength=%.2f", self.base.Length, shortestEdge.Length, shortestEdge.Length/self.base.Length, longestEdge.Length, longestEdge.Length / self.base.Length, minLength)
+        PathLog.debug("   start: index=%-2d count=%d (length=%.2f, distance=%.2f)", startIndex, startCount, startEdge.Length, tagDistance)
+        PathLog.debug("               -> lastTagLength=%.2f)", lastTagLength)
+        PathLog.debug("               -> currentLength=%.2f)", currentLength)
 
         edgeDict = { startIndex: startCount }
 
@@ -640,7 +641,7 @@ class PathData:
 
         for (i, count) in edgeDict.iteritems():
             edge = self.base.Edges[i]
-            PathLog.debug(" %d: %d" % (i, count))
+            PathLog.debug(" %d: %d", i, count)
             #debugMarker(edge.Vertexes[0].Point, 'base', (1.0, 0.0, 0.0), 0.2)
             #debugMarker(edge.Vertexes[1].Point, 'base', (0.0, 1.0, 0.0), 0.2)
             if 0 != count:
@@ -659,10 +660,10 @@ class PathData:
                 tagCount += 1
                 lastTagLength += tagDistance
             if tagCount > 0:
-                PathLog.debug("      index=%d -> count=%d" % (index, tagCount))
+                PathLog.debug("      index=%d -> count=%d", index, tagCount)
                 edgeDict[index] = tagCount
         else:
-            PathLog.debug("      skipping=%-2d (%.2f)" % (index, edge.Length))
+            PathLog.debug("      skipping=%-2d (%.2f)", index, edge.Length)
 
         return (currentLength, lastTagLength)
 
@@ -771,7 +772,7 @@ class ObjectDressup:
         mapper = None
 
         while edge or lastEdge < len(pathData.edges):
-            PathLog.debug("------- lastEdge = %d/%d.%d/%d" % (lastEdge, lastTag, t, len(tags)))
+            PathLog.debug("------- lastEdge = %d/%d.%d/%d", lastEdge, lastTag, t, len(tags))
             if not edge:
                 edge = pathData.edges[lastEdge]
                 debugEdge(edge, "=======  new edge: %d/%d" % (lastEdge, len(pathData.edges)))
@@ -862,7 +863,7 @@ class ObjectDressup:
                 if prev:
                     if prev.solid.common(tag.solid).Faces:
                         PathLog.notice("Tag #%d intersects with previous tag - disabling\n" % i)
-                        PathLog.debug("this tag = %d [%s]" % (i, tag.solid.BoundBox))
+                        PathLog.debug("this tag = %d [%s]", i, tag.solid.BoundBox)
                         tag.enabled = False
                 elif self.pathData.edges:
                     e = self.pathData.edges[0]
@@ -873,7 +874,7 @@ class ObjectDressup:
                         tag.enabled = False
             if tag.enabled:
                 prev = tag
-                PathLog.debug("previousTag = %d [%s]" % (i, prev))
+                PathLog.debug("previousTag = %d [%s]", i, prev)
             else:
                 disabled.append(i)
             tags.append(tag)
@@ -907,7 +908,7 @@ class ObjectDressup:
         if hasattr(obj, "Positions"):
             self.tags, positions, disabled = self.createTagsPositionDisabled(obj, obj.Positions, obj.Disabled)
             if obj.Disabled != disabled:
-                PathLog.debug("Updating properties.... %s vs. %s" % (obj.Disabled, disabled))
+                PathLog.debug("Updating properties.... %s vs. %s", obj.Disabled, disabled)
                 obj.Positions = positions
                 obj.Disabled = disabled
 
@@ -924,7 +925,7 @@ class ObjectDressup:
             for tag in self.tags:
                 tagID += 1
                 if tag.enabled:
-                    PathLog.debug("x=%s, y=%s, z=%s" % (tag.x, tag.y, self.pathData.minZ))
+                    PathLog.debug("x=%s, y=%s, z=%s", tag.x, tag.y, self.pathData.minZ)
                     #debugMarker(FreeCAD.Vector(tag.x, tag.y, self.pathData.minZ), "tag-%02d" % tagID , (1.0, 0.0, 1.0), 0.5)
                     #if tag.angle != 90:
                     #    debugCone(tag.originAt(self.pathData.minZ), tag.r1, tag.r2, tag.actualHeight, "tag-%02d" % tagID)
@@ -24,7 +24,7 @@
 
 import FreeCAD
 import os
-import traceback
+import sys
 
 class Level:
     """Enumeration of log levels, used for setLevel and getLevel."""
@@ -43,6 +43,8 @@ class Level:
 
 _defaultLogLevel = Level.NOTICE
 _moduleLogLevel  = { }
+_maxLogLevel     = Level.NOTICE # highest level of all modules, calls above it return without looking at the caller
+_moduleNames     = { }          # file name -> module id
 _useConsole = True
 _trackModule = { }
 _trackAll = False
@@ -70,6 +72,12 @@ def setLevel(level, module = None):
             _moduleLogLevel = { }
         else:
             _defaultLogLevel = level
+    _updateMaxLevel()
+
+def _updateMaxLevel():
+    """internal function to update the highest log level of all modules."""
+    global _maxLogLevel
+    _maxLogLevel = max([_defaultLogLevel] + list(_moduleLogLevel.values()))
 
 def getLevel(module = None):
     """(module = None) - return the global (None) or module specific log level."""
@@ -81,15 +89,31 @@ def thisModule():
     """returns the module id of the caller, can be used for setLevel, getLevel and trackModule."""
     return _caller()[0]
 
+def isEnabledFor(level, module = None):
+    """(level, module = None) - return True if messages of level are logged for module, the calling module if not set.
+       Use it to skip building expensive log messages."""
+    if _maxLogLevel < level:
+        return False
+    if not module:
+        module = _caller()[0]
+    return getLevel(module) >= level
+
 def _caller():
     """internal function to determine the calling module."""
-    file, line, func, text = traceback.extract_stack(limit=3)[0]
-    return os.path.splitext(os.path.basename(file))[0], line, func
-
-def _log(level, module_line_func, msg):
+    frame = sys._getframe(2)
+    file = frame.f_code.co_filename
+    module = _moduleNames.get(file)
+    if module is None:
+        module = os.path.splitext(os.path.basename(file))[0]
+        _moduleNames[file] = module
+    return module, frame.f_lineno, frame.f_code.co_name
+
+def _log(level, module_line_func, msg, args = ()):
     """internal function to do the logging"""
     module, line, func = module_line_func
     if getLevel(module) >= level:
+        if args:
+            msg = msg % args
         message = "%s.%s: %s" % (module, Level.toString(level), msg)
         if _useConsole:
             message += "\n"
@@ -106,21 +130,31 @@ def _log(level, module_line_func, msg):
         return message
     return None
 
-def debug(msg):
-    """(message)"""
-    return _log(Level.DEBUG, _caller(), msg)
-def info(msg):
-    """(message)"""
-    return _log(Level.INFO, _caller(), msg)
-def notice(msg):
-    """(message)"""
-    return _log(Level.NOTICE, _caller(), msg)
-def warning(msg):
-    """(message)"""
-    return _log(Level.WARNING, _caller(), msg)
-def error(msg):
-    """(message)"""
-    return _log(Level.ERROR, _caller(), msg)
+# The log functions return before looking at the caller if no module logs the level.
+# With args the message is a %-format which is only formatted if the message is logged.
+def debug(msg, *args):
+    """(message, *args)"""
+    if _maxLogLevel < Level.DEBUG:
+        return None
+    return _log(Level.DEBUG, _caller(), msg, args)
+def info(msg, *args):
+    """(message, *args)"""
+    if _maxLogLevel < Level.INFO:
+        return None
+    return _log(Level.INFO, _caller(), msg, args)
+def notice(msg, *args):
+    """(message, *args)"""
+    if _maxLogLevel < Level.NOTICE:
+        return None
+    return _log(Level.NOTICE, _caller(), msg, args)
+def warning(msg, *args):
+    """(message, *args)"""
+    if _maxLogLevel < Level.WARNING:
+        return None
+    return _log(Level.WARNING, _caller(), msg, args)
+def error(msg, *args):
+    """(message, *args)"""
+    return _log(Level.ERROR, _caller(), msg, args)
 
 def trackAllModules(boolean):
     """(boolean) - if True all modules will be tracked, otherwise tracking is up to the module setting."""
@@ -155,6 +189,8 @@ def untrackModule(module = None):
 
 def track(*args):
     """(....) - call with arguments of current function you want logged if tracking is enabled."""
+    if not _trackAll and not _trackModule:
+        return None
     module, line, func = _caller()
     if _trackAll or _trackModule.get(module, None):
         message = "%s(%d).%s(%s)" % (module, line, func, ', '.join([str(arg) for arg in args]))
@@ -32,6 +32,8 @@ class PathPreferences:
     PostProcessorBlacklist   = "PostProcessorBlacklist"
     # Linear tolerance to use when generating Paths, eg when tesselating geometry
     GeometryTolerance  = "GeometryTolerance"
+    # Seconds PathUtils.sort_jobs may spend shortening the rapid moves between holes, 0 to disable
+    SortJobsImproveTime = "SortJobsImproveTime"
 
     @classmethod
     def preferences(cls):
@@ -76,6 +78,10 @@ class PathPreferences:
     def defaultGeometryTolerance(cls):
         return cls.preferences().GetFloat(cls.GeometryTolerance, 0.01)
 
+    @classmethod
+    def defaultSortJobsImproveTime(cls):
+        return cls.preferences().GetFloat(cls.SortJobsImproveTime, 0.0)
+
     @classmethod
     def postProcessorBlacklist(cls):
         pref = cls.preferences()
@@ -588,55 +588,190 @@ def rampPlunge(edge, rampangle, destZ, startZ):
 
     return rampCmds
 
-def sort_jobs(locations, keys, attractors=[]):
+def sort_jobs(locations, keys, attractors=[], improve_time=None):
     """ sort holes by the nearest neighbor method
         keys: two-element list of keys for X and Y coordinates. for example ['x','y']
+        attractors: keys whose absolute values are added to the square distance, default the X key
+        improve_time: seconds the 2-opt and Or-opt pass may use to shorten the rapid moves,
+            0 for no pass, None for the SortJobsImproveTime preference
         originally written by m0n5t3r for PathHelix
     """
-    from Queue import PriorityQueue
-    from collections import defaultdict
+    import time
+    from PathScripts.PathPreferences import PathPreferences
 
+    if not locations:
+        return []
     attractors = attractors or [keys[0]]
+    if improve_time is None:
+        improve_time = PathPreferences.defaultSortJobsImproveTime()
+    start = time.time()
 
-    def sqdist(a, b):
-        """ square Euclidean distance """
-        d = 0
-        for k in keys:
-            d += (a[k] - b[k]) ** 2 
+    # The next location is the one with the least square distance plus weight, the sum of the
+    # absolute attractor values. It is the square distance in 3D to the location lifted by the
+    # square root of its weight, thus a KD-tree finds it.
+    points = numpy.array([[location[k] for k in keys] + [math.sqrt(sum(abs(location[k]) for k in attractors))]
+                          for location in locations], dtype=float)
+    order = _nearest_neighbor_order(points)
+    length = _rapid_length(points, order)
+    PathLog.info("sort_jobs: nearest neighbor order of {} locations in {:.3f} s, rapid travel {:.2f}".format(
+                 len(order), time.time() - start, length))
 
-        return d
+    if improve_time > 0 and len(order) > 3:
+        improve_start = time.time()
+        order = _improve_order(points, order, improve_time)
+        improved_length = _rapid_length(points, order)
+        PathLog.info("sort_jobs: 2-opt and Or-opt in {:.3f} s, rapid travel {:.2f} ({:.1f}% shorter)".format(
+                     time.time() - improve_start, improved_length,
+                     100.0 * (1.0 - improved_length / length) if length else 0.0))
 
-    def weight(location):
-        w = 0
+    return [locations[i] for i in order]
 
-        for k in attractors:
-            w += abs(location[k])
 
-        return w
+def rapid_length(locations, keys):
+    """ length of the rapid moves from location to location, keys as in sort_jobs() """
+    points = numpy.array([[location[k] for k in keys] for location in locations], dtype=float)
+    return _rapid_length(points, range(len(locations)))
 
-    def find_closest(location_list, location, dist):
-        q = PriorityQueue()
 
-        for j in location_list:
-            q.put((dist(j, location) + weight(j), j))
+def _rapid_length(points, order):
+    if len(order) < 2:
+        return 0.0
+    xy = points[list(order), :2]
+    return float(numpy.sqrt(((xy[1:] - xy[:-1]) ** 2).sum(axis=1)).sum())
 
-        prio, result = q.get()
 
-        return result
-
-
-    out = []
-    zero = defaultdict(lambda: 0)
-
-    out.append(find_closest(locations, zero, sqdist))
-    locations.remove(out[-1])
-
-    while locations:
-        closest = find_closest(locations, out[-1], sqdist)
-        out.append(closest)
-        locations.remove(closest)
-
-    return out
+def _kdtree(points):
+    try:
+        from scipy.spatial import cKDTree as KDTree
+    except ImportError:
+        from PathScripts.kdtree import KDTree
+    return KDTree(points)
+
+
+def _nearest_neighbor_order(points):
+    # the tree can not remove points, the visited ones are skipped by querying more neighbors
+    # and the tree is rebuilt from the remaining points if half of its points are visited
+    remaining = numpy.ones(len(points), dtype=bool)
+    tree_ids = numpy.arange(len(points))
+    tree = _kdtree(points)
+    tree_visited = 0
+    order = []
+    position = numpy.zeros(points.shape[1])
+    while len(order) < len(points):
+        if tree_visited > len(tree_ids) / 2:
+            tree_ids = numpy.nonzero(remaining)[0]
+            tree = _kdtree(points[tree_ids])
+            tree_visited = 0
+        k = min(8, len(tree_ids))
+        while True:
+            ids = tree_ids[numpy.atleast_1d(tree.query(position, k)[1])]
+            free = remaining[ids]
+            if free.any() or k == len(tree_ids):
+                break
+            k = min(4 * k, len(tree_ids))
+        closest = ids[free.argmax()]  # the query results are sorted by distance
+        order.append(int(closest))
+        remaining[closest] = False
+        tree_visited += 1
+        position = points[closest].copy()
+        position[2] = 0.0
+    return order
+
+
+def _improve_order(points, order, time_limit, neighbors=8):
+    # 2-opt and Or-opt moves of the open path, the moves only join a location with one of its
+    # nearest neighbors, the first location is kept and no move is tried after time_limit seconds
+    import time
+    end_time = time.time() + time_limit
+    n = len(order)
+    x = points[:, 0].tolist()
+    y = points[:, 1].tolist()
+    tree = _kdtree(points[:, :2])
+    near_cache = {}
+
+    def near(a):
+        # the nearest neighbors of a are only queried when a move of a is tried
+        if a not in near_cache:
+            ids = numpy.atleast_1d(tree.query(points[a, :2], min(neighbors + 1, n))[1]).tolist()
+            near_cache[a] = [c for c in ids if c != a and c < n]
+        return near_cache[a]
+
+    tour = list(order)
+    pos = [0] * n
+    for i, a in enumerate(tour):
+        pos[a] = i
+
+    def dist(a, b):
+        if a is None or b is None:
+            return 0.0
+        return math.hypot(x[a] - x[b], y[a] - y[b])
+
+    def succ(i):
+        return tour[i + 1] if i + 1 < n else None
+
+    def reverse(i, j):
+        tour[i:j + 1] = tour[i:j + 1][::-1]
+        for k in range(i, j + 1):
+            pos[tour[k]] = k
+
+    def two_opt(a):
+        # join a with a neighbor c by reversing the path between them
+        i = pos[a]
+        for c in near(a):
+            j = pos[c]
+            lo, hi = min(i, j), max(i, j)
+            # successor edges (t[lo], t[lo + 1]) and (t[hi], t[hi + 1]) --> (t[lo], t[hi]) and (t[lo + 1], t[hi + 1])
+            if hi > lo + 1:
+                p, q = tour[lo + 1], succ(hi)
+                if dist(tour[lo], p) + dist(tour[hi], q) - dist(a, c) - dist(p, q) > 1e-9:
+                    reverse(lo + 1, hi)
+                    return True
+            # predecessor edges (t[lo - 1], t[lo]) and (t[hi - 1], t[hi]) --> (t[lo - 1], t[hi - 1]) and (t[lo], t[hi])
+            if lo > 0 and hi > lo + 1:
+                p, q = tour[lo - 1], tour[hi - 1]
+                if dist(p, tour[lo]) + dist(q, tour[hi]) - dist(p, q) - dist(a, c) > 1e-9:
+                    reverse(lo, hi - 1)
+                    return True
+        return False
+
+    def or_opt(a, length):
+        # move the segment of length locations starting at a next to a neighbor of its ends
+        i = pos[a]
+        if i == 0 or i + length > n:
+            return False
+        segment = tour[i:i + length]
+        first, last = segment[0], segment[-1]
+        p, q = tour[i - 1], succ(i + length - 1)
+        removed = dist(p, first) + dist(last, q) - dist(p, q)
+        for c in set(near(first) + near(last)):
+            j = pos[c]
+            if i <= j < i + length:
+                continue
+            for u, v in ((tour[j - 1] if j > 0 else None, c), (c, succ(j))):
+                if u is None or u in segment or v in segment:
+                    continue
+                forward = dist(u, first) + dist(last, v)
+                backward = dist(u, last) + dist(first, v)
+                if removed - min(forward, backward) + dist(u, v) > 1e-9:
+                    if backward < forward:
+                        segment.reverse()
+                    del tour[i:i + length]
+                    k = tour.index(u) + 1
+                    tour[k:k] = segment
+                    for m in range(min(i, k), max(i + length, k + length)):
+                        pos[tour[m]] = m
+                    return True
+        return False
+
+    improved = True
+    while improved and time.time() < end_time:
+        improved = False
+        for a in list(tour):
+            if time.time() > end_time:
+                break
+            while time.time() < end_time and (two_opt(a) or or_opt(a, 1) or or_opt(a, 2) or or_opt(a, 3)):
+                improved = True
+    return tour
 
 
 class depth_params:
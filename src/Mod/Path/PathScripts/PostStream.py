@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 FreeCAD Developers                                 *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+from __future__ import print_function
+
+'''
+Streaming output for post processors.
+A post processor yields the lines of the G-code program from a generator and write_gcode() writes
+them to the output file in blocks while they are made, the program is never built up in one string.
+The Dialect turns the commands of the path objects into lines, a post processor adapts it with the
+settings passed to the constructor and by overriding its hooks.
+'''
+
+import FreeCAD
+import itertools
+import time
+from FreeCAD import Units
+
+
+class Dialect(object):
+    '''the G-code dialect of a post processor, the defaults are the ones of the linuxcnc post.
+    The formats of the parameters are compiled into a table once, commands are then formatted
+    from their plain float values without any unit objects.'''
+
+    # order of the parameters, linuxcnc doesn't want K properties on XY plane
+    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L']
+    precision = 4           # decimals of the parameters
+    param_precision = {}    # decimals of single parameters, e.g. {'F': 2}
+    integer_params = ['T']  # parameters written as whole numbers
+    feed_params = ['F']     # parameters converted to the feed rate unit, left out of rapid moves
+    modal_params = []       # parameters left out if their word is the same as the last one written
+    modal = False           # if true commands are suppressed if the same as previous line
+    comments = True
+    line_numbers = False
+    line_number = 100       # the line number before the first line
+    line_number_increment = 10
+    command_space = " "
+    unit_format = 'mm/min'  # unit of the feed rate
+    rapid_commands = ['G0', 'G00']  # commands without feed rate
+    tool_change = ''        # text inserted before a tool change
+
+    def __init__(self, **settings):
+        for name in settings:
+            if not hasattr(self, name):
+                raise AttributeError("unknown post processor setting: %s" % name)
+            setattr(self, name, settings[name])
+        self.last_command = None
+        self.compile()
+
+    def feed_divisor(self):
+        '''returns the value of one unit_format in the internal velocity unit'''
+        # the same as Units.Quantity(value, Units.Velocity).getValueAs(unit_format) but only once
+        return Units.Quantity(self.unit_format).Value
+
+    def param_format(self, param):
+        '''returns the format string and the divisor of the value of param'''
+        if param in self.integer_params:
+            return param + '%d', 1.0
+        template = param + '%.' + str(self.param_precision.get(param, self.precision)) + 'f'
+        if param in self.feed_params:
+            return template, self.feed_divisor()
+        return template, 1.0
+
+    def compile(self):
+        '''builds the table of the parameter formats, needed again after a setting is changed'''
+        self.table = []
+        for param in self.params:
+            template, divisor = self.param_format(param)
+            self.table.append((param, template, divisor, param in self.modal_params, param in self.feed_params))
+        self.rapid = set(self.rapid_commands)
+        self.formats = {}
+        self.last_words = {}
+
+    def set_unit_format(self, unit_format):
+        '''changes the unit of the feed rate'''
+        if unit_format != self.unit_format:
+            self.unit_format = unit_format
+            self.compile()
+
+    def command_formats(self, names, rapid):
+        '''returns the table rows of the parameters names of a command'''
+        return [row[:4] for row in self.table if row[0] in names and not (rapid and row[4])]
+
+    def append_params(self, words, command, parameters):
+        '''appends the words of the parameters of command to words'''
+        names = tuple(parameters)
+        rapid = command in self.rapid
+        try:
+            formats = self.formats[(names, rapid)]
+        except KeyError:
+            formats = self.formats[(names, rapid)] = self.command_formats(names, rapid)
+        last_words = self.last_words
+        for param, template, divisor, modal in formats:
+            word = template % (parameters[param] / divisor)
+            if modal:
+                if last_words.get(param) == word:
+                    continue
+                last_words[param] = word
+            words.append(word)
+
+    def number(self):
+        '''line number hook, returns the prefix of the next line'''
+        if self.line_numbers:
+            self.line_number += self.line_number_increment
+            return "N" + str(self.line_number) + " "
+        return ""
+
+    def text(self, text):
+        '''yields the numbered lines of a text like the preamble'''
+        for line in text.splitlines(True):
+            yield self.number() + line
+
+    def comment(self, text):
+        '''yields the comment line of text if comments are written'''
+        if self.comments:
+            yield self.number() + "(" + text + ")\n"
+
+    def command_words(self, c):
+        '''modal suppression hook, returns the words of a command'''
+        command = c.Name
+        words = []
+        if not (self.modal and command == self.last_command):
+            words.append(command)
+        self.last_command = command
+        self.append_params(words, command, c.Parameters)
+        return words
+
+    def line(self, words):
+        '''returns the line of the words of a command, None for no line'''
+        if not words:
+            return None
+        if self.line_numbers:
+            words.insert(0, self.number())
+        return self.command_space.join(words).strip() + "\n"
+
+    def tool_change_lines(self):
+        '''yields the lines put before a M6 tool change'''
+        return self.text(self.tool_change)
+
+    def command_lines(self, c):
+        '''returns the lines of a command'''
+        words = self.command_words(c)
+        lines = []
+        if c.Name == 'M6':
+            lines.extend(self.tool_change_lines())
+        if c.Name == 'message':
+            if not self.comments:
+                return lines
+            words = words[1:]  # remove the command
+        line = self.line(words)
+        if line is not None:
+            lines.append(line)
+        return lines
+
+    def parse(self, pathobj):
+        '''yields the lines of a path object or of the path objects in a compound or project'''
+        if hasattr(pathobj, "Group"):
+            for p in pathobj.Group:
+                for line in self.parse(p):
+                    yield line
+        elif hasattr(pathobj, "Path"):  # groups might contain non-path things like stock
+            self.last_command = None
+            self.last_words = {}
+            command_lines = self.command_lines
+            for c in pathobj.Path.Commands:
+                for line in command_lines(c):
+                    yield line
+
+
+def write_lines(gfile, lines, block_lines=10000):
+    '''the buffered sink, writes the lines to the open file gfile in blocks of block_lines lines
+    returns the number of written lines'''
+    count = 0
+    lines = iter(lines)
+    while True:
+        block = list(itertools.islice(lines, block_lines))
+        if not block:
+            return count
+        gfile.write(''.join(block))
+        count += len(block)
+
+
+def write_gcode(lines, filename, show_editor=False):
+    '''writes the lines of a post processor into the file filename, '-' for no file.
+    The lines are only collected into one string if they are shown in the editor or not written to a file.
+    returns the G-code string if it was collected, otherwise None'''
+    if show_editor or filename == '-':
+        gcode = ''.join(lines)
+        if show_editor:
+            from PathScripts import PostUtils
+            gcode = PostUtils.editor(gcode)
+        if not filename == '-':
+            gfile = open(filename, "wb")
+            gfile.write(gcode)
+            gfile.close()
+        return gcode
+    gfile = open(filename, "wb")
+    try:
+        write_lines(gfile, lines)
+    finally:
+        gfile.close()
+    return None
+
+
+class _BenchmarkCommand(object):
+    def __init__(self, name, parameters):
+        self.Name = name
+        self.Parameters = parameters
+
+
+class _BenchmarkObject(object):
+    def __init__(self, name, commands=None, group=None):
+        self.Name = name
+        self.Label = name
+        self.Description = name
+        self.InList = []
+        if group is not None:
+            self.Group = group
+        self.Path = _BenchmarkPath(commands or [])
+
+
+class _BenchmarkPath(object):
+    def __init__(self, commands):
+        self.Commands = commands
+
+
+def make_benchmark_job(commands):
+    '''returns a job like compound with one operation of commands moves, mostly G1 with some G0 and G2'''
+    moves = []
+    for i in range(commands):
+        x = (i % 1000) * 0.1
+        y = (i // 1000) * 0.1
+        if i % 100 == 0:
+            moves.append(_BenchmarkCommand('G0', {'X': x, 'Y': y, 'Z': 5.0}))
+        elif i % 10 == 0:
+            moves.append(_BenchmarkCommand('G2', {'X': x, 'Y': y, 'Z': -1.0, 'I': 0.05, 'J': 0.0, 'F': 10.0}))
+        else:
+            moves.append(_BenchmarkCommand('G1', {'X': x, 'Y': y, 'Z': -1.0, 'F': 10.0}))
+    operation = _BenchmarkObject('Operation', moves)
+    return _BenchmarkObject('Job', group=[operation])
+
+
+def benchmark(post='linuxcnc', commands=1000000, filename=None, argstring=''):
+    '''posts a synthetic job of commands moves with the post processor post into filename
+    returns {'post', 'commands', 'seconds', 'lines', 'MB', 'lines_per_s', 'MB_per_s'}'''
+    import importlib
+    import os
+    import tempfile
+    module = importlib.import_module('PathScripts.' + post + '_post')
+    if filename is None:
+        filename = os.path.join(tempfile.gettempdir(), 'PathPostBenchmark_%s.ngc' % post)
+    job = make_benchmark_job(commands)
+    show_editor = module.SHOW_EDITOR
+    module.SHOW_EDITOR = False
+    try:
+        start = time.time()
+        module.export([job], filename, argstring + ' --no-show-editor')
+        seconds = time.time() - start
+    finally:
+        module.SHOW_EDITOR = show_editor
+    lines = sum(1 for line in open(filename, 'rb'))
+    size = os.path.getsize(filename) / 1e6
+    result = {
+        'post': post,
+        'commands': commands,
+        'seconds': seconds,
+        'lines': lines,
+        'MB': size,
+        'lines_per_s': lines / seconds,
+        'MB_per_s': size / seconds}
+    FreeCAD.Console.PrintMessage("%(post)s: %(commands)d commands in %(seconds).2f s, %(lines)d lines, %(MB).1f MB, "
+                                 "%(lines_per_s).0f lines/s, %(MB_per_s).1f MB/s\n" % result)
+    return result
@@ -27,6 +27,7 @@ TOOLTIP=''' example post for Centroid CNC mill'''
 import FreeCAD
 import datetime
 now = datetime.datetime.now()
+from PathScripts import PostStream
 from PathScripts import PostUtils
 
 
@@ -66,77 +67,83 @@ FOOTER = 'M99'+'\n'
 #***************************************************************************
 
 
-if open.__module__ == '__builtin__':
-    pythonopen = open
-
 def export(selection,filename,argstring):
-    params = ['X','Y','Z','A','B','I','J','F','H','S','T','Q','R','L'] #Using XY plane most of the time so skipping K
     for obj in selection:
         if not hasattr(obj,"Path"):
             print("the object " + obj.Name + " is not a path. Please select only path and Compounds.")
             return
+    return PostStream.write_gcode(gcode(selection), filename, SHOW_EDITOR)
+
+
+def gcode(selection):
+    '''yields the lines of the G-code program of the selected job'''
+    units = UNITS
     myMachine = None
     for pathobj in selection:
         if hasattr(pathobj,"MachineName"):
             myMachine = pathobj.MachineName
         if hasattr(pathobj, "MachineUnits"):
             if pathobj.MachineUnits == "Metric":
-               UNITS = "G21"
+               units = "G21"
             else:
-               UNITS = "G20"
+               units = "G20"
     if myMachine is None:
         print("No machine found in this selection")
 
-    gcode =''
-    gcode+= HEADER % (FreeCAD.ActiveDocument.FileName)
-    gcode+= SAFETYBLOCK
-    gcode+= UNITS+'\n'
+    dialect = CentroidDialect(modal=MODAL, units=units)
 
-    lastcommand = None
-    gcode+= COMMENT+ selection[0].Description +'\n'
+    yield HEADER % (FreeCAD.ActiveDocument.FileName)
+    yield SAFETYBLOCK
+    yield units+'\n'
 
-    gobjects = []
-    for g in selection[0].Group:
-        gobjects.append(g)
+    yield COMMENT+ selection[0].Description +'\n'
 
-    for obj in gobjects:
+    for obj in selection[0].Group:
         for c in obj.Path.Commands:
-            outstring = []
-            command = c.Name
-
-            if command[0]=='(':
-                command = PostUtils.fcoms(command, COMMENT)
-
-            outstring.append(command)
-            if MODAL == True:
-                if command == lastcommand:
-                    outstring.pop(0)
-            if c.Parameters >= 1:
-                for param in params:
-                    if param in c.Parameters:
-                        if param == 'F':
-                            outstring.append(param + PostUtils.fmt(c.Parameters['F'], FEED_DECIMALS,UNITS))
-                        elif param == 'H':
-                            outstring.append(param + str(int(c.Parameters['H'])))
-                        elif param == 'S':
-                            outstring.append(param + PostUtils.fmt(c.Parameters['S'], SPINDLE_DECIMALS,'G21')) #rpm is unitless-therefore I had to 'fake it out' by using metric units which don't get converted from entered value
-                        elif param == 'T':
-                            outstring.append(param + str(int(c.Parameters['T'])))
-                        else:
-                            outstring.append(param + PostUtils.fmt(c.Parameters[param],AXIS_DECIMALS,UNITS))
-            outstr = str(outstring)
-            outstr =outstr.replace('[','')
-            outstr =outstr.replace(']','')
-            outstr =outstr.replace("'",'')
-            outstr =outstr.replace(",",'')
-            gcode+= outstr + '\n'
-            lastcommand = c.Name
-    gcode+= TOOLRETURN
-    gcode+= SAFETYBLOCK
-    gcode+= FOOTER
-    if SHOW_EDITOR:
-        PostUtils.editor(gcode)
-    gfile = pythonopen(filename,"wb")
-    gfile.write(gcode)
-    gfile.close()
+            for line in dialect.command_lines(c):
+                yield line
+    yield TOOLRETURN
+    yield SAFETYBLOCK
+    yield FOOTER
 
+
+class CentroidDialect(PostStream.Dialect):
+    '''comments with the centroid comment symbol and the parameters converted to the units'''
+
+    params = ['X','Y','Z','A','B','I','J','F','H','S','T','Q','R','L'] #Using XY plane most of the time so skipping K
+    feed_params = [] # the feed rate is written as it is, rapid moves included
+    units = UNITS
+
+    def param_format(self, param):
+        if param in ['H', 'T']:
+            return param + '%d', 1.0
+        if param == 'S':
+            return param + '%.' + str(SPINDLE_DECIMALS) + 'f', 1.0 #rpm is unitless and doesn't get converted from entered value
+        if param == 'F':
+            template = param + '%.' + str(FEED_DECIMALS) + 'f'
+        else:
+            template = param + '%.' + str(AXIS_DECIMALS) + 'f'
+        if self.units == 'G21': #metric
+            return template, 1.0
+        return template, 25.4 #inch, since FreeCAD uses metric units internally
+
+    def command_words(self, c):
+        command = c.Name
+        if command[0]=='(':
+            command = PostUtils.fcoms(command, COMMENT)
+        words = []
+        if not (self.modal and command == self.last_command):
+            words.append(command)
+        self.last_command = c.Name
+        self.append_params(words, command, c.Parameters)
+        return words
+
+    def command_lines(self, c):
+        return [self.line(self.command_words(c))]
+
+    def line(self, words):
+        # the words as they used to be printed from the list, without brackets, quotes and commas
+        line = " ".join(words)
+        for ch in "[]',":
+            line = line.replace(ch, '')
+        return line + '\n'
@@ -59,7 +59,7 @@ linuxcnc_post.export(object,"/path/to/file.ncc","")
 
 import datetime
 now = datetime.datetime.now()
-from PathScripts import PostUtils
+from PathScripts import PostStream
 
 #These globals set common customization preferences
 OUTPUT_COMMENTS = True
@@ -105,20 +105,22 @@ POST_OPERATION = ''''''
 TOOL_CHANGE = ''''''
 
 
-# to distinguish python built-in open function from the one declared below
-if open.__module__ == '__builtin__':
-    pythonopen = open
-
-
 def export(objectslist,filename,argstring):
-    global UNITS
     for obj in objectslist:
         if not hasattr(obj,"Path"):
             print("the object " + obj.Name + " is not a path. Please select only path and Compounds.")
             return
 
     print("postprocessing...")
-    gcode = ""
+    final = PostStream.write_gcode(gcode(objectslist), filename, SHOW_EDITOR)
+    print("done postprocessing.")
+
+    return final
+
+
+def gcode(objectslist):
+    '''yields the lines of the G-code program of the objects'''
+    global UNITS
 
     #Find the machine.
     #The user my have overridden post processor defaults in the GUI.  Make sure we're using the current values in the Machine Def.
@@ -134,130 +136,80 @@ def export(objectslist,filename,argstring):
     if myMachine is None:
         print("No machine found in this selection")
 
+    dialect = DynapathDialect(
+        modal=MODAL,
+        comments=OUTPUT_COMMENTS,
+        line_numbers=OUTPUT_LINE_NUMBERS,
+        line_number=LINENR,
+        command_space=COMMAND_SPACE,
+        tool_change=TOOL_CHANGE)
+
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ +")\n"
-        gcode += linenumber() + "(Output Time:"+str(now)+")\n"
+        yield dialect.number() + "(Exported by FreeCAD)\n"
+        yield dialect.number() + "(Post Processor: " + __name__ +")\n"
+        yield dialect.number() + "(Output Time:"+str(now)+")\n"
 
     #Write the preamble
-    if OUTPUT_COMMENTS: gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+    for line in dialect.comment("begin preamble"):
+        yield line
+    for line in dialect.text(PREAMBLE):
+        yield line
+    yield dialect.number() + UNITS + "\n"
 
     for obj in objectslist:
 
         #do the pre_op
-        if OUTPUT_COMMENTS: gcode += linenumber() + "(begin operation: " + obj.Label + ")\n"
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        for line in dialect.comment("begin operation: " + obj.Label):
+            yield line
+        for line in dialect.text(PRE_OPERATION):
+            yield line
 
-        gcode += parse(obj)
+        for line in dialect.parse(obj):
+            yield line
 
         #do the post_op
-        if OUTPUT_COMMENTS: gcode += linenumber() + "(finish operation: " + obj.Label + ")\n"
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        for line in dialect.comment("finish operation: " + obj.Label):
+            yield line
+        for line in dialect.text(POST_OPERATION):
+            yield line
 
     #do the post_amble
 
-    if OUTPUT_COMMENTS: gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
-
-    if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
-    else:
-        final = gcode
-
-    print("done postprocessing.")
-
-    gfile = pythonopen(filename,"wb")
-    gfile.write(final)
-    gfile.close()
-
-
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS == True:
-        LINENR += 1
-        return "N" + str(LINENR) + " "
-    return ""
-
-def parse(pathobj):
-    out = ""
-    lastcommand = None
-
-    #params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control the order of parameters
-    params = ['X','Y','Z','A','B','I','J','F','S','T','Q','R','L'] #linuxcnc doesn't want K properties on XY plane  Arcs need work.
-
-    if hasattr(pathobj,"Group"): #We have a compound or project.
-        if OUTPUT_COMMENTS: out += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else: #parsing simple path
-
-        if not hasattr(pathobj,"Path"): #groups might contain non-path things like stock.
-            return out
-
-        if OUTPUT_COMMENTS: out += linenumber() + "(Path: " + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the last one
-            if MODAL == True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        outstring.append(param + format(c.Parameters['F'], '.0f'))
-                    elif param == 'S':
-                        outstring.append(param + format(c.Parameters[param], '.0f'))
-                    elif param == 'T':
-                        outstring.append(param + format(c.Parameters['T'], '.0f'))
-                    else:
-                        outstring.append(param + format(c.Parameters[param], '.3f'))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                if OUTPUT_COMMENTS: out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS == False:
-                    out = []
-                else:
-                    outstring.pop(0) #remove the command
-
-            #prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0,(linenumber()))
-
-                #append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
-
-        return out
+    if OUTPUT_COMMENTS: yield "(begin postamble)\n"
+    for line in dialect.text(POSTAMBLE):
+        yield line
+
+
+class DynapathDialect(PostStream.Dialect):
+    '''coordinates with 3 decimals, feed, speed and tool as whole numbers'''
+
+    precision = 3
+    param_precision = {'F': 0, 'S': 0, 'T': 0}
+    integer_params = []
+    feed_params = []  # the feed rate is written as it is, rapid moves included
+    line_number_increment = 1
+
+    def tool_change_lines(self):
+        for line in self.comment("begin toolchange"):
+            yield line
+        for line in self.text(self.tool_change):
+            yield line
+
+    def parse(self, pathobj):
+        if hasattr(pathobj,"Group"): #We have a compound or project.
+            for line in self.comment("compound: " + pathobj.Label):
+                yield line
+            for p in pathobj.Group:
+                for line in self.parse(p):
+                    yield line
+        elif hasattr(pathobj,"Path"): #groups might contain non-path things like stock.
+            for line in self.comment("Path: " + pathobj.Label):
+                yield line
+            self.last_command = None
+            for c in pathobj.Path.Commands:
+                for line in self.command_lines(c):
+                    yield line
 
 print(__name__ + " gcode postprocessor loaded.")
 
@@ -42,10 +42,9 @@ Arguments for linuxcnc:
     --output-precision=4             ... number of digits of precision.  Default=4
 '''
 import FreeCAD
-from FreeCAD import Units
 import datetime
-from PathScripts import PostUtils
 from PathScripts import PathUtils
+from PathScripts import PostStream
 
 now = datetime.datetime.now()
 
@@ -90,11 +89,6 @@ POST_OPERATION = ''''''
 # Tool Change commands will be inserted before a tool change
 TOOL_CHANGE = ''''''
 
-
-# to distinguish python built-in open function from the one declared below
-if open.__module__ == '__builtin__':
-    pythonopen = open
-
 def processArguments(argstring):
     global OUTPUT_HEADER
     global OUTPUT_COMMENTS
@@ -124,8 +118,6 @@ def processArguments(argstring):
 
 def export(objectslist, filename, argstring):
     processArguments(argstring)
-    global UNITS
-    global UNIT_FORMAT
 
     for obj in objectslist:
         if not hasattr(obj, "Path"):
@@ -133,20 +125,39 @@ def export(objectslist, filename, argstring):
             return
 
     print("postprocessing...")
-    gcode = ""
+    final = PostStream.write_gcode(gcode(objectslist), filename, SHOW_EDITOR)
+    print("done postprocessing.")
+
+    return final
+
+
+def gcode(objectslist):
+    '''yields the lines of the G-code program of the objects'''
+    global UNITS
+    global UNIT_FORMAT
+
+    dialect = PostStream.Dialect(
+        precision=PRECISION,
+        modal=MODAL,
+        comments=OUTPUT_COMMENTS,
+        line_numbers=OUTPUT_LINE_NUMBERS,
+        line_number=LINENR,
+        command_space=COMMAND_SPACE,
+        unit_format=UNIT_FORMAT,
+        tool_change=TOOL_CHANGE)
 
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ + ")\n"
-        gcode += linenumber() + "(Output Time:" + str(now) + ")\n"
+        yield dialect.number() + "(Exported by FreeCAD)\n"
+        yield dialect.number() + "(Post Processor: " + __name__ + ")\n"
+        yield dialect.number() + "(Output Time:" + str(now) + ")\n"
 
     # Write the preamble
-    if OUTPUT_COMMENTS:
-        gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+    for line in dialect.comment("begin preamble"):
+        yield line
+    for line in dialect.text(PREAMBLE):
+        yield line
+    yield dialect.number() + UNITS + "\n"
 
     for obj in objectslist:
 
@@ -165,134 +176,31 @@ def export(objectslist, filename, argstring):
             else:
                UNITS = "G20"
                UNIT_FORMAT = 'in/min'
+            dialect.set_unit_format(UNIT_FORMAT)
 
         # do the pre_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(begin operation: %s)\n" % obj.Label
-            gcode += linenumber() + "(machine: %s, %s)\n" % (myMachine, UNIT_FORMAT)
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        for line in dialect.comment("begin operation: %s" % obj.Label):
+            yield line
+        for line in dialect.comment("machine: %s, %s" % (myMachine, UNIT_FORMAT)):
+            yield line
+        for line in dialect.text(PRE_OPERATION):
+            yield line
 
-        gcode += parse(obj)
+        for line in dialect.parse(obj):
+            yield line
 
         # do the post_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(finish operation: %s)\n" % obj.Label
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        for line in dialect.comment("finish operation: %s" % obj.Label):
+            yield line
+        for line in dialect.text(POST_OPERATION):
+            yield line
 
     # do the post_amble
 
     if OUTPUT_COMMENTS:
-        gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
-
-    if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
-    else:
-        final = gcode
-
-    print("done postprocessing.")
-
-    if not filename == '-':
-        gfile = pythonopen(filename, "wb")
-        gfile.write(final)
-        gfile.close()
-
-    return final
-
-
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS is True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
-
-def parse(pathobj):
-    global PRECISION
-    out = ""
-    lastcommand = None
-    precision_string = '.' + str(PRECISION) +'f'
-
-    # params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
-    # the order of parameters
-    # linuxcnc doesn't want K properties on XY plane  Arcs need work.
-    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L']
-
-    if hasattr(pathobj, "Group"):  # We have a compound or project.
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else:  # parsing simple path
-
-        # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return out
-
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(" + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the
-            # last one
-            if MODAL is True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        if c.Name not in ["G0", "G00"]: #linuxcnc doesn't use rapid speeds
-                            speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
-                            outstring.append(
-                                param + format(float(speed.getValueAs(UNIT_FORMAT)), precision_string) )
-                    elif param == 'T':
-                        outstring.append(param + str(int(c.Parameters['T'])))
-                    else:
-                        outstring.append(
-                            param + format(c.Parameters[param], precision_string))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                # if OUTPUT_COMMENTS:
-                #     out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS is False:
-                    out = []
-                else:
-                    outstring.pop(0)  # remove the command
-
-            # prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0, (linenumber()))
-
-                # append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
-
-        return out
+        yield "(begin postamble)\n"
+    for line in dialect.text(POSTAMBLE):
+        yield line
 
 
 print(__name__ + " gcode postprocessor loaded.")
@@ -40,6 +40,7 @@ parameters, like e.g. suppress the units in the header and at every hop.
 ''' example post for Maho M 600E mill'''
 import FreeCAD
 import time
+from PathScripts import PostStream
 from PathScripts import PostUtils
 import math
 
@@ -235,9 +236,6 @@ GCODE_FOOTER = "M30"
 
 linenr = 0  # variable has to be global because it is used by linenumberify and export
 
-if open.__module__ == '__builtin__':
-    pythonopen = open
-
 
 def angleUnder180(command, lastX, lastY, x, y, i, j):
     # radius R can be used iff angle is < 180.
@@ -288,182 +286,199 @@ def linenumberify(GCodeString):
 
 
 def export(selection, filename, argstring):
-    global linenr
-    linenr = STARTLINENR
-    lastX = 0
-    lastY = 0
-    lastZ = 0
-    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'H', 'S', 'T',
-              'Q', 'R', 'L']  # Using XY plane most of the time so skipping K
-    modalParamsDict = dict()
-    for mp in MODALPARAMS:
-        modalParamsDict[mp] = None
     for obj in selection:
         if not hasattr(obj, "Path"):
             print("the object " + obj.Name + " is not a path. Please select only path and Compounds.")
             return
+    return PostStream.write_gcode(gcode(selection), filename, SHOW_EDITOR)
+
+
+def gcode(selection):
+    '''yields the lines of the G-code program of the selected job'''
+    global linenr
+    linenr = STARTLINENR
+    units = UNITS
     myMachine = None
     for pathobj in selection:
         if hasattr(pathobj, "MachineName"):
             myMachine = pathobj.MachineName
         if hasattr(pathobj, "MachineUnits"):
             if pathobj.MachineUnits == "Metric":
-                UNITS = "G21"
+                units = "G21"
             else:
-                UNITS = "G20"
+                units = "G20"
     if myMachine is None:
         print("No machine found in this selection")
 
-    gcode = ''
-    gcode += mkHeader(selection)
-    gcode += linenumberify(GCODE_HEADER)
+    dialect = PhillipsDialect(units)
+
+    yield mkHeader(selection)
+    yield linenumberify(GCODE_HEADER)
     if UNITS_INCLUDED:
-        gcode += linenumberify(mapGCode(UNITS))
-
-    lastcommand = None
-
-    gobjects = []
-    for g in selection[0].Group:
-        if g.Name <> 'Machine':  # filtering out gcode home position from Machine object
-            gobjects.append(g)
-
-    for obj in gobjects:
-        if hasattr(obj, 'Comment'):
-            gcode += linenumberify('(' + obj.Comment + ')')
-        for c in obj.Path.Commands:
-            outstring = []
-            command = c.Name
-
-            if (command != UNITS or UNITS_INCLUDED):
-                if command[0] == '(':
-                    command = PostUtils.fcoms(command, COMMENT)
-                # the mapping is done for output only! For internal things we
-                # still use the old value.
-                mappedCommand = mapGCode(command)
-
-                if not MODAL or command != lastcommand:
-                    outstring.append(mappedCommand)
-#               if MODAL == True: )
-# #\better:   append iff MODAL == False )
-#                   if command == lastcommand: )
-#                       outstring.pop(0!#\ )
-                if c.Parameters >= 1:
-                    for param in params:
-                        if param in c.Parameters:
-                            if (param in MODALPARAMS) and (modalParamsDict[str(param)] == c.Parameters[str(param)]):
-                                # do nothing or append white space
-                                outstring.append('  ')
-                            elif param == 'F':
-                                outstring.append(
-                                    param + PostUtils.fmt(c.Parameters['F'], FEED_DECIMALS, UNITS))
-                            elif param == 'H':
-                                outstring.append(
-                                    param + str(int(c.Parameters['H'])))
-                            elif param == 'S':
-                                # rpm is unitless-therefore I had to 'fake it
-                                # out' by using metric units which don't get
-                                # converted from entered value
-                                outstring.append(
-                                    param + PostUtils.fmt(c.Parameters['S'], SPINDLE_DECIMALS, 'G21'))
-                            elif param == 'T':
-                                outstring.append(
-                                    param + str(int(c.Parameters['T'])))
-                            elif param == 'I' and (command == 'G2' or command == 'G3'):
-                                # this is the special case for circular paths,
-                                # where relative coordinates have to be changed
-                                # to absolute
-                                i = c.Parameters['I']
-                                # calculate the radius r
-                                j = c.Parameters['J']
-                                r = math.sqrt(i**2 + j**2)
-                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, c.Parameters['X'], c.Parameters['Y'], i, j):
-                                    outstring.append(
-                                        'R' + PostUtils.fmt(r, AXIS_DECIMALS, UNITS))
-                                else:
-                                    if RADIUS_COMMENT:
-                                        outstring.append(
-                                            '(R' + PostUtils.fmt(r, AXIS_DECIMALS, UNITS) + ')')
-                                    if ABSOLUTE_CIRCLE_CENTER:
-                                        i += lastX
-                                    outstring.append(
-                                        param + PostUtils.fmt(i, AXIS_DECIMALS, UNITS))
-                            elif param == 'J' and (command == 'G2' or command == 'G3'):
-                                # this is the special case for circular paths,
-                                # where incremental center has to be changed to
-                                # absolute center
-                                i = c.Parameters['I']
-                                j = c.Parameters['J']
-                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, c.Parameters['X'], c.Parameters['Y'], i, j):
-                                    # R is handled with the I parameter, here:
-                                    # do nothing at all, keep the structure as
-                                    # with I command
-                                    pass
-                                else:
-                                    if ABSOLUTE_CIRCLE_CENTER:
-                                        j += lastY
-                                    if SWAP_Y_Z:
-                                        # we have to swap j and k as well
-                                        outstring.append(
-                                            'K' + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
-                                    else:
-                                        outstring.append(
-                                            param + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
-                            elif param == 'K' and (command == 'G2' or command == 'G3'):
-                                # this is the special case for circular paths,
-                                # where incremental center has to be changed to
-                                # absolute center
-                                outstring.append(
-                                    '(' + param + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS) + ')')
-                                z = c.Parameters['Z']
-                                k = c.Parameters['K']
-                                if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, lastX, lastY, c.Parameters['X'], c.Parameters['Y'], i, j):
-                                    # R is handled with the I parameter, here:
-                                    # do nothing at all, keep the structure as
-                                    # with I command
-                                    pass
-                                else:
-                                    if ABSOLUTE_CIRCLE_CENTER:
-                                        k += lastZ
-                                if SWAP_Y_Z:
-                                        # we have to swap j and k as well
-                                    outstring.append(
-                                        'J' + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
-                                else:
-                                    outstring.append(
-                                        param + PostUtils.fmt(j, AXIS_DECIMALS, UNITS))
-                            elif param == 'Y' and SWAP_Y_Z:
-                                outstring.append(
-                                    'Z' + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS))
-                            elif param == 'Z' and SWAP_Y_Z:
-                                outstring.append(
-                                    'Y' + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS))
-                            else:
-                                outstring.append(
-                                    param + PostUtils.fmt(c.Parameters[param], AXIS_DECIMALS, UNITS))
-
-                            if param in MODALPARAMS:
-                                modalParamsDict[str(param)] = c.Parameters[
-                                    param]
-                    # save the last X, Y, Z values
-                    if 'X' in c.Parameters:
-                        lastX = c.Parameters['X']
-                    if 'Y' in c.Parameters:
-                        lastY = c.Parameters['Y']
-                    if 'Z' in c.Parameters:
-                        lastZ = c.Parameters['Z']
-                outstr = str(outstring)
-                outstr = outstr.replace(']', '')
-                outstr = outstr.replace('[', '')
-                outstr = outstr.replace("'", '')
-                outstr = outstr.replace(",", '')
-                if LINENUMBERS:
-                    gcode += "N" + str(linenr) + " "
-                    linenr += LINENUMBER_INCREMENT
-                gcode += outstr + '\n'
-                lastcommand = c.Name
-    gcode += linenumberify(GCODE_FOOTER)
-    if SHOW_EDITOR:
-        PostUtils.editor(gcode)
-    gfile = pythonopen(filename, "wb")
-    gfile.write(gcode)
-    gfile.close()
+        yield linenumberify(mapGCode(units))
+
+    for obj in selection[0].Group:
+        if obj.Name != 'Machine':  # filtering out gcode home position from Machine object
+            if hasattr(obj, 'Comment'):
+                yield linenumberify('(' + obj.Comment + ')')
+            for c in obj.Path.Commands:
+                for line in dialect.command_lines(c):
+                    yield line
+    yield linenumberify(GCODE_FOOTER)
+
+
+class PhillipsDialect(PostStream.Dialect):
+    '''the dialect configured by the constants above, it keeps the last position and modal parameters'''
+
+    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'H', 'S', 'T',
+              'Q', 'R', 'L']  # Using XY plane most of the time so skipping K
+
+    def __init__(self, units):
+        PostStream.Dialect.__init__(self, modal=MODAL, line_numbers=LINENUMBERS)
+        self.units = units
+        self.lastX = 0
+        self.lastY = 0
+        self.lastZ = 0
+        self.modalParamsDict = dict()
+        for mp in MODALPARAMS:
+            self.modalParamsDict[mp] = None
+
+    def number(self):
+        # shares the line numbers with linenumberify
+        global linenr
+        if not self.line_numbers:
+            return ""
+        number = "N" + str(linenr) + " "
+        linenr += LINENUMBER_INCREMENT
+        return number
+
+    def command_words(self, c):
+        outstring = []
+        command = c.Name
+        parameters = c.Parameters
+
+        if command[0] == '(':
+            command = PostUtils.fcoms(command, COMMENT)
+        # the mapping is done for output only! For internal things we
+        # still use the old value.
+        mappedCommand = mapGCode(command)
+
+        if not self.modal or command != self.last_command:
+            outstring.append(mappedCommand)
+        for param in self.params:
+            if param in parameters:
+                if (param in MODALPARAMS) and (self.modalParamsDict[str(param)] == parameters[str(param)]):
+                    # do nothing or append white space
+                    outstring.append('  ')
+                elif param == 'F':
+                    outstring.append(
+                        param + PostUtils.fmt(parameters['F'], FEED_DECIMALS, self.units))
+                elif param == 'H':
+                    outstring.append(
+                        param + str(int(parameters['H'])))
+                elif param == 'S':
+                    # rpm is unitless-therefore I had to 'fake it
+                    # out' by using metric units which don't get
+                    # converted from entered value
+                    outstring.append(
+                        param + PostUtils.fmt(parameters['S'], SPINDLE_DECIMALS, 'G21'))
+                elif param == 'T':
+                    outstring.append(
+                        param + str(int(parameters['T'])))
+                elif param == 'I' and (command == 'G2' or command == 'G3'):
+                    # this is the special case for circular paths,
+                    # where relative coordinates have to be changed
+                    # to absolute
+                    i = parameters['I']
+                    # calculate the radius r
+                    j = parameters['J']
+                    r = math.sqrt(i**2 + j**2)
+                    if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, self.lastX, self.lastY, parameters['X'], parameters['Y'], i, j):
+                        outstring.append(
+                            'R' + PostUtils.fmt(r, AXIS_DECIMALS, self.units))
+                    else:
+                        if RADIUS_COMMENT:
+                            outstring.append(
+                                '(R' + PostUtils.fmt(r, AXIS_DECIMALS, self.units) + ')')
+                        if ABSOLUTE_CIRCLE_CENTER:
+                            i += self.lastX
+                        outstring.append(
+                            param + PostUtils.fmt(i, AXIS_DECIMALS, self.units))
+                elif param == 'J' and (command == 'G2' or command == 'G3'):
+                    # this is the special case for circular paths,
+                    # where incremental center has to be changed to
+                    # absolute center
+                    i = parameters['I']
+                    j = parameters['J']
+                    if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, self.lastX, self.lastY, parameters['X'], parameters['Y'], i, j):
+                        # R is handled with the I parameter, here:
+                        # do nothing at all, keep the structure as
+                        # with I command
+                        pass
+                    else:
+                        if ABSOLUTE_CIRCLE_CENTER:
+                            j += self.lastY
+                        if SWAP_Y_Z:
+                            # we have to swap j and k as well
+                            outstring.append(
+                                'K' + PostUtils.fmt(j, AXIS_DECIMALS, self.units))
+                        else:
+                            outstring.append(
+                                param + PostUtils.fmt(j, AXIS_DECIMALS, self.units))
+                elif param == 'K' and (command == 'G2' or command == 'G3'):
+                    # this is the special case for circular paths,
+                    # where incremental center has to be changed to
+                    # absolute center
+                    outstring.append(
+                        '(' + param + PostUtils.fmt(parameters[param], AXIS_DECIMALS, self.units) + ')')
+                    z = parameters['Z']
+                    k = parameters['K']
+                    if USE_RADIUS_IF_POSSIBLE and angleUnder180(command, self.lastX, self.lastY, parameters['X'], parameters['Y'], i, j):
+                        # R is handled with the I parameter, here:
+                        # do nothing at all, keep the structure as
+                        # with I command
+                        pass
+                    else:
+                        if ABSOLUTE_CIRCLE_CENTER:
+                            k += self.lastZ
+                    if SWAP_Y_Z:
+                            # we have to swap j and k as well
+                        outstring.append(
+                            'J' + PostUtils.fmt(j, AXIS_DECIMALS, self.units))
+                    else:
+                        outstring.append(
+                            param + PostUtils.fmt(j, AXIS_DECIMALS, self.units))
+                elif param == 'Y' and SWAP_Y_Z:
+                    outstring.append(
+                        'Z' + PostUtils.fmt(parameters[param], AXIS_DECIMALS, self.units))
+                elif param == 'Z' and SWAP_Y_Z:
+                    outstring.append(
+                        'Y' + PostUtils.fmt(parameters[param], AXIS_DECIMALS, self.units))
+                else:
+                    outstring.append(
+                        param + PostUtils.fmt(parameters[param], AXIS_DECIMALS, self.units))
+
+                if param in MODALPARAMS:
+                    self.modalParamsDict[str(param)] = parameters[
+                        param]
+        # save the last X, Y, Z values
+        if 'X' in parameters:
+            self.lastX = parameters['X']
+        if 'Y' in parameters:
+            self.lastY = parameters['Y']
+        if 'Z' in parameters:
+            self.lastZ = parameters['Z']
+        self.last_command = c.Name
+        return outstring
+
+    def command_lines(self, c):
+        if c.Name != self.units or UNITS_INCLUDED:
+            return [self.line(self.command_words(c))]
+        return []
+
+    def line(self, words):
+        # the words as they used to be printed from the list, without brackets, quotes and commas
+        line = " ".join(words)
+        for ch in "[]',":
+            line = line.replace(ch, '')
+        return self.number() + line + '\n'
@@ -43,9 +43,8 @@ Arguments for smoothieboard:
 
 '''
 import FreeCAD
-from FreeCAD import Units
 import datetime
-from PathScripts import PostUtils
+from PathScripts import PostStream
 
 now = datetime.datetime.now()
 
@@ -94,11 +93,6 @@ POST_OPERATION = ''''''
 # Tool Change commands will be inserted before a tool change
 TOOL_CHANGE = ''''''
 
-
-# to distinguish python built-in open function from the one declared below
-if open.__module__ == '__builtin__':
-    pythonopen = open
-
 def processArguments(argstring):
     global OUTPUT_HEADER
     global OUTPUT_COMMENTS
@@ -131,15 +125,26 @@ def processArguments(argstring):
 
 def export(objectslist, filename, argstring):
     processArguments(argstring)
-    global UNITS
-    global IP_ADDR
     for obj in objectslist:
         if not hasattr(obj, "Path"):
             FreeCAD.Console.PrintError("the object " + obj.Name + " is not a path. Please select only path and Compounds.\n")
             return
 
     FreeCAD.Console.PrintMessage("postprocessing...\n")
-    gcode = ""
+
+    if IP_ADDR is not None:
+        final = PostStream.write_gcode(gcode(objectslist), '-', SHOW_EDITOR)
+        sendToSmoothie(IP_ADDR, final, filename)
+    else:
+        final = PostStream.write_gcode(gcode(objectslist), filename, SHOW_EDITOR)
+
+    FreeCAD.Console.PrintMessage("done postprocessing.\n")
+    return final
+
+
+def gcode(objectslist):
+    '''yields the lines of the G-code program of the objects'''
+    global UNITS
 
     # Find the machine.
     # The user my have overridden post processor defaults in the GUI.  Make
@@ -156,64 +161,51 @@ def export(objectslist, filename, argstring):
     if myMachine is None:
         FreeCAD.Console.PrintWarning("No machine found in this selection\n")
 
+    dialect = SmoothieDialect(
+        modal=MODAL,
+        comments=OUTPUT_COMMENTS,
+        line_numbers=OUTPUT_LINE_NUMBERS,
+        line_number=LINENR,
+        command_space=COMMAND_SPACE,
+        unit_format=UNIT_FORMAT,
+        tool_change=TOOL_CHANGE)
+
     # write header
     if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ + ")\n"
-        gcode += linenumber() + "(Output Time:" + str(now) + ")\n"
+        yield dialect.number() + "(Exported by FreeCAD)\n"
+        yield dialect.number() + "(Post Processor: " + __name__ + ")\n"
+        yield dialect.number() + "(Output Time:" + str(now) + ")\n"
 
     # Write the preamble
-    if OUTPUT_COMMENTS:
-        gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+    for line in dialect.comment("begin preamble"):
+        yield line
+    for line in dialect.text(PREAMBLE):
+        yield line
+    yield dialect.number() + UNITS + "\n"
 
     for obj in objectslist:
 
         # do the pre_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(begin operation: " + obj.Label + ")\n"
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        for line in dialect.comment("begin operation: " + obj.Label):
+            yield line
+        for line in dialect.text(PRE_OPERATION):
+            yield line
 
-        gcode += parse(obj)
+        for line in dialect.parse(obj):
+            yield line
 
         # do the post_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(finish operation: " + obj.Label + ")\n"
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        for line in dialect.comment("finish operation: " + obj.Label):
+            yield line
+        for line in dialect.text(POST_OPERATION):
+            yield line
 
     # do the post_amble
 
     if OUTPUT_COMMENTS:
-        gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
-
-    if SHOW_EDITOR:
-        dia = PostUtils.GCodeEditorDialog()
-        dia.editor.setText(gcode)
-        result = dia.exec_()
-        if result:
-            final = dia.editor.toPlainText()
-        else:
-            final = gcode
-    else:
-        final = gcode
-
-    if IP_ADDR is not None:
-        sendToSmoothie(IP_ADDR, final, filename)
-    else:
-
-        if not filename == '-':
-            gfile = pythonopen(filename, "wb")
-            gfile.write(final)
-            gfile.close()
-
-    FreeCAD.Console.PrintMessage("done postprocessing.\n")
-    return final
+        yield "(begin postamble)\n"
+    for line in dialect.text(POSTAMBLE):
+        yield line
 
 
 def sendToSmoothie(IP_ADDR, GCODE, fname):
@@ -290,94 +282,23 @@ def sendToSmoothie(IP_ADDR, GCODE, fname):
     FreeCAD.Console.PrintMessage("Upload complete\n")
 
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS is True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
-
-def parse(pathobj):
-    out = ""
-    lastcommand = None
-    global SPINDLE_SPEED
-
-    # params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
-    # the order of parameters
-    # linuxcnc doesn't want K properties on XY plane  Arcs need work.
-    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L']
-
-    if hasattr(pathobj, "Group"):  # We have a compound or project.
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(compound: " + pathobj.Label + ")\n"
-        for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else:  # parsing simple path
-
-        # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return out
-
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(" + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the
-            # last one
-            if MODAL is True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        if c.Name not in ["G0", "G00"]: #linuxcnc doesn't use rapid speeds
-                            speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
-                            outstring.append(
-                                param + format(float(speed.getValueAs(UNIT_FORMAT)), '.2f') )
-                    elif param == 'T':
-                        outstring.append(param + str(c.Parameters['T']))
-                    elif param == 'S':
-                        outstring.append(param + str(c.Parameters['S']))
-                        SPINDLE_SPEED = c.Parameters['S']
-                    else:
-                        outstring.append(
-                            param + format(c.Parameters[param], '.4f'))
-            if command in ['G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
-                outstring.append('S' + str(SPINDLE_SPEED))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                # if OUTPUT_COMMENTS:
-                #     out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS is False:
-                    out = []
-                else:
-                    outstring.pop(0)  # remove the command
-
-            # prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0, (linenumber()))
-
-                # append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE 
-                out = out.strip() + "\n"
-
-        return out
+class SmoothieDialect(PostStream.Dialect):
+    '''smoothieware wants the spindle speed on every feed move'''
+
+    param_precision = {'F': 2}
+
+    def param_format(self, param):
+        if param in ['S', 'T']:
+            return param + '%s', 1.0
+        return PostStream.Dialect.param_format(self, param)
+
+    def append_params(self, words, command, parameters):
+        global SPINDLE_SPEED
+        PostStream.Dialect.append_params(self, words, command, parameters)
+        if 'S' in parameters:
+            SPINDLE_SPEED = parameters['S']
+        if command in ['G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
+            words.append('S' + str(SPINDLE_SPEED))
 
 
 print(__name__ + " gcode postprocessor loaded.")
@@ -99,6 +99,25 @@ class TestPathLog(unittest.TestCase):
         PathLog.setLevel(PathLog.Level.DEBUG)
         self.assertIsNotNone(PathLog.debug("this"))
 
+    def test22(self):
+        """Verify lazy arguments are only formatted if the message is logged."""
+        class Formatted(object):
+            count = 0
+            def __str__(self):
+                Formatted.count += 1
+                return 'formatted'
+        arg = Formatted()
+        self.assertIsNone(PathLog.debug("this %s", arg))
+        self.assertEqual(Formatted.count, 0)
+        PathLog.setLevel(PathLog.Level.DEBUG, self.MODULE)
+        self.assertIn("this formatted 7", PathLog.debug("this %s %d", arg, 7))
+        self.assertEqual(Formatted.count, 1)
+
+    def test23(self):
+        """Verify a message without arguments is not formatted."""
+        PathLog.setLevel(PathLog.Level.DEBUG)
+        self.assertIn(": 100%", PathLog.debug("100%"))
+
     def test30(self):
         """Verify log level ERROR."""
         PathLog.setLevel(PathLog.Level.ERROR)
@@ -144,6 +163,18 @@ class TestPathLog(unittest.TestCase):
         self.assertIsNotNone(PathLog.warning('something'))
         self.assertIsNotNone(PathLog.error('something'))
 
+    def test40(self):
+        """Verify isEnabledFor follows the module and global log levels."""
+        self.assertFalse(PathLog.isEnabledFor(PathLog.Level.DEBUG))
+        self.assertTrue(PathLog.isEnabledFor(PathLog.Level.NOTICE))
+        PathLog.setLevel(PathLog.Level.DEBUG, 'SomeOtherModule')
+        self.assertFalse(PathLog.isEnabledFor(PathLog.Level.DEBUG))
+        self.assertTrue(PathLog.isEnabledFor(PathLog.Level.DEBUG, 'SomeOtherModule'))
+        PathLog.setLevel(PathLog.Level.DEBUG, self.MODULE)
+        self.assertTrue(PathLog.isEnabledFor(PathLog.Level.DEBUG))
+        PathLog.setLevel(PathLog.Level.ERROR)
+        self.assertFalse(PathLog.isEnabledFor(PathLog.Level.NOTICE, 'ThirdModule'))
+
     def test50(self):
         """Verify no tracking by default."""
         self.assertIsNone(PathLog.track('this', 'and', 'that'))
@@ -190,6 +221,34 @@ class TestPathLog(unittest.TestCase):
         self.assertTrue(msg.startswith(self.MODULE))
         self.assertTrue(msg.endswith('test61(this, None, 1, 18.25)'))
 
+    def test70(self):
+        """Verify disabled log calls return before the caller is inspected or the message is formatted."""
+        class Arg(object):
+            formatted = 0
+            def __str__(self):
+                Arg.formatted += 1
+                return 'arg'
+        inspected = []
+        caller = PathLog._caller
+        def countingCaller():
+            inspected.append(True)
+            return caller()
+        PathLog._caller = countingCaller
+        try:
+            PathLog.logToConsole(False)
+            PathLog.debug("%s", Arg())
+            PathLog.info("%s", Arg())
+            PathLog.track(Arg())
+            self.assertEqual(inspected, [])
+            self.assertEqual(Arg.formatted, 0)
+            PathLog.setLevel(PathLog.Level.DEBUG, 'OtherModule')
+            self.assertIsNone(PathLog.debug("%s", Arg()))
+            self.assertEqual(len(inspected), 1)
+            self.assertEqual(Arg.formatted, 0)
+        finally:
+            PathLog._caller = caller
+            PathLog.logToConsole(True)
+
     def testzz(self):
         """Restoring environment after tests."""
         PathLog.setLevel(PathLog.Level.RESET)
@@ -30,6 +30,7 @@ import PathScripts.PathJob
 import PathScripts.PathLoadTool
 import PathScripts.PathPost
 import PathScripts.PathUtils
+import PathScripts.PostStream
 import difflib
 import unittest
 
@@ -104,3 +105,54 @@ class PathPostTestCases(unittest.TestCase):
             msg = ''.join(difflib.ndiff(gcode.splitlines(True), refGCode.splitlines(True)))
             self.fail("linuxcnc output doesn't match: " + msg)
 
+    def testStreamDialect(self):
+        class Operation:
+            Label = 'op'
+            Path = Path.Path([
+                Path.Command('G0', {'X': 1, 'Y': 2, 'Z': 3, 'F': 10}),
+                Path.Command('G1', {'X': 1, 'Y': 2, 'F': 10}),
+                Path.Command('G1', {'X': 1.23456}),
+                Path.Command('M6', {'T': 2}),
+                Path.Command('message', {})])
+
+        dialect = PathScripts.PostStream.Dialect(modal=True, line_numbers=True, precision=2, tool_change='M5\n')
+        lines = list(dialect.parse(Operation))
+        self.assertEqual(lines, [
+            'N110  G0 X1.00 Y2.00 Z3.00\n',
+            'N120  G1 X1.00 Y2.00 F600.00\n',
+            'N130  X1.23\n',
+            'N140 M5\n',
+            'N150  M6 T2\n'])
+
+        dialect = PathScripts.PostStream.Dialect(comments=False)
+        self.assertEqual(len(list(dialect.parse(Operation))), 4)
+        self.assertEqual(list(dialect.comment('op')), [])
+
+    def testStreamFormatTable(self):
+        dialect = PathScripts.PostStream.Dialect(precision=3, param_precision={'F': 1}, modal_params=['Z'])
+        c = Path.Command('G1', {'X': 1, 'Z': -1, 'F': 10})
+        self.assertEqual(dialect.command_words(c), ['G1', 'X1.000', 'Z-1.000', 'F600.0'])
+        self.assertEqual(dialect.command_words(Path.Command('G1', {'X': 2, 'Z': -1})), ['G1', 'X2.000'])
+        self.assertEqual(dialect.command_words(Path.Command('G0', {'Z': 5, 'F': 10})), ['G0', 'Z5.000'])
+
+        # the precomputed feed rate conversion is the one of the units
+        dialect.set_unit_format('in/min')
+        speed = FreeCAD.Units.Quantity(10, FreeCAD.Units.Velocity)
+        self.assertEqual(dialect.command_words(c), ['G1', 'X1.000', 'Z-1.000', 'F' + format(float(speed.getValueAs('in/min')), '.1f')])
+        self.assertEqual(dialect.command_words(c)[-1], 'F23.6')
+
+    def testStreamWriter(self):
+        class File:
+            def __init__(self):
+                self.blocks = []
+            def write(self, data):
+                self.blocks.append(data)
+
+        lines = ("G1 X%d\n" % i for i in range(25))
+        gfile = File()
+        self.assertEqual(PathScripts.PostStream.write_lines(gfile, lines, 10), 25)
+        self.assertEqual([len(b.splitlines()) for b in gfile.blocks], [10, 10, 5])
+        self.assertEqual(''.join(gfile.blocks), ''.join("G1 X%d\n" % i for i in range(25)))
+
+        gcode = PathScripts.PostStream.write_gcode(iter(['G0 X1\n', 'M2\n']), '-')
+        self.assertEqual(gcode, 'G0 X1\nM2\n')
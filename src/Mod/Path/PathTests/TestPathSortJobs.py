@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2017 FreeCAD Developers                                 *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import PathScripts.PathUtils as PathUtils
+import random
+import unittest
+
+
+class TestPathSortJobs(unittest.TestCase):
+    """Test the hole order of PathUtils.sort_jobs."""
+
+    def locations(self, count):
+        rnd = random.Random(17)
+        return [{'xc': rnd.uniform(-50, 200), 'yc': rnd.uniform(0, 100), 'zmax': rnd.uniform(0, 20)} for i in range(count)]
+
+    def nearestNeighborOrder(self, locations, keys, attractors):
+        """the nearest neighbor order of the original implementation"""
+        def cost(location, last):
+            return sum((location[k] - last[k]) ** 2 for k in keys) + sum(abs(location[k]) for k in attractors)
+        remaining = list(locations)
+        last = dict((k, 0) for k in keys)
+        order = []
+        while remaining:
+            last = min(remaining, key=lambda location: cost(location, last))
+            order.append(last)
+            remaining.remove(last)
+        return order
+
+    def test00(self):
+        """Verify the nearest neighbor order with attractors."""
+        locations = self.locations(200)
+        expected = self.nearestNeighborOrder(locations, ['xc', 'yc'], ['xc', 'zmax'])
+        self.assertEqual(PathUtils.sort_jobs(list(locations), ['xc', 'yc'], ['xc', 'zmax'], improve_time=0), expected)
+        expected = self.nearestNeighborOrder(locations, ['xc', 'yc'], ['xc'])
+        self.assertEqual(PathUtils.sort_jobs(list(locations), ['xc', 'yc'], improve_time=0), expected)
+
+    def test01(self):
+        """Verify the 2-opt and Or-opt pass shortens the rapid moves and keeps the first hole."""
+        locations = self.locations(200)
+        nearest = PathUtils.sort_jobs(list(locations), ['xc', 'yc'], improve_time=0)
+        improved = PathUtils.sort_jobs(list(locations), ['xc', 'yc'], improve_time=10)
+        self.assertEqual(sorted(map(id, improved)), sorted(map(id, locations)))
+        self.assertIs(improved[0], nearest[0])
+        self.assertLess(PathUtils.rapid_length(improved, ['xc', 'yc']), PathUtils.rapid_length(nearest, ['xc', 'yc']))
+
+    def test02(self):
+        """Verify few locations."""
+        self.assertEqual(PathUtils.sort_jobs([], ['x', 'y']), [])
+        locations = [{'x': 5, 'y': 0}, {'x': 1, 'y': 1}]
+        self.assertEqual(PathUtils.sort_jobs(list(locations), ['x', 'y'], improve_time=1), [locations[1], locations[0]])
+        self.assertEqual(PathUtils.rapid_length(locations, ['x', 'y']), 17 ** 0.5)
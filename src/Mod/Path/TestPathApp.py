@@ -30,5 +30,6 @@ from PathTests.TestPathPost import PathPostTestCases
 
 from PathTests.TestPathGeom import TestPathGeom
 from PathTests.TestPathDepthParams import depthTestCases
+from PathTests.TestPathSortJobs import TestPathSortJobs
 
 from PathTests.TestPathDressupHoldingTags import TestHoldingTags